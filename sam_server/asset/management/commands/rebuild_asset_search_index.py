@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from asset import search
+
+
+class Command(BaseCommand):
+    help = ('Index the searched fields of all assets. Should be run after '
+            'updates which bypass the model (eg. QuerySet.update)')
+
+    def handle(self, *args, **options):
+        num_indexed = search.get_search_index().rebuild()
+        self.stdout.write('Indexed {0} assets'.format(num_indexed))
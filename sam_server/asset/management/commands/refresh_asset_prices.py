@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from asset.models import Asset, PRICE_BASE_CURRENCY
+
+
+class Command(BaseCommand):
+    help = ('Recompute the prices of all assets in the base currency '
+            'at the current exchange rates')
+
+    def handle(self, *args, **options):
+        num_updated = Asset.objects.refresh_price_base_values()
+        self.stdout.write('Updated the {0} price of {1} assets'
+                          .format(PRICE_BASE_CURRENCY, num_updated))
@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common import event_gateway, events
+from asset import views
+from asset.models import asset_events_user_id
+
+
+def _render(channel, messages):
+    return views.asset_events_json(asset_events_user_id(channel), messages)
+
+
+class Command(BaseCommand):
+    help = ('Serve the requests waiting for asset events which are '
+            'redirected to the event gateway (settings.EVENT_GATEWAY)')
+
+    def handle(self, *args, **options):
+        bus_config = dict(getattr(settings, 'EVENT_BUS', None) or {})
+        if bus_config.pop('BACKEND', 'inprocess') != 'redis':
+            raise CommandError('The event gateway requires the redis '
+                               'event bus backend')
+        gateway_config = getattr(settings, 'EVENT_GATEWAY', None) or {}
+        gateway = event_gateway.EventGateway(
+            _render,
+            bus_host=bus_config.get('HOST', events.DEFAULT_HOST),
+            bus_port=bus_config.get('PORT', events.DEFAULT_PORT),
+            host=gateway_config.get('HOST', events.DEFAULT_HOST),
+            port=gateway_config.get('PORT', event_gateway.DEFAULT_GATEWAY_PORT),
+            event='assets',
+            max_timeout=views.MAX_EVENTS_TIMEOUT,
+            stream_time=views.EVENTS_STREAM_TIME,
+            keepalive_interval=views.EVENTS_KEEPALIVE_INTERVAL,
+            retry=views.EVENTS_RETRY)
+        self.stdout.write('Serving asset events on {0}:{1}'
+                          .format(*gateway.address))
+        try:
+            gateway.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset', '0009_asset_deleted'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='price_base_value',
+            field=models.BigIntegerField(null=True, db_index=True),
+            preserve_default=True,
+        ),
+    ]
@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset', '0010_asset_price_base_value'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='asset',
+            index_together=set([('user', 'created', 'id')]),
+        ),
+    ]
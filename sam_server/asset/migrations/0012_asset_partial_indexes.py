@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+## Every request for a user's assets excludes the soft deleted assets, so
+## the indexes only contain the rows of assets which have not been deleted.
+## The predicates match the `"deleted" = false` condition generated by
+## `filter(deleted=False)`, so that the planner can use the indexes.
+PARTIAL_INDEXES = [
+    ## The asset list, which seeks to a (created, id) position
+    ('asset_asset_user_created_id_live',
+     '(user_id, created, id)'),
+    ## The price summary. Covers all the grouped and aggregated columns,
+    ## so the summary is computed from an index only scan
+    ('asset_asset_user_price_summary_live',
+     '(user_id, price_currency_code, use, vendor, price_value)'),
+]
+
+
+def _create_index_sql(name, columns):
+    return ('CREATE INDEX {0} ON asset_asset {1} WHERE deleted = false'
+            .format(name, columns))
+
+
+def _drop_index_sql(name):
+    return 'DROP INDEX {0}'.format(name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset', '0011_asset_keyset_index'),
+    ]
+
+    operations = [
+        ## Replaced by the partial index on the same columns
+        migrations.AlterIndexTogether(
+            name='asset',
+            index_together=set([]),
+        ),
+    ] + [
+        migrations.RunSQL(
+            _create_index_sql(name, columns),
+            reverse_sql=_drop_index_sql(name)
+        )
+        for name, columns in PARTIAL_INDEXES
+    ]
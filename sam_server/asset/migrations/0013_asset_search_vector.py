@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import models, migrations
+
+
+## The search vector of the searched fields of an asset (see asset/search.py)
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector(%(config)s, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector(%(config)s, coalesce(model_number, '')), 'B') || "
+    "setweight(to_tsvector(%(config)s, coalesce(vendor, '')), 'B') || "
+    "setweight(to_tsvector(%(config)s, coalesce(description, '')), 'C')"
+)
+
+
+def add_search_vector(apps, schema_editor):
+    ## Other databases are searched with an in process index
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    config = getattr(settings, 'ASSET_SEARCH_CONFIG', 'english')
+    schema_editor.execute(
+        'ALTER TABLE asset_asset ADD COLUMN search_vector tsvector')
+    ## Index the existing assets
+    schema_editor.execute(
+        'UPDATE asset_asset SET search_vector = ' + SEARCH_VECTOR_SQL,
+        {'config': config})
+    schema_editor.execute(
+        'CREATE INDEX asset_asset_search_vector_live ON asset_asset '
+        'USING gin(search_vector) WHERE deleted = false')
+
+
+def remove_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE asset_asset DROP COLUMN search_vector')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset', '0012_asset_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_vector, remove_search_vector),
+    ]
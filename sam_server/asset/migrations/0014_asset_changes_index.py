@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asset', '0013_asset_search_vector'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='asset',
+            index_together=set([('user', 'updated', 'id')]),
+        ),
+    ]
@@ -1,9 +1,14 @@
 from django.core.exceptions import ImproperlyConfigured
 from django.conf import settings
-from django.db import models
+from django.core.cache import cache
+from django.db import connection, models, transaction
+from django.db.models import Count, Sum
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from common.models import ModelBase
 
-from common.currency import MoneyAmount
+from common import events, exchange
+from common.currency import MoneyAmount, CurrencyException
 from authentication.models import User
 
 try:
@@ -12,6 +17,70 @@ except AttributeError:
     raise ImproperlyConfigured('asset module requires HOST_URI to be configured'
                                'in the global settings')
 
+## The currency of `Asset.price_base_value`
+PRICE_BASE_CURRENCY = getattr(settings, 'ASSET_PRICE_BASE_CURRENCY', 'USD')
+
+## The fields which the price summary of a user's assets can be grouped by,
+## in addition to the currency of the price.
+SUMMARY_GROUP_FIELDS = ('use', 'vendor')
+
+## The number of seconds a price summary is cached for. Summaries are
+## invalidated whenever an asset is saved or deleted, so this only bounds
+## the staleness after updates which bypass the model (eg. `QuerySet.update`)
+SUMMARY_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+## Converts the prices in a currency to base values, dividing exactly
+## (with DIV and MOD) and rounding halves to even like
+## `common.currency._round_half_even`. Rounding halves to even is symmetric,
+## so the absolute value of the price is rounded and its sign restored.
+_REFRESH_PRICE_BASE_VALUE_SQL = (
+    'UPDATE {0} SET price_base_value = ('
+    'SELECT SIGN(price_value::numeric) * (quotient + CASE'
+    ' WHEN 2 * remainder > %(denominator)s THEN 1'
+    ' WHEN 2 * remainder = %(denominator)s THEN MOD(quotient, 2)'
+    ' ELSE 0 END) '
+    'FROM (SELECT DIV(value, %(denominator)s) AS quotient,'
+    ' MOD(value, %(denominator)s) AS remainder'
+    ' FROM (SELECT ABS(price_value)::numeric * %(numerator)s AS value)'
+    ' AS scaled) AS divided) '
+    'WHERE price_currency_code = %(code)s'
+)
+
+
+def asset_events_channel(user_id):
+    """
+    The event bus channel which the ids of a user's changed assets
+    are published to
+    """
+    return 'asset:changes:{0}'.format(user_id)
+
+
+def asset_events_user_id(channel):
+    """
+    The id of the user of an `asset_events_channel`, or None if the channel
+    is not the channel of a user's asset changes
+    """
+    prefix, _, user_id = channel.rpartition(':')
+    if prefix != 'asset:changes' or not user_id.isdigit():
+        return None
+    return int(user_id)
+
+
+def _summary_cache_key(user_id, group_by):
+    return 'asset:summary:{0}:{1}'.format(user_id, ','.join(group_by))
+
+
+def _summary_groupings():
+    """
+    Every valid (sorted) combination of the summary group fields
+    """
+    groupings = [()]
+    for field in SUMMARY_GROUP_FIELDS:
+        groupings += [grouping + (field,) for grouping in groupings]
+    return groupings
+
+
 class AssetManager(models.Manager):
     def get_by_qr_code(self, qr_code):
         return self.get(qr_code=qr_code)
@@ -26,6 +95,97 @@ class AssetManager(models.Manager):
         """
         asset = Asset(user=user, **kwargs)
 
+    def refresh_price_base_values(self, user=None):
+        """
+        Recompute the price of every asset (or every asset of the user)
+        in the base currency, at the current exchange rates.
+        Should be run whenever the exchange rates change.
+
+        The prices are converted by the database, with a single update
+        for each currency, and rounded the same way as when the price
+        is set (exact halves of a minor unit are rounded to the nearest
+        even value).
+        Assets with prices in currencies without an exchange rate have
+        their base value cleared.
+
+        Returns the number of assets updated
+        """
+        assets = self.get_queryset()
+        if user is not None:
+            assets = assets.filter(user=user)
+        currency_codes = (assets.exclude(price_currency_code='')
+                                .values_list('price_currency_code', flat=True)
+                                .distinct())
+        rate_matrix = exchange.get_rate_matrix()
+        sql = _REFRESH_PRICE_BASE_VALUE_SQL.format(
+            connection.ops.quote_name(self.model._meta.db_table))
+        if user is not None:
+            sql += ' AND user_id = %(user_id)s'
+        num_updated = 0
+        with transaction.atomic():
+            for code in list(currency_codes):
+                try:
+                    numerator, denominator = rate_matrix.factor(
+                        code, PRICE_BASE_CURRENCY)
+                except CurrencyException:
+                    num_updated += (assets.filter(price_currency_code=code)
+                                          .update(price_base_value=None))
+                    continue
+                params = {'numerator': numerator, 'denominator': denominator,
+                          'code': code}
+                if user is not None:
+                    params['user_id'] = user.id
+                with connection.cursor() as cursor:
+                    cursor.execute(sql, params)
+                    num_updated += cursor.rowcount
+        return num_updated
+
+    def price_summary(self, user, group_by=()):
+        """
+        The number of (non deleted) assets of the user and the total
+        of their prices, grouped by the currency of the price and by
+        the fields in group_by (a sorted subset of SUMMARY_GROUP_FIELDS).
+
+        Returns a list of dicts with the keys `price_currency_code`, the
+        fields in group_by, `count` and `total`, computed by a single
+        aggregate query.
+        """
+        return list(self.price_summary_queryset(user, group_by))
+
+    def price_summary_queryset(self, user, group_by=()):
+        """
+        The aggregate query of `price_summary`
+        """
+        for field in group_by:
+            if field not in SUMMARY_GROUP_FIELDS:
+                raise ValueError('Cannot group assets by {0}'.format(field))
+        group_fields = ('price_currency_code',) + tuple(group_by)
+        return (self.filter(user=user, deleted=False)
+                    .values(*group_fields)
+                    .annotate(count=Count('id'), total=Sum('price_value'))
+                    .order_by(*group_fields))
+
+    def cached_price_summary(self, user, group_by, to_json):
+        """
+        The json price summary of the user's assets, as returned by
+        `to_json(price_summary(user, group_by))`.
+
+        The result is cached until one of the user's assets is saved or
+        deleted.
+        """
+        key = _summary_cache_key(user.id, group_by)
+        json_summary = cache.get(key)
+        if json_summary is None:
+            json_summary = to_json(self.price_summary(user, group_by))
+            cache.set(key, json_summary, SUMMARY_CACHE_TIMEOUT)
+        return json_summary
+
+    def invalidate_price_summary(self, user_id):
+        cache.delete_many([
+            _summary_cache_key(user_id, group_by)
+            for group_by in _summary_groupings()
+        ])
+
 
 def _asset_image_upload_location(asset, filename):
     return 'assets/{0}/images/{1}'.format(asset.id, filename)
@@ -55,6 +215,12 @@ class Asset(ModelBase):
     ## The ISO currency code of the price.
     price_currency_code = models.CharField(max_length=3)
 
+    ## The price converted to PRICE_BASE_CURRENCY, as an integer, so that
+    ## assets with prices in different currencies can be ordered and
+    ## filtered by price in the database.
+    ## None if the price is not set or could not be converted.
+    price_base_value = models.BigIntegerField(null=True, db_index=True)
+
     date_purchased = models.DateField(null=True)
 
     image = models.FileField(
@@ -66,6 +232,17 @@ class Asset(ModelBase):
 
     deleted = models.BooleanField(default=False)
 
+    ## Pages of a user's assets are fetched by seeking to a (created, id)
+    ## position (see `common.models.keyset_page`), on a partial index of the
+    ## (user, created, id) of the assets which have not been deleted.
+    ## The partial indexes are created by migration 0012, since they cannot
+    ## be declared in the model's Meta.
+
+    class Meta:
+        ## The changes feed seeks to an (updated, id) position in all of
+        ## the user's assets, including the deleted assets
+        index_together = [('user', 'updated', 'id')]
+
     def _get_price(self):
         if not self.price_currency_code:
             return None
@@ -76,6 +253,11 @@ class Asset(ModelBase):
             raise TypeError('Not a money amount')
         self.price_currency_code = value.code
         self.price_value = value.value
+        try:
+            self.price_base_value = value.convert_to(PRICE_BASE_CURRENCY).value
+        except CurrencyException:
+            ## Filled in by the next `refresh_price_base_values`
+            self.price_base_value = None
 
     price = property(_get_price, _set_price)
 
@@ -99,3 +281,28 @@ class AssetAttachement(ModelBase):
     upload_date = models.DateField(auto_now=True)
 
 
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def _invalidate_price_summary(sender, instance, **kwargs):
+    Asset.objects.invalidate_price_summary(instance.user_id)
+
+
+@receiver(post_save, sender=Asset)
+def _update_search_index(sender, instance, **kwargs):
+    from . import search
+    search.update_asset(instance)
+
+
+@receiver(post_delete, sender=Asset)
+def _remove_from_search_index(sender, instance, **kwargs):
+    from . import search
+    search.remove_asset(instance)
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def _publish_asset_change(sender, instance, **kwargs):
+    ## Published once the change is committed, without waiting for the bus
+    events.publish_after_commit(
+        asset_events_channel(instance.user_id), instance.id.hex,
+        using=kwargs['using'])
@@ -1,6 +1,11 @@
 
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db.models import Q
+
 from ext_utils.json.resources import *
 
+from common.currency import MoneyAmount
 from common.resources import MoneyAmountResource
 
 
@@ -8,21 +13,29 @@ class AssetResource(ModelResource):
     KIND = 'assets#asset'
 
     id = UUIDResource()
-    user_id = IntegerResource()
-    qr_code = StringResource()
+    user_id = IntegerResource(columns=('user_id',))
+    qr_code = StringResource(columns=('id',))
     name = StringResource()
     description = StringResource()
     use = StringResource()
     model_number = StringResource()
-    price = MoneyAmountResource(required=False)
+    vendor = StringResource()
+    price = MoneyAmountResource(
+        required=False,
+        columns=('price_value', 'price_currency_code'),
+        ## Prices in different currencies are ordered by their value
+        ## in the base currency
+        order_columns=('price_base_value',)
+    )
     date_purchased = DateTimeResource(required=False)
 
-    image_src = StringResource(required=False)
+    image_src = StringResource(required=False, columns=('image',))
     ## The resource to upload the file
-    image = FileResource(required=False)
+    image = FileResource(required=False, columns=())
 
     def get_user_id(self, model):
-        return model.user.id
+        ## Read the foreign key directly, rather than loading the user
+        return model.user_id
 
     def get_image_src(self, model):
         if not model.image:
@@ -32,15 +45,151 @@ class AssetResource(ModelResource):
     def get_image(self, model):
         return None
 
+    def get_qr_code_from_columns(self, id):
+        ## Same as `Asset.qr_code`
+        return '{0}/asset/{1}'.format(settings.HOST_URI, id.hex)
+
+    def get_price_from_columns(self, price_value, price_currency_code):
+        if not price_currency_code or price_value is None:
+            return None
+        return MoneyAmount(price_currency_code, price_value)
+
+    def get_image_src_from_columns(self, image):
+        ## The column holds the name of the file in the default storage
+        if not image:
+            return None
+        return default_storage.url(image)
+
+    def get_image_from_columns(self):
+        return None
+
+    def filter_price(self, lookup, value):
+        ## Prices are only compared with prices in the same currency,
+        ## so that the compiled filter does not depend on the exchange rates
+        amount = self._resource_fields['price'].parse_filter_value(value)
+        if amount is None:
+            raise ValueError('Expected a price: {0}'.format(value))
+        return Q(price_currency_code=amount.code,
+                 **{'price_value__{0}'.format(lookup): amount.value})
+
 
 class AssetListResource(ModelResource):
     KIND = 'assets#assets'
 
-    next_page_token = UUIDResource()
+    ## An opaque token for the position of the last asset in the page,
+    ## omitted from the last page
+    next_page_token = StringResource(required=False)
     user_id = IntegerResource()
     assets = ListResource(item_resource=AssetResource())
 
 
+class AssetSearchResource(ModelResource):
+    KIND = 'assets#search'
+
+    user_id = IntegerResource()
+    q = StringResource()
+    next_page_token = StringResource(required=False)
+    assets = ListResource(item_resource=AssetResource())
+
+
+class AssetChangeResource(AssetResource):
+    """
+    An asset in the changes feed, which includes deleted assets
+    """
+    KIND = 'assets#change'
+
+    updated = DateTimeResource()
+    deleted = BoolResource()
+
+
+class AssetChangesResource(ModelResource):
+    KIND = 'assets#changes'
+
+    user_id = IntegerResource()
+    ## An opaque token for the position of the last change in the feed
+    sync_token = StringResource(required=False)
+    has_more = BoolResource()
+    assets = ListResource(item_resource=AssetChangeResource())
+
+
+class AssetEventsResource(ModelResource):
+    """
+    The ids of the user's assets which have changed while the
+    request was waiting
+    """
+    KIND = 'assets#events'
+
+    user_id = IntegerResource()
+    asset_ids = ListResource(item_resource=StringResource())
+
+
+class AssetSummaryGroupResource(ModelResource):
+    """
+    The assets with prices in a single currency (and in the summary
+    grouped by the same fields), serialized from the rows of
+    `AssetManager.price_summary`
+    """
+    KIND = 'assets#summaryGroup'
+
+    currency_code = StringResource(required=False)
+    use = StringResource(required=False)
+    vendor = StringResource(required=False)
+    count = IntegerResource()
+    total = MoneyAmountResource(required=False)
+
+    def get_currency_code(self, row):
+        return row['price_currency_code'] or None
+
+    def get_use(self, row):
+        return row.get('use')
+
+    def get_vendor(self, row):
+        return row.get('vendor')
+
+    def get_total(self, row):
+        if not row['price_currency_code'] or row['total'] is None:
+            return None
+        return MoneyAmount(row['price_currency_code'], row['total'])
+
+
+class AssetSummaryResource(ModelResource):
+    KIND = 'assets#summary'
+
+    user_id = IntegerResource()
+    group_by = ListResource(item_resource=StringResource())
+    count = IntegerResource()
+    groups = ListResource(item_resource=AssetSummaryGroupResource())
+
+
+class AssetValuationItemResource(ModelResource):
+    KIND = 'assets#valuationItem'
+
+    id = UUIDResource()
+    use = StringResource()
+    method = StringResource()
+    date_purchased = DateTimeResource()
+    price = MoneyAmountResource()
+    book_value = MoneyAmountResource()
+
+
+class AssetValuationTotalResource(ModelResource):
+    KIND = 'assets#valuationTotal'
+
+    currency_code = StringResource()
+    count = IntegerResource()
+    price = MoneyAmountResource()
+    book_value = MoneyAmountResource()
+
+
+class AssetValuationResource(ModelResource):
+    KIND = 'assets#valuation'
+
+    user_id = IntegerResource()
+    as_of = DateTimeResource()
+    totals = ListResource(item_resource=AssetValuationTotalResource())
+    assets = ListResource(item_resource=AssetValuationItemResource())
+
+
 class AssetAttachmentResource(ModelResource):
     KIND = 'asset#attachment'
 
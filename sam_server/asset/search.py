@@ -0,0 +1,291 @@
+"""
+Full text search over the name, description, vendor and model number
+of a user's assets.
+
+The index is chosen by settings.ASSET_SEARCH_INDEX:
+    'postgres' (the default)
+        The searched fields of each asset are indexed in the
+        `search_vector` tsvector column of the asset table (added by
+        migration 0013, with a GIN index of the assets which have not
+        been deleted). The column is updated whenever an asset is saved.
+    'inprocess'
+        The fields are indexed by an in process inverted index, which is
+        built from the asset table the first time it is searched and is
+        updated whenever an asset is saved. Only suitable for a single
+        process server, as other processes' saves are not indexed.
+
+Results are ranked by the weight of the matched fields, and are
+paginated by (rank, id) positions.
+"""
+from collections import defaultdict
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+from .models import Asset
+
+## The searched fields of an asset, and the weight of each field
+## in the rank of a result (the postgres weight label, and the
+## multiplier of the count of the matched terms in the in process index)
+SEARCH_FIELDS = (
+    ('name', 'A', 8),
+    ('model_number', 'B', 4),
+    ('vendor', 'B', 4),
+    ('description', 'C', 2),
+)
+
+## The postgres text search configuration used to parse the searched fields
+SEARCH_CONFIG = getattr(settings, 'ASSET_SEARCH_CONFIG', 'english')
+
+## Ranks are scaled to integers, so that they can be compared exactly
+## when seeking to the position of a page
+RANK_SCALE = 1000000
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """
+    The lower case words of the text
+    """
+    return _WORD.findall(text.lower()) if text else []
+
+
+class SearchIndex(object):
+    def update(self, asset):
+        """
+        Index the searched fields of the asset (or remove the asset from
+        the index, if it has been deleted)
+        """
+        raise NotImplementedError('SearchIndex.update')
+
+    def remove(self, asset):
+        raise NotImplementedError('SearchIndex.remove')
+
+    def rebuild(self, user=None):
+        """
+        Index all of the assets (or all the assets of the user).
+        Returns the number of indexed assets.
+        """
+        raise NotImplementedError('SearchIndex.rebuild')
+
+    def search(self, user, query, page_size, after=None):
+        """
+        The page of the user's (non deleted) assets which match all the words
+        of the query, after the (rank, id) position `after`, ordered by
+        descending rank and then by id.
+
+        Returns a tuple (results, next_position), where `results` is a list
+        of (id, rank) pairs and next_position is None on the last page.
+        """
+        raise NotImplementedError('SearchIndex.search')
+
+
+def _paginate(results, page_size):
+    if len(results) <= page_size:
+        return (results, None)
+    results = results[:page_size]
+    asset_id, rank = results[-1]
+    return (results, (rank, asset_id))
+
+
+class PostgresSearchIndex(SearchIndex):
+    """
+    Indexes the searched fields in the `search_vector` column of the
+    asset table, searched with a GIN index
+    """
+    def __init__(self, config=SEARCH_CONFIG):
+        self.config = config
+        self.table = connection.ops.quote_name(Asset._meta.db_table)
+
+    def _vector_sql(self):
+        ## setweight(to_tsvector(config, coalesce(name, '')), 'A') || ...
+        return ' || '.join(
+            "setweight(to_tsvector(%s, coalesce({0}, '')), '{1}')"
+            .format(connection.ops.quote_name(field), weight)
+            for field, weight, _ in SEARCH_FIELDS
+        )
+
+    def _update(self, where, params):
+        sql = ('UPDATE {0} SET search_vector = {1} WHERE {2}'
+               .format(self.table, self._vector_sql(), where))
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.config] * len(SEARCH_FIELDS) + params)
+            return cursor.rowcount
+
+    def update(self, asset):
+        ## Deleted assets are excluded from the GIN index by its predicate
+        self._update('id = %s', [asset.id.hex])
+
+    def remove(self, asset):
+        ## The row has been deleted, and its index entries with it
+        pass
+
+    def rebuild(self, user=None):
+        if user is None:
+            return self._update('TRUE', [])
+        return self._update('user_id = %s', [user.id])
+
+    def search(self, user, query, page_size, after=None):
+        sql = (
+            'SELECT id, rank FROM ('
+            '  SELECT id, (ts_rank(search_vector, query) * %s)::bigint AS rank'
+            '  FROM {0}, plainto_tsquery(%s, %s) query'
+            '  WHERE user_id = %s AND deleted = false'
+            '  AND search_vector @@ query'
+            ') ranked'
+            .format(self.table))
+        params = [RANK_SCALE, self.config, query, user.id]
+        if after is not None:
+            rank, asset_id = after
+            sql += ' WHERE rank < %s OR (rank = %s AND id > %s)'
+            params += [rank, rank, asset_id.hex]
+        sql += ' ORDER BY rank DESC, id LIMIT %s'
+        params.append(page_size + 1)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            results = [(Asset._meta.pk.to_python(asset_id), rank)
+                       for asset_id, rank in cursor.fetchall()]
+        return _paginate(results, page_size)
+
+
+class InvertedIndex(SearchIndex):
+    """
+    An in process inverted index of the searched fields, mapping each
+    word to the ids of the assets containing it and the weighted number
+    of times the word appears in the asset.
+
+    The index is built from the asset table the first time it is
+    searched, and is updated whenever an asset is saved.
+    """
+    def __init__(self):
+        self._postings = defaultdict(dict)
+        ## The user and words of each of the indexed assets,
+        ## so that the asset can be removed from the postings
+        self._documents = dict()
+        self._built = False
+
+    def _index(self, asset_id, user_id, field_values):
+        self._remove(asset_id)
+        weights = defaultdict(int)
+        for (_, _, weight), value in zip(SEARCH_FIELDS, field_values):
+            for word in tokenize(value):
+                weights[word] += weight
+        for word, weight in weights.items():
+            self._postings[word][asset_id] = weight
+        self._documents[asset_id] = (user_id, tuple(weights))
+
+    def _remove(self, asset_id):
+        try:
+            _, words = self._documents.pop(asset_id)
+        except KeyError:
+            return
+        for word in words:
+            postings = self._postings[word]
+            del postings[asset_id]
+            if not postings:
+                del self._postings[word]
+
+    def update(self, asset):
+        if asset.deleted:
+            self._remove(asset.id)
+            return
+        self._index(asset.id, asset.user_id, [
+            getattr(asset, field) for field, _, _ in SEARCH_FIELDS
+        ])
+
+    def remove(self, asset):
+        self._remove(asset.id)
+
+    def rebuild(self, user=None):
+        assets = Asset.objects.filter(deleted=False)
+        if user is not None:
+            assets = assets.filter(user=user)
+            for asset_id, (user_id, _) in list(self._documents.items()):
+                if user_id == user.id:
+                    self._remove(asset_id)
+        else:
+            self._postings.clear()
+            self._documents.clear()
+        columns = ('id', 'user_id') + tuple(f for f, _, _ in SEARCH_FIELDS)
+        num_indexed = 0
+        for row in assets.values_list(*columns).iterator():
+            self._index(row[0], row[1], row[2:])
+            num_indexed += 1
+        self._built = True
+        return num_indexed
+
+    def search(self, user, query, page_size, after=None):
+        if not self._built:
+            self.rebuild()
+        words = set(tokenize(query))
+        if not words:
+            return ([], None)
+        ## Intersect the postings of the words, from the rarest word
+        postings = sorted((self._postings.get(word, {}) for word in words),
+                          key=len)
+        ranks = {
+            asset_id: weight for asset_id, weight in postings[0].items()
+            if self._documents[asset_id][0] == user.id
+        }
+        for word_postings in postings[1:]:
+            ranks = {asset_id: rank + word_postings[asset_id]
+                     for asset_id, rank in ranks.items()
+                     if asset_id in word_postings}
+        results = sorted(ranks.items(),
+                         key=lambda result: (-result[1], result[0].hex))
+        if after is not None:
+            rank, asset_id = after
+            after_key = (-rank, asset_id.hex)
+            results = [
+                (result_id, result_rank) for result_id, result_rank in results
+                if (-result_rank, result_id.hex) > after_key
+            ]
+        return _paginate(results[:page_size + 1], page_size)
+
+
+_search_index = None
+
+_SEARCH_INDEXES = {
+    'postgres': PostgresSearchIndex,
+    'inprocess': InvertedIndex,
+}
+
+
+def get_search_index():
+    """
+    The search index of the assets, configured by settings.ASSET_SEARCH_INDEX
+    """
+    global _search_index
+    if _search_index is None:
+        name = getattr(settings, 'ASSET_SEARCH_INDEX', 'postgres')
+        try:
+            index_cls = _SEARCH_INDEXES[name]
+        except KeyError:
+            raise ImproperlyConfigured(
+                'Unknown asset search index: {0}'.format(name))
+        _search_index = index_cls()
+    return _search_index
+
+
+def set_search_index(search_index):
+    """
+    Replace the search index. If `None`, the index configured in
+    settings is used.
+    """
+    global _search_index
+    _search_index = search_index
+
+
+def update_asset(asset):
+    get_search_index().update(asset)
+
+
+def remove_asset(asset):
+    get_search_index().remove(asset)
+
+
+def search_assets(user, query, page_size, after=None):
+    return get_search_index().search(user, query, page_size, after)
@@ -1,9 +1,14 @@
-from django.test import TestCase
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import override_settings
 from django.conf import settings
 
+from common import events, exchange
 from common.currency import MoneyAmount
 from authentication.models import User
-from asset.models import Asset
+from common.models import (clean_position, decode_position_token,
+                           encode_position_token, keyset_page)
+from asset.models import Asset, asset_events_channel
 
 class ModelTests(TestCase):
     def setUp(self):
@@ -26,6 +31,51 @@ class ModelTests(TestCase):
         self.asset.price = MoneyAmount('USD', 400)
         self.assertEqual(self.asset.price, MoneyAmount('USD', 400))
 
+    def test_price_base_value(self):
+        exchange.set_rate_source(exchange.DictRateSource('USD', {'AUD': '1.25'}))
+        try:
+            self.asset.price = MoneyAmount('AUD', 500)
+            self.assertEqual(self.asset.price_base_value, 400)
+            self.asset.save()
+
+            exchange.set_rate_source(exchange.DictRateSource('USD', {'AUD': '2'}))
+            Asset.objects.refresh_price_base_values()
+            self.assertEqual(
+                Asset.objects.get(id=self.asset.id).price_base_value, 250)
+
+            ## No exchange rate for the currency
+            self.asset.price = MoneyAmount('EUR', 500)
+            self.assertIsNone(self.asset.price_base_value)
+
+            ## A malformed rate does not prevent the price being set
+            exchange.set_rate_source(exchange.DictRateSource('USD', {'AUD': 'abc'}))
+            self.asset.price = MoneyAmount('AUD', 500)
+            self.assertIsNone(self.asset.price_base_value)
+        finally:
+            exchange.set_rate_source(None)
+
+    def test_refresh_price_base_values_rounding(self):
+        ## The bulk refresh rounds the same way as setting the price
+        exchange.set_rate_source(exchange.DictRateSource('USD', {'AUD': '2'}))
+        try:
+            prices = [1, 3, 5, 7, 10, -3, -5]
+            set_values = dict()
+            for price in prices:
+                asset = Asset(user=self.user, name='asset {0}'.format(price))
+                asset.price = MoneyAmount('AUD', price)
+                asset.save()
+                set_values[asset.id] = asset.price_base_value
+            self.assertEqual(sorted(set_values.values()),
+                             [-2, -2, 0, 2, 2, 4, 5])
+
+            Asset.objects.refresh_price_base_values(user=self.user)
+            refreshed_values = dict(
+                Asset.objects.filter(id__in=set_values)
+                             .values_list('id', 'price_base_value'))
+            self.assertEqual(refreshed_values, set_values)
+        finally:
+            exchange.set_rate_source(None)
+
     def test_absolute_url(self):
         self.assertEqual(
             self.asset.get_absolute_url(),
@@ -39,3 +89,193 @@ class ModelTests(TestCase):
             settings.HOST_URI + self.asset.get_absolute_url()
         )
 
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+})
+class PriceSummaryTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_basic_user(
+            username='test_user',
+            email='user@example.com',
+            password='password'
+        )
+        Asset(user=self.user, name='asset1', vendor='acme',
+              price=MoneyAmount('USD', 400)).save()
+        Asset(user=self.user, name='asset2', vendor='other',
+              price=MoneyAmount('USD', 100)).save()
+        Asset(user=self.user, name='asset3', vendor='acme',
+              price=MoneyAmount('AUD', 250)).save()
+        Asset(user=self.user, name='deleted', vendor='acme', deleted=True,
+              price=MoneyAmount('AUD', 1000)).save()
+
+    def tearDown(self):
+        Asset.objects.filter(user=self.user).delete()
+        self.user.delete()
+
+    def test_price_summary(self):
+        self.assertEqual(Asset.objects.price_summary(self.user), [
+            {'price_currency_code': 'AUD', 'count': 1, 'total': 250},
+            {'price_currency_code': 'USD', 'count': 2, 'total': 500},
+        ])
+        self.assertEqual(Asset.objects.price_summary(self.user, ('vendor',)), [
+            {'price_currency_code': 'AUD', 'vendor': 'acme', 'count': 1, 'total': 250},
+            {'price_currency_code': 'USD', 'vendor': 'acme', 'count': 1, 'total': 400},
+            {'price_currency_code': 'USD', 'vendor': 'other', 'count': 1, 'total': 100},
+        ])
+        with self.assertRaises(ValueError):
+            Asset.objects.price_summary(self.user, ('name',))
+
+    def test_cached_price_summary(self):
+        summaries = []
+
+        def to_json(summary):
+            summaries.append(summary)
+            return summary
+
+        Asset.objects.cached_price_summary(self.user, (), to_json)
+        Asset.objects.cached_price_summary(self.user, (), to_json)
+        self.assertEqual(len(summaries), 1)
+
+        ## Saving an asset invalidates the summary
+        Asset(user=self.user, name='asset4', price=MoneyAmount('AUD', 50)).save()
+        summary = Asset.objects.cached_price_summary(self.user, (), to_json)
+        self.assertEqual(len(summaries), 2)
+        self.assertEqual(summary[0]['total'], 300)
+
+
+class KeysetPageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_basic_user(
+            username='test_user',
+            email='user@example.com',
+            password='password'
+        )
+        self.assets = [
+            Asset.objects.create(user=self.user, name='asset{0}'.format(i))
+            for i in range(5)
+        ]
+
+    def test_pages(self):
+        user_assets = Asset.objects.filter(user=self.user)
+        columns = ('id', 'name', 'created')
+        seen = []
+        after = None
+        while True:
+            rows, after = keyset_page(user_assets, ('created',), columns, 2, after)
+            self.assertLessEqual(len(rows), 2)
+            seen.extend(row[0] for row in rows)
+            if after is None:
+                break
+            ## The position survives a round trip through a page token
+            after = decode_position_token(encode_position_token(*after))
+        expected = [asset.id for asset in
+                    sorted(self.assets, key=lambda a: (a.created, a.id.hex))]
+        self.assertEqual(seen, expected)
+
+    def test_clean_position(self):
+        asset = self.assets[0]
+        position = clean_position(
+            Asset, ('-created',), (asset.created, asset.id.hex))
+        self.assertEqual(position, (asset.created, asset.id))
+        for position in [(), (asset.created,), ('abc', asset.id),
+                         (None, asset.id), (asset.created, 'def'),
+                         (asset.created, asset.id, 1)]:
+            with self.assertRaises(ValueError):
+                clean_position(Asset, ('-created',), position)
+        ## Nullable fields accept None
+        self.assertEqual(
+            clean_position(Asset, ('price_base_value',), (None, asset.id)),
+            (None, asset.id))
+
+    def test_changes_since(self):
+        user_assets = Asset.objects.filter(user=self.user)
+        columns = ('id', 'updated')
+        rows, _ = keyset_page(user_assets, ('updated',), columns, 100)
+        self.assertEqual(len(rows), len(self.assets))
+        since = (rows[-1][1], rows[-1][0])
+
+        ## Deleting an asset is a change to the asset
+        asset = self.assets[0]
+        asset.deleted = True
+        asset.save()
+        rows, next_position = keyset_page(
+            user_assets, ('updated',), columns, 100, since)
+        self.assertEqual([row[0] for row in rows], [asset.id])
+        self.assertIsNone(next_position)
+
+
+class AssetEventsTests(TransactionTestCase):
+    ## Changes are published when a transaction commits, which never
+    ## happens in a `TestCase`
+
+    def setUp(self):
+        self.bus = events.InProcessEventBus()
+        events.set_event_bus(self.bus)
+        self.user = User.objects.create_basic_user(
+            username='test_user',
+            email='user@example.com',
+            password='password'
+        )
+        self.channel = asset_events_channel(self.user.id)
+
+    def tearDown(self):
+        events.set_event_bus(None)
+        self.user.delete()
+
+    def test_publish_on_save(self):
+        ## Outside of a request and a transaction, each save commits
+        with self.bus.subscribe([self.channel]) as subscription:
+            asset = Asset(user=self.user, name='test_asset')
+            asset.save()
+            asset.deleted = True
+            asset.save()
+            self.assertEqual(subscription.wait(0), [
+                (self.channel, asset.id.hex), (self.channel, asset.id.hex)
+            ])
+
+    def test_publish_after_commit(self):
+        with self.bus.subscribe([self.channel]) as subscription:
+            with transaction.atomic():
+                asset = Asset(user=self.user, name='test_asset')
+                asset.save()
+                self.assertEqual(subscription.wait(0), [])
+            self.assertEqual(subscription.wait(0), [
+                (self.channel, asset.id.hex)
+            ])
+
+    def test_rollback(self):
+        with self.bus.subscribe([self.channel]) as subscription:
+            with self.assertRaises(ValueError):
+                with transaction.atomic():
+                    Asset(user=self.user, name='test_asset').save()
+                    raise ValueError('Rolled back')
+            self.assertEqual(subscription.wait(0), [])
+            self.assertFalse(Asset.objects.filter(user=self.user).exists())
+
+    def test_savepoint_rollback(self):
+        with self.bus.subscribe([self.channel]) as subscription:
+            with transaction.atomic():
+                asset = Asset(user=self.user, name='test_asset')
+                asset.save()
+                try:
+                    with transaction.atomic():
+                        Asset(user=self.user, name='rolled_back').save()
+                        raise ValueError('Rolled back')
+                except ValueError:
+                    pass
+            ## Only the change which was committed is published
+            self.assertEqual(subscription.wait(0), [
+                (self.channel, asset.id.hex)
+            ])
+
+    def test_publish_failure(self):
+        class FailingEventBus(events.EventBus):
+            def publish(self, channel, message):
+                raise events.EventBusError('Not connected')
+        events.set_event_bus(FailingEventBus())
+        ## The asset is saved, even though the change is not published
+        asset = Asset(user=self.user, name='test_asset')
+        with self.assertLogs('common.events', 'WARNING'):
+            asset.save()
+        self.assertTrue(Asset.objects.filter(id=asset.id).exists())
@@ -0,0 +1,86 @@
+import datetime
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+
+from common.models import keyset_queryset
+from common.query_plans import explain, index_names, sequential_scans
+from authentication.models import User
+from asset.models import Asset, _summary_groupings
+from asset import valuation
+
+## The number of seeded users, and the number of live and deleted
+## assets of each user. Large enough that the planner prefers an index
+## to scanning the whole table for the assets of a single user.
+NUM_USERS = 20
+NUM_ASSETS = 250
+NUM_DELETED_ASSETS = 250
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql',
+                     'Query plans are only checked on postgresql')
+class QueryPlanTests(TestCase):
+    """
+    Checks that none of the hot queries of the asset API fall back to
+    a sequential scan of the asset table
+    """
+    def setUp(self):
+        self.users = [
+            User.objects.create_basic_user(
+                username='user{0}'.format(i),
+                email='user{0}@example.com'.format(i),
+                password='password')
+            for i in range(NUM_USERS)
+        ]
+        assets = []
+        for user in self.users:
+            for i in range(NUM_ASSETS + NUM_DELETED_ASSETS):
+                asset = Asset(
+                    user=user,
+                    name='asset{0}'.format(i),
+                    use=['computer', 'vehicle', 'furniture'][i % 3],
+                    vendor='vendor{0}'.format(i % 7),
+                    date_purchased=datetime.date(2014, 1, 1) +
+                        datetime.timedelta(days=i),
+                    deleted=i >= NUM_ASSETS)
+                asset.price_currency_code = ['USD', 'AUD'][i % 2]
+                asset.price_value = 100 * i
+                assets.append(asset)
+        Asset.objects.bulk_create(assets)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE asset_asset')
+        self.user = self.users[0]
+        self.asset = Asset.objects.filter(user=self.user).first()
+
+    def assertNoSequentialScan(self, queryset):
+        plan = explain(queryset)
+        self.assertEqual(
+            sequential_scans(plan, Asset._meta.db_table), [],
+            'Sequential scan of the asset table in the plan {0}'.format(plan))
+        return plan
+
+    def user_assets(self):
+        return Asset.objects.filter(user=self.user, deleted=False)
+
+    def test_get_asset(self):
+        self.assertNoSequentialScan(Asset.objects.filter(id=self.asset.id))
+
+    def test_list_first_page(self):
+        plan = self.assertNoSequentialScan(
+            keyset_queryset(self.user_assets(), ('created',))[:100])
+        self.assertIn('asset_asset_user_created_id_live', index_names(plan))
+
+    def test_list_next_page(self):
+        after = (self.asset.created, self.asset.id)
+        plan = self.assertNoSequentialScan(
+            keyset_queryset(self.user_assets(), ('created',), after)[:100])
+        self.assertIn('asset_asset_user_created_id_live', index_names(plan))
+
+    def test_price_summary(self):
+        for group_by in _summary_groupings():
+            self.assertNoSequentialScan(
+                Asset.objects.price_summary_queryset(self.user, group_by))
+
+    def test_valuation(self):
+        self.assertNoSequentialScan(valuation.valuation_queryset(self.user))
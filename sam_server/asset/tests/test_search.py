@@ -0,0 +1,100 @@
+from django.test import TestCase
+from django.core.exceptions import ImproperlyConfigured
+
+from authentication.models import User
+from asset.models import Asset
+from asset import search
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_basic_user(
+            username='test_user',
+            email='user@example.com',
+            password='password'
+        )
+        self.other_user = User.objects.create_basic_user(
+            username='other_user',
+            email='other@example.com',
+            password='password'
+        )
+        self.laptop = self.create_asset(
+            name='Sony laptop', vendor='Sony', model_number='VPC-1',
+            description='A silver laptop')
+        self.television = self.create_asset(
+            name='Television', vendor='Sony', model_number='KDL-40',
+            description='Living room')
+        self.bag = self.create_asset(
+            name='Bag', vendor='Acme', model_number='B1',
+            description='A bag for the sony laptop')
+        self.create_asset(user=self.other_user, name='Sony camera')
+
+    def create_asset(self, user=None, **kwargs):
+        return Asset.objects.create(user=user or self.user, **kwargs)
+
+    def search_all(self, query, page_size=100):
+        results = []
+        after = None
+        while True:
+            page, after = search.search_assets(
+                self.user, query, page_size, after)
+            results.extend(asset_id for asset_id, _ in page)
+            if after is None:
+                return results
+
+    def check_search(self):
+        ## Matches in the name are ranked above matches in the description
+        self.assertEqual(self.search_all('laptop'),
+                         [self.laptop.id, self.bag.id])
+        ## All of the words must match
+        self.assertEqual(self.search_all('sony laptop'),
+                         [self.laptop.id, self.bag.id])
+        self.assertEqual(set(self.search_all('sony')),
+                         {self.laptop.id, self.television.id, self.bag.id})
+        self.assertEqual(self.search_all('kdl'), [self.television.id])
+        self.assertEqual(self.search_all('camera'), [])
+        ## The pages of results match the full result
+        self.assertEqual(self.search_all('sony', page_size=1),
+                         self.search_all('sony'))
+
+        ## The index is updated when an asset is saved
+        self.television.description = 'Living room sony laptop'
+        self.television.save()
+        self.assertIn(self.television.id, self.search_all('laptop'))
+        self.television.deleted = True
+        self.television.save()
+        self.assertNotIn(self.television.id, self.search_all('sony'))
+
+    def test_search(self):
+        self.check_search()
+
+    def test_inverted_index(self):
+        search.set_search_index(search.InvertedIndex())
+        try:
+            self.check_search()
+        finally:
+            search.set_search_index(None)
+
+    def test_search_index_setting(self):
+        try:
+            with self.settings(ASSET_SEARCH_INDEX='inprocess'):
+                search.set_search_index(None)
+                self.assertIsInstance(search.get_search_index(),
+                                      search.InvertedIndex)
+            with self.settings(ASSET_SEARCH_INDEX='carrier_pigeon'):
+                search.set_search_index(None)
+                with self.assertRaises(ImproperlyConfigured):
+                    search.get_search_index()
+        finally:
+            search.set_search_index(None)
+
+    def test_rebuild(self):
+        Asset.objects.filter(id=self.bag.id).update(name='Backpack')
+        search_index = search.get_search_index()
+        search_index.rebuild(self.user)
+        self.assertEqual(self.search_all('backpack'), [self.bag.id])
+
+    def test_tokenize(self):
+        self.assertEqual(search.tokenize('Sony VPC-1, (silver)'),
+                         ['sony', 'vpc', '1', 'silver'])
+        self.assertEqual(search.tokenize(None), [])
@@ -0,0 +1,70 @@
+import datetime
+import uuid
+
+from django.test import TestCase
+
+from common.currency import MoneyAmount
+from ..valuation import (value_assets, iter_csv, depreciation_method,
+                         StraightLine, DecliningBalance)
+
+
+class DepreciationTest(TestCase):
+    def test_straight_line(self):
+        method = StraightLine(years=2)
+        self.assertEqual(method.factor(-1), (1, 1))
+        self.assertEqual(method.factor(365), (365, 730))
+        self.assertEqual(method.factor(1000), (0, 1))
+
+    def test_declining_balance(self):
+        method = DecliningBalance(rate='0.25')
+        self.assertEqual(method.factor(364), (1, 1))
+        self.assertEqual(method.factor(365 * 2), (9, 16))
+
+    def test_depreciation_method(self):
+        method = depreciation_method({'method': 'straight_line', 'years': 5})
+        self.assertIsInstance(method, StraightLine)
+        with self.assertRaises(ValueError):
+            depreciation_method({'method': 'sum_of_years'})
+
+
+class ValuationTest(TestCase):
+    def setUp(self):
+        self.methods = {
+            'default': StraightLine(years=5),
+            'vehicle': DecliningBalance(rate='0.25'),
+        }
+        self.ids = [uuid.uuid4() for _ in range(3)]
+        self.rows = [
+            (self.ids[0], 'Vehicle', 10000, 'AUD', datetime.date(2013, 1, 1)),
+            (self.ids[1], 'tools', 36500, 'USD', datetime.date(2014, 1, 1)),
+            (self.ids[2], 'tools', 500, 'USD', None),
+        ]
+        self.valuation = value_assets(
+            self.rows, datetime.date(2015, 1, 1), self.methods)
+
+    def test_book_values(self):
+        self.assertEqual(self.valuation.ids, self.ids[:2])
+        self.assertEqual(self.valuation.methods,
+                         ['declining_balance', 'straight_line'])
+        self.assertEqual(self.valuation.book_values.to_amounts(), [
+            MoneyAmount('AUD', 5625),
+            MoneyAmount('USD', 29200),
+        ])
+
+    def test_totals(self):
+        self.assertEqual(self.valuation.totals(), [
+            {'currency_code': 'AUD', 'count': 1,
+             'price': MoneyAmount('AUD', 10000),
+             'book_value': MoneyAmount('AUD', 5625)},
+            {'currency_code': 'USD', 'count': 1,
+             'price': MoneyAmount('USD', 36500),
+             'book_value': MoneyAmount('USD', 29200)},
+        ])
+
+    def test_csv(self):
+        lines = list(iter_csv(self.valuation))
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(
+            lines[1],
+            '{0},Vehicle,declining_balance,2013-01-01,AUD,100.00,56.25\r\n'
+            .format(self.ids[0].hex))
@@ -1,10 +1,15 @@
 import json
 from operator import itemgetter
+import uuid
+
 from django.test import TestCase, RequestFactory
 
 from authentication.models import User
+from common import events
+from common.models import encode_position_token
 
-from ..models import Asset
+from ..models import Asset, asset_events_channel
+from .. import views
 
 
 class ViewsTest(TestCase):
@@ -72,3 +77,155 @@ class ViewsTest(TestCase):
 
 
 
+
+
+class PageTokenTest(TestCase):
+    """
+    Invalid page tokens and page sizes are rejected with a 400 response
+    """
+    def setUp(self):
+        self.user = User.objects.create_basic_user(
+            username='test_user',
+            email='user@example.com',
+            password='password'
+        )
+        self.client.login(username='test_user', password='password')
+        for name in ['Sony laptop', 'Sony television', 'Sony camera']:
+            Asset.objects.create(user=self.user, name=name)
+
+    def tearDown(self):
+        self.user.delete()
+
+    def get_json(self, url, **params):
+        params.setdefault('format', 'json')
+        response = self.client.get(url, params)
+        return response.status_code, json.loads(response.content.decode('utf-8'))
+
+    def assertBadRequest(self, url, **params):
+        status, body = self.get_json(url, **params)
+        self.assertEqual(status, 400)
+        self.assertIn('error', body)
+
+    def test_list_page_token(self):
+        ids = []
+        page_token = ''
+        while True:
+            status, body = self.get_json(
+                '/asset', page_size=2, page_token=page_token)
+            self.assertEqual(status, 200)
+            ids.extend(asset['id'] for asset in body['assets'])
+            page_token = body.get('next_page_token')
+            if not page_token:
+                break
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(len(set(ids)), 3)
+
+    def test_list_invalid_page_size(self):
+        for page_size in ['0', '-1', 'abc', '1.5']:
+            self.assertBadRequest('/asset', page_size=page_size)
+
+    def test_list_invalid_page_token(self):
+        for page_token in ['!!!!', 'abc', encode_position_token()[:-1]]:
+            self.assertBadRequest('/asset', page_token=page_token)
+        asset_id = uuid.uuid4()
+        for position in [(), ('abc', asset_id), (None, asset_id),
+                         (1, asset_id), (self.created(), 'def'),
+                         (self.created(), None), (self.created(), ''),
+                         (self.created(), asset_id, 1)]:
+            self.assertBadRequest(
+                '/asset', page_token=encode_position_token('created', *position))
+        ## A token for a different ordering
+        self.assertBadRequest(
+            '/asset', order_by='name',
+            page_token=encode_position_token('created', self.created(), asset_id))
+
+    def created(self):
+        return Asset.objects.filter(user=self.user).first().created
+
+    def test_changes_since(self):
+        status, body = self.get_json('/asset/changes')
+        self.assertEqual(status, 200)
+        since = encode_position_token(
+            'updated', self.created(), Asset.objects.first().id)
+        status, body = self.get_json('/asset/changes', since=since)
+        self.assertEqual(status, 200)
+
+        asset_id = uuid.uuid4()
+        for position in [(), ('abc', asset_id), (None, asset_id),
+                         (self.created(), 'def'), (self.created(), None)]:
+            self.assertBadRequest(
+                '/asset/changes',
+                since=encode_position_token('updated', *position))
+        self.assertBadRequest('/asset/changes', since='!!!!')
+        self.assertBadRequest(
+            '/asset/changes',
+            since=encode_position_token('created', self.created(), asset_id))
+
+    def test_search_page_token(self):
+        status, body = self.get_json('/asset/search', q='sony', page_size=2)
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body['assets']), 2)
+        status, body = self.get_json(
+            '/asset/search', q='sony', page_size=2,
+            page_token=body['next_page_token'])
+        self.assertEqual(status, 200)
+        self.assertEqual(len(body['assets']), 1)
+
+        for position in [(), (1,), ('abc', 'def'), (1, 'def'),
+                         ('1', uuid.uuid4()), (1, uuid.uuid4(), 2)]:
+            self.assertBadRequest(
+                '/asset/search', q='sony',
+                page_token=encode_position_token('-rank', *position))
+        self.assertBadRequest('/asset/search', q='sony', page_token='!!!!')
+
+
+class EventsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_basic_user(
+            username='test_user',
+            email='user@example.com',
+            password='password'
+        )
+        self.client.login(username='test_user', password='password')
+        self.bus = events.InProcessEventBus()
+        events.set_event_bus(self.bus)
+
+    def tearDown(self):
+        events.set_event_bus(None)
+        self.user.delete()
+
+    def test_long_poll(self):
+        response = self.client.get('/asset/events', {'timeout': '0'})
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(body['asset_ids'], [])
+        self.assertEqual(
+            self.client.get('/asset/events', {'timeout': 'soon'}).status_code,
+            400)
+
+    def test_gateway_redirect(self):
+        with self.settings(EVENT_GATEWAY={'REDIRECT': '/internal/events'}):
+            response = self.client.get('/asset/events', {'timeout': '10'})
+            self.assertEqual(
+                response['X-Accel-Redirect'],
+                '/internal/events/{0}?format=json&timeout=10.0'
+                .format(asset_events_channel(self.user.id)))
+            response = self.client.get('/asset/events', {'format': 'sse'})
+            self.assertEqual(
+                response['X-Accel-Redirect'],
+                '/internal/events/{0}?format=sse'
+                .format(asset_events_channel(self.user.id)))
+
+    def test_too_many_waiters(self):
+        waiters = views._events_waiters
+        for _ in range(views.MAX_EVENTS_WAITERS):
+            waiters.acquire()
+        try:
+            response = self.client.get('/asset/events', {'timeout': '0'})
+            self.assertEqual(response.status_code, 503)
+            self.assertIn('Retry-After', response)
+        finally:
+            for _ in range(views.MAX_EVENTS_WAITERS):
+                waiters.release()
+        response = self.client.get('/asset/events', {'timeout': '0'})
+        self.assertEqual(response.status_code, 200)
@@ -5,5 +5,10 @@ from . import views
 urlpatterns = [
     url(r'^$', views.list),
     url(r'^/create$', views.create),
+    url(r'^/changes$', views.changes),
+    url(r'^/events$', views.events),
+    url(r'^/search$', views.search),
+    url(r'^/summary$', views.summary),
+    url(r'^/valuation$', views.valuation),
     url(r'^/(?P<asset_id>[\da-fA-F]+)$', views.update_or_view)
 ]
@@ -0,0 +1,265 @@
+"""
+Book values of assets, depreciated from their purchase price by the
+depreciation method of the asset's use.
+
+The assets of a user are valued in a single batch, from the
+(id, use, price_value, price_currency_code, date_purchased) columns of
+their rows. The values are held in `MoneyArray`s and the depreciation
+factor is only computed once for each method and age of asset.
+"""
+from array import array
+import csv
+from fractions import Fraction
+
+from django.conf import settings
+
+from common.currency import MoneyArray, _round_half_even
+from .models import Asset
+
+DAYS_PER_YEAR = 365
+
+## The columns of the asset table required to value an asset
+VALUATION_COLUMNS = (
+    'id', 'use', 'price_value', 'price_currency_code', 'date_purchased'
+)
+
+## The header of the csv export of a valuation
+CSV_HEADER = (
+    'id', 'use', 'method', 'date_purchased', 'currency_code',
+    'price', 'book_value'
+)
+
+
+class DepreciationMethod(object):
+    NAME = None
+
+    def factor(self, age_in_days):
+        """
+        The (numerator, denominator) of the fraction of the purchase price
+        remaining after the asset has been owned for the given number of days
+        """
+        raise NotImplementedError('DepreciationMethod.factor')
+
+
+class StraightLine(DepreciationMethod):
+    """
+    Depreciates the asset by an equal amount each day, until it has
+    no value at the end of its useful life
+    """
+    NAME = 'straight_line'
+
+    def __init__(self, years):
+        self.years = years
+        self.life_in_days = round(Fraction(str(years)) * DAYS_PER_YEAR)
+        if self.life_in_days <= 0:
+            raise ValueError('Useful life must be positive: {0}'.format(years))
+
+    def factor(self, age_in_days):
+        if age_in_days <= 0:
+            return (1, 1)
+        if age_in_days >= self.life_in_days:
+            return (0, 1)
+        return (self.life_in_days - age_in_days, self.life_in_days)
+
+
+class DecliningBalance(DepreciationMethod):
+    """
+    Depreciates the asset by a fixed fraction of its remaining value
+    at the end of each year that it has been owned
+    """
+    NAME = 'declining_balance'
+
+    def __init__(self, rate):
+        self.rate = Fraction(str(rate))
+        if not 0 < self.rate <= 1:
+            raise ValueError('Rate must be in (0, 1]: {0}'.format(rate))
+        self._remaining = 1 - self.rate
+
+    def factor(self, age_in_days):
+        if age_in_days <= 0:
+            return (1, 1)
+        remaining = self._remaining ** (age_in_days // DAYS_PER_YEAR)
+        return (remaining.numerator, remaining.denominator)
+
+
+DEPRECIATION_METHODS = {
+    StraightLine.NAME: StraightLine,
+    DecliningBalance.NAME: DecliningBalance,
+}
+
+
+def depreciation_method(spec):
+    """
+    Create a depreciation method from a spec in settings.ASSET_DEPRECIATION,
+    eg. {'method': 'straight_line', 'years': 5}
+    """
+    spec = dict(spec)
+    try:
+        method_cls = DEPRECIATION_METHODS[spec.pop('method')]
+    except KeyError as e:
+        raise ValueError('Unknown depreciation method: {0}'.format(e))
+    return method_cls(**spec)
+
+
+def configured_methods():
+    """
+    A dict mapping (lower case) asset uses to the depreciation method of
+    assets with that use. The method for any other use is keyed by 'default'
+    """
+    specs = getattr(settings, 'ASSET_DEPRECIATION', None) or {
+        'default': {'method': StraightLine.NAME, 'years': 5}
+    }
+    return {
+        use.lower(): depreciation_method(spec)
+        for use, spec in specs.items()
+    }
+
+
+class Valuation(object):
+    """
+    The book values of a batch of assets on a date.
+
+    `ids`, `uses`, `methods`, `dates_purchased`, `prices` and
+    `book_values` are parallel columns, with an item for each asset.
+    """
+    def __init__(self, as_of, ids, uses, methods, dates_purchased,
+                 prices, book_values):
+        self.as_of = as_of
+        self.ids = ids
+        self.uses = uses
+        self.methods = methods
+        self.dates_purchased = dates_purchased
+        self.prices = prices
+        self.book_values = book_values
+
+    def __len__(self):
+        return len(self.ids)
+
+    def totals(self):
+        """
+        A list of the number of assets, the total price and the total
+        book value of the assets in each currency
+        """
+        prices = self.prices.sum_by_currency()
+        book_values = self.book_values.sum_by_currency()
+        counts = dict()
+        for code in self.prices.currency_codes:
+            counts[code] = counts.get(code, 0) + 1
+        return [
+            dict(currency_code=code, count=counts[code],
+                 price=prices[code], book_value=book_values[code])
+            for code in sorted(prices)
+        ]
+
+    def items(self):
+        """
+        Iterates over a dict of the valuation of each asset
+        """
+        columns = zip(self.ids, self.uses, self.methods, self.dates_purchased,
+                      self.prices, self.book_values)
+        for id, use, method, date_purchased, price, book_value in columns:
+            yield dict(id=id, use=use, method=method,
+                       date_purchased=date_purchased,
+                       price=price, book_value=book_value)
+
+
+def value_assets(rows, as_of, methods=None):
+    """
+    Value the assets on the date `as_of`, from rows of the VALUATION_COLUMNS
+    of the asset table.
+    Assets without a price or a purchase date are not valued.
+
+    The depreciation factor for each method and age of asset is only
+    computed once, so the cost of valuing a batch is a dict lookup and an
+    integer division for each asset.
+    """
+    if methods is None:
+        methods = configured_methods()
+    method_index = {use: i for i, use in enumerate(methods)}
+    method_list = [methods[use] for use in methods]
+    default_index = method_index.get('default')
+
+    ids = []
+    uses = []
+    dates_purchased = []
+    prices = MoneyArray()
+    append_price = prices.append_value
+    ages = array('l')
+    row_methods = array('H')
+    as_of_ordinal = as_of.toordinal()
+    for id, use, price_value, price_currency_code, date_purchased in rows:
+        if price_value is None or not price_currency_code or date_purchased is None:
+            continue
+        index = method_index.get((use or '').lower(), default_index)
+        if index is None:
+            raise ValueError('No depreciation method for use {0}'.format(use))
+        ids.append(id)
+        uses.append(use)
+        dates_purchased.append(date_purchased)
+        append_price(price_value, price_currency_code)
+        ages.append(as_of_ordinal - date_purchased.toordinal())
+        row_methods.append(index)
+
+    factors = dict()
+    book_values = array('q')
+    append_book_value = book_values.append
+    for value, age, index in zip(prices.values, ages, row_methods):
+        try:
+            numerator, denominator = factors[index, age]
+        except KeyError:
+            numerator, denominator = factors[index, age] = \
+                method_list[index].factor(age)
+        append_book_value(_round_half_even(value * numerator, denominator))
+
+    return Valuation(
+        as_of, ids, uses,
+        [method_list[index].NAME for index in row_methods],
+        dates_purchased, prices, prices.with_values(book_values)
+    )
+
+
+def valuation_queryset(user):
+    """
+    The VALUATION_COLUMNS of the (non deleted) assets of the user which
+    have a price and a purchase date
+    """
+    return (Asset.objects
+            .filter(user=user, deleted=False,
+                    price_value__isnull=False, date_purchased__isnull=False)
+            .order_by('date_purchased', 'id')
+            .values_list(*VALUATION_COLUMNS))
+
+
+def value_user_assets(user, as_of):
+    """
+    Value all the (non deleted) assets of the user on the date `as_of`.
+    The columns of the assets are fetched in a single query.
+    """
+    return value_assets(valuation_queryset(user).iterator(), as_of)
+
+
+class _Echo(object):
+    """
+    A file-like object which returns what is written to it, so that
+    the lines written by a `csv.writer` can be streamed
+    """
+    def write(self, value):
+        return value
+
+
+def iter_csv(valuation):
+    """
+    Iterates over the lines of the csv export of the valuation
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+    for item in valuation.items():
+        yield writer.writerow((
+            item['id'].hex,
+            item['use'],
+            item['method'],
+            item['date_purchased'].isoformat(),
+            item['price'].code,
+            item['price'].decimal_string_value,
+            item['book_value'].decimal_string_value,
+        ))
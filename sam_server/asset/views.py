@@ -1,34 +1,114 @@
+from collections import OrderedDict
+import datetime
+import itertools
 import json
+import logging
+import threading
+import time
 import uuid
 import io
 
-from django.http import JsonResponse, HttpResponseNotAllowed
+from django.db import connection
+from django.http import (HttpResponse, JsonResponse, HttpResponseNotAllowed,
+                         StreamingHttpResponse)
+from django.utils import timezone
 from django.core.context_processors import csrf
 from django.core.files import File
 
-from ext_utils.json import partial_json_response
+from ext_utils.json import (partial_resource_response, request_selector,
+                             split_list_selector, streaming_json_response)
+from ext_utils.json.query import (QueryFilter, Ordering, compile_filter,
+                                  compile_ordering)
 from ext_utils.html import render
 
 from authentication.decorators import authorization_required
-
-from .models import Asset, HOST_URI
-from .resources import AssetResource, AssetListResource
+from common.event_gateway import (SSE_KEEPALIVE, format_sse_event,
+                                  format_sse_retry, gateway_redirect)
+from common.events import EventBusError, get_event_bus
+from common.models import (clean_position, decode_position_token,
+                           encode_position_token, keyset_page)
+from parsers.exceptions import ParseError
+
+from .models import Asset, HOST_URI, asset_events_channel
+from .resources import (AssetResource, AssetListResource, AssetSearchResource,
+                        AssetChangeResource, AssetChangesResource,
+                        AssetEventsResource,
+                        AssetSummaryResource, AssetValuationResource,
+                        AssetValuationItemResource)
+from . import search as asset_search
+from . import valuation as asset_valuation
 
 
 ASSET_RESOURCE = AssetResource()
 ASSET_LIST_RESOURCE = AssetListResource()
+ASSET_SEARCH_RESOURCE = AssetSearchResource()
+ASSET_CHANGE_RESOURCE = AssetChangeResource()
+ASSET_CHANGES_RESOURCE = AssetChangesResource()
+ASSET_EVENTS_RESOURCE = AssetEventsResource()
+ASSET_SUMMARY_RESOURCE = AssetSummaryResource()
+ASSET_VALUATION_RESOURCE = AssetValuationResource()
+ASSET_VALUATION_ITEM_RESOURCE = AssetValuationItemResource()
+
+## The number of assets in a page of the asset list, if the request
+## has no `page_size` parameter, and the maximum page size
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+## The ordering of the asset list, if the request has no `order_by`
+## parameter
+DEFAULT_ORDERING = ('created',)
+
+## The key of the (rank, id) positions of search results in page tokens
+SEARCH_ORDERING = ('-rank',)
+
+## The ordering of the changes feed, and the time a change is delayed
+## before it is listed in the feed
+CHANGES_ORDERING = ('updated',)
+CHANGES_SETTLE_TIME = datetime.timedelta(seconds=2)
+
+## The time (in seconds) a long poll of the events endpoint waits for a
+## change if the request has no `timeout` parameter, and the maximum timeout
+EVENTS_TIMEOUT = 25
+MAX_EVENTS_TIMEOUT = 60
+## The time (in seconds) an event stream is held open before it is closed
+## (the client's EventSource reconnects after EVENTS_RETRY milliseconds),
+## and the interval between the keepalive comments of the stream
+EVENTS_STREAM_TIME = 300
+EVENTS_RETRY = 1000
+EVENTS_KEEPALIVE_INTERVAL = 15
+## The maximum number of requests of a process which wait for events, if
+## requests are not redirected to an event gateway
+MAX_EVENTS_WAITERS = 16
+
+logger = logging.getLogger(__name__)
+
+_events_waiters = threading.BoundedSemaphore(MAX_EVENTS_WAITERS)
+
+
+def _asset_columns(selector=None):
+    """
+    The columns of the asset table which are required to serialize
+    the fields of an asset selected by the selector.
+    The primary key is always included.
+    """
+    columns = ASSET_RESOURCE.row_columns(selector)
+    if 'id' not in columns:
+        columns += ('id',)
+    return columns
 
 
 @authorization_required
 def update_or_view(request, asset_id):
+    assets = Asset.objects.filter(id=asset_id)
+    if request.method == 'GET':
+        return get_asset(request, assets)
+
     try:
-        asset = Asset.objects.filter(id=asset_id).get()
+        asset = assets.get()
     except Asset.DoesNotExist:
         return JsonResponse({'error': 'Does not exist'}, status=404)
 
-    if request.method == 'GET':
-        return get_asset(request, asset)
-    elif request.method == 'PUT':
+    if request.method == 'PUT':
         return update_asset(request, asset)
     elif request.method == 'DELETE':
         return delete_asset(request, asset)
@@ -63,15 +143,399 @@ def create(request):
         return HttpResponseNotAllowed(['GET', 'POST'])
 
 
-def get_asset(request, asset):
-    request_format = request.GET.get('format', 'document')
-    if request_format.lower() == 'json':
-        return partial_json_response(request, asset)
+@authorization_required
+def summary(request):
+    """
+    The number of the user's assets and the total of their prices,
+    grouped by the currency of the price and optionally by the
+    comma separated fields in the `group_by` parameter
+    (any of `models.SUMMARY_GROUP_FIELDS`)
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    group_by = request.GET.get('group_by', '')
+    group_by = tuple(sorted(set(
+        field.strip() for field in group_by.split(',') if field.strip()
+    )))
+
+    def to_json(groups):
+        return ASSET_SUMMARY_RESOURCE.to_json(dict(
+            user_id=request.user.id,
+            group_by=group_by,
+            count=sum(group['count'] for group in groups),
+            groups=groups
+        ))
+    try:
+        json_summary = Asset.objects.cached_price_summary(
+            request.user, group_by, to_json)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(json_summary)
+
+
+@authorization_required
+def valuation(request):
+    """
+    The book value of each of the user's assets (with a price and a
+    purchase date) on the date in the `as_of` parameter (formatted as
+    YYYY-MM-DD, default today), and the totals in each currency.
+
+    If the `format` parameter is 'csv', the valuation of each asset
+    is exported as a csv file.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    as_of = request.GET.get('as_of')
+    if as_of is None:
+        as_of = timezone.now().date()
+    else:
+        try:
+            as_of = datetime.datetime.strptime(as_of, '%Y-%m-%d').date()
+        except ValueError:
+            return JsonResponse(
+                {'error': 'Invalid date (expected YYYY-MM-DD): {0}'.format(as_of)},
+                status=400)
+    assets_valuation = asset_valuation.value_user_assets(request.user, as_of)
+
+    request_format = request.GET.get('format', '')
+    if request_format.lower() == 'csv':
+        response = StreamingHttpResponse(
+            asset_valuation.iter_csv(assets_valuation),
+            content_type='text/csv')
+        response['Content-Disposition'] = (
+            'attachment; filename="asset_valuation_{0}.csv"'
+            .format(as_of.isoformat()))
+        return response
+
+    def json_items(selector=None):
+        to_json = ASSET_VALUATION_ITEM_RESOURCE.to_json_selected
+        items = (to_json(item, selector) for item in assets_valuation.items())
+        ## Serialize the first item up front, so that a selector which is
+        ## invalid for the items is reported before the response is started
+        first_item = next(items, None)
+        if first_item is None:
+            return ()
+        return itertools.chain([first_item], items)
+
+    json_valuation = ASSET_VALUATION_RESOURCE.to_json(dict(
+        user_id=request.user.id,
+        as_of=as_of,
+        totals=assets_valuation.totals(),
+        assets=[]
+    ))
+    return streaming_json_response(
+        request, json_valuation, 'assets', json_items)
+
+
+@authorization_required
+def search(request):
+    """
+    The page of the user's assets which match all of the words of the
+    `q` parameter (in their name, description, vendor or model number),
+    ordered by relevance.
+
+    As with the asset list, the `page_size` and `page_token` parameters
+    select the page of results.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'error': 'No search query'}, status=400)
+    request_format = request.GET.get('format', '')
+    is_json = request_format.lower() == 'json'
+    try:
+        page_size, after = _page_params(
+            request, SEARCH_ORDERING, clean=_clean_search_position)
+        columns = _list_item_columns(request, is_json)
+    except (ParseError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    results, next_position = asset_search.search_assets(
+        request.user, query, page_size, after)
+    next_page_token = None
+    if next_position is not None:
+        next_page_token = encode_position_token(
+            ','.join(SEARCH_ORDERING), *next_position)
+
+    ## Fetch the rows of the page in a single query, in order of rank
+    id_index = columns.index('id')
+    rows_by_id = {
+        row[id_index]: row for row in
+        Asset.objects.filter(user=request.user, deleted=False,
+                             id__in=[asset_id for asset_id, _ in results])
+                     .values_list(*columns)
+    }
+    asset_rows = [rows_by_id[asset_id] for asset_id, _ in results
+                  if asset_id in rows_by_id]
+
+    def json_assets(selector=None):
+        return ASSET_RESOURCE.iter_json_many(
+            asset_rows, columns=columns, selector=selector)
+
+    json_search = ASSET_SEARCH_RESOURCE.to_json(dict(
+        user_id=request.user.id,
+        q=query,
+        next_page_token=next_page_token,
+        assets=[]
+    ))
+    if is_json:
+        return streaming_json_response(
+            request, json_search, 'assets', json_assets)
     else:
-        json_asset = json.dumps(ASSET_RESOURCE.to_json(asset))
-        render_data = {'resource': json_asset}
+        json_search['assets'] = list(json_assets())
+        render_data = {'resource': json.dumps(json_search)}
         render_data.update(csrf(request))
-        return render('asset/asset.html', render_data)
+        return render('index.html', render_data)
+
+
+def _clean_search_position(position):
+    """
+    Validates the (rank, id) position of a page of search results
+    """
+    if len(position) != 2:
+        raise ValueError('Position does not match the ordering')
+    rank, asset_id = position
+    if type(rank) is not int or not isinstance(asset_id, uuid.UUID):
+        raise ValueError('Invalid search position: {0!r}'.format(position))
+    return (rank, asset_id)
+
+
+@authorization_required
+def changes(request):
+    """
+    The user's assets which have been created, updated or deleted since the
+    position in the `since` parameter (the `sync_token` of a previous
+    response), in the order they were changed.
+
+    Deleted assets are included, with `deleted` set. If `has_more` is set,
+    there are more changes than the `page_size` parameter, and the request
+    should be repeated with the new `sync_token`.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    try:
+        page_size, after = _page_params(
+            request, CHANGES_ORDERING, token_param='since')
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    ## Changes are only listed once they are older than the settle time,
+    ## so that a change which is committed after a later change (and so
+    ## is ordered before it) is not skipped by a client which has already
+    ## synced the later change.
+    settled = timezone.now() - CHANGES_SETTLE_TIME
+    user_assets = Asset.objects.filter(user=request.user, updated__lt=settled)
+    columns = ASSET_CHANGE_RESOURCE.row_columns()
+    asset_rows, next_position = keyset_page(
+        user_assets, CHANGES_ORDERING, columns, page_size, after)
+    if asset_rows:
+        last_row = asset_rows[-1]
+        after = (last_row[columns.index('updated')],
+                 last_row[columns.index('id')])
+    sync_token = None
+    if after is not None:
+        sync_token = encode_position_token(','.join(CHANGES_ORDERING), *after)
+
+    def json_changes(selector=None):
+        return ASSET_CHANGE_RESOURCE.iter_json_many(
+            asset_rows, columns=columns, selector=selector)
+
+    json_asset_changes = ASSET_CHANGES_RESOURCE.to_json(dict(
+        user_id=request.user.id,
+        sync_token=sync_token,
+        has_more=next_position is not None,
+        assets=[]
+    ))
+    return streaming_json_response(
+        request, json_asset_changes, 'assets', json_changes)
+
+
+@authorization_required
+def events(request):
+    """
+    Waits until any of the user's assets are created, updated or deleted,
+    and sends the ids of the changed assets.
+
+    By default the request is a long poll: the response is sent as soon as
+    an asset changes, or with no `asset_ids` once `timeout` seconds have
+    passed, and the client should then repeat the request.
+
+    If the request accepts 'text/event-stream' (or has `format=sse`), the
+    ids are sent as Server-Sent Events ('assets' events) as the assets
+    change, until the stream is closed after EVENTS_STREAM_TIME seconds.
+
+    If an event gateway is configured (settings.EVENT_GATEWAY), the request
+    is redirected to the gateway, which waits for the changes so that the
+    request does not hold a worker. Otherwise the request waits in the
+    worker, and at most MAX_EVENTS_WAITERS requests of a process wait at
+    once (further requests are sent a 503).
+
+    Changes are not stored, so a change made while the client is not
+    waiting is not sent. Clients should fetch the `changes` feed when
+    they (re)connect.
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    stream = _accepts_event_stream(request)
+    timeout = None
+    if not stream:
+        try:
+            timeout = float(request.GET.get('timeout', EVENTS_TIMEOUT))
+        except ValueError:
+            timeout = -1
+        if not timeout >= 0:
+            return JsonResponse(
+                {'error': 'Invalid timeout (expected a number of seconds): {0}'
+                          .format(request.GET['timeout'])},
+                status=400)
+        timeout = min(timeout, MAX_EVENTS_TIMEOUT)
+    channel = asset_events_channel(request.user.id)
+
+    if stream:
+        redirect = gateway_redirect(channel, format='sse')
+    else:
+        redirect = gateway_redirect(channel, format='json', timeout=timeout)
+    if redirect is not None:
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = redirect
+        return response
+
+    if not _events_waiters.acquire(blocking=False):
+        logger.warning('Too many requests waiting for asset events')
+        return _events_unavailable()
+    ## Don't hold a database connection while waiting (unless it is in
+    ## the transaction of an atomic request)
+    if not connection.in_atomic_block:
+        connection.close()
+    if stream:
+        response = StreamingHttpResponse(
+            _EventStream(request.user.id, _events_waiters.release),
+            content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        ## Don't buffer the events in a proxying nginx
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    try:
+        with get_event_bus().subscribe([channel]) as subscription:
+            messages = subscription.wait(timeout)
+    except (EventBusError, OSError) as e:
+        logger.error('Could not wait for asset events: %s', e)
+        return _events_unavailable()
+    finally:
+        _events_waiters.release()
+    return JsonResponse(asset_events_json(
+        request.user.id, [message for _, message in messages]))
+
+
+def _accepts_event_stream(request):
+    if request.GET.get('format', '').lower() == 'sse':
+        return True
+    return 'text/event-stream' in request.META.get('HTTP_ACCEPT', '')
+
+
+def _events_unavailable():
+    response = JsonResponse({'error': 'Events are unavailable'}, status=503)
+    response['Retry-After'] = str(EVENTS_RETRY // 1000)
+    return response
+
+
+def asset_events_json(user_id, asset_ids):
+    """
+    The json of the ids of a user's changed assets
+    """
+    ## An asset which is saved more than once while the request is
+    ## waiting is only sent once
+    return ASSET_EVENTS_RESOURCE.to_json(dict(
+        user_id=user_id,
+        asset_ids=list(OrderedDict.fromkeys(asset_ids))
+    ))
+
+
+class _EventStream(object):
+    """
+    Iterates over the Server-Sent Events of changes to the user's assets.
+
+    The subscription is made when the stream is first iterated, and is
+    closed when the stream is closed (when the client disconnects, or after
+    EVENTS_STREAM_TIME seconds), which then calls `release`.
+    """
+    def __init__(self, user_id, release):
+        self.user_id = user_id
+        self._release = release
+        self._events = self._iter_events()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    def close(self):
+        self._events.close()
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+    def _iter_events(self):
+        deadline = time.monotonic() + EVENTS_STREAM_TIME
+        try:
+            subscription = get_event_bus().subscribe(
+                [asset_events_channel(self.user_id)])
+        except (EventBusError, OSError) as e:
+            logger.error('Could not wait for asset events: %s', e)
+            yield format_sse_event('error', {'error': 'Events are unavailable'})
+            return
+        with subscription:
+            yield format_sse_retry(EVENTS_RETRY)
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    messages = subscription.wait(
+                        min(remaining, EVENTS_KEEPALIVE_INTERVAL))
+                except (EventBusError, OSError) as e:
+                    logger.error('Could not wait for asset events: %s', e)
+                    return
+                if messages:
+                    yield format_sse_event('assets', asset_events_json(
+                        self.user_id, [message for _, message in messages]))
+                else:
+                    yield SSE_KEEPALIVE
+
+
+def get_asset(request, assets):
+    request_format = request.GET.get('format', 'document')
+    if request_format.lower() == 'json':
+        return get_asset_json(request, assets)
+    try:
+        asset = assets.get()
+    except Asset.DoesNotExist:
+        return JsonResponse({'error': 'Does not exist'}, status=404)
+    json_asset = json.dumps(ASSET_RESOURCE.to_json(asset))
+    render_data = {'resource': json_asset}
+    render_data.update(csrf(request))
+    return render('asset/asset.html', render_data)
+
+
+def get_asset_json(request, assets):
+    """
+    Serializes the asset from a row containing only the columns
+    required by the fields selected in the request.
+    """
+    try:
+        selector = request_selector(request)
+        columns = _asset_columns(selector)
+    except (ParseError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    rows = list(assets.values_list(*columns)[:1])
+    if not rows:
+        return JsonResponse({'error': 'Does not exist'}, status=404)
+    json_asset = ASSET_RESOURCE.to_json_many(
+        rows, columns=columns, selector=selector)[0]
+    return JsonResponse(json_asset)
 
 
 def update_asset(request, asset):
@@ -102,8 +566,10 @@ def update_asset(request, asset):
         asset.use = resource['use']
     if 'model_number' in resource:
         asset.model_number = resource['model_number']
+    if 'vendor' in resource:
+        asset.vendor = resource['vendor']
     asset.save()
-    return partial_json_response(request, ASSET_RESOURCE.to_json(asset))
+    return partial_resource_response(request, ASSET_RESOURCE, asset)
 
 
 def delete_asset(request, asset):
@@ -112,22 +578,121 @@ def delete_asset(request, asset):
     return JsonResponse({'deleted': True}, status=200)
 
 
+def _page_params(request, ordering, token_param='page_token', clean=None):
+    """
+    Parses the `page_size` and page token (`token_param`) parameters of
+    a list request.
+    Returns a tuple (page_size, after), where `after` is the position in
+    the ordering decoded from the page token, or None for the first page.
+
+    The position is validated by `clean`, which is called with the decoded
+    position and should return the validated position or raise a
+    `ValueError`. By default, the position must have a valid value for
+    each of the ordered fields of `Asset` and its primary key.
+
+    Raises a `ValueError` if either of the parameters is invalid, or if
+    the page token is not a position in the ordering.
+    """
+    page_size = request.GET.get('page_size')
+    if page_size is None:
+        page_size = DEFAULT_PAGE_SIZE
+    else:
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            page_size = 0
+        if page_size <= 0:
+            raise ValueError(
+                'Invalid page size (expected a positive integer): {0}'
+                .format(request.GET['page_size']))
+        page_size = min(page_size, MAX_PAGE_SIZE)
+    page_token = request.GET.get(token_param)
+    if not page_token:
+        return (page_size, None)
+    ## The first value of the token is the ordering of the page
+    token_ordering, *after = decode_position_token(page_token)
+    if token_ordering != ','.join(ordering):
+        raise ValueError(
+            'Page token is not valid for the ordering: {0}'.format(page_token))
+    after = tuple(after)
+    if clean is None:
+        return (page_size, clean_position(Asset, ordering, after))
+    return (page_size, clean(after))
+
+
+def _list_item_columns(request, is_json, ordering=()):
+    """
+    The columns of the asset table required to serialize the fields of
+    the listed assets selected by the request, and the ordered fields.
+    """
+    item_selector = None
+    if is_json:
+        _, _, item_selector = split_list_selector(
+            request_selector(request), 'assets')
+    columns = _asset_columns(item_selector)
+    for name in ordering:
+        if name.lstrip('-') not in columns:
+            columns += (name.lstrip('-'),)
+    return columns
+
+
 def list_assets(request):
     """
-    List all assets for the current user
+    List a page of the assets of the current user.
+
+    The `filter` parameter restricts the list to the assets which match
+    the filter, and the `order_by` parameter orders the list
+    (see `ext_utils.json.query`). Assets are listed in the order they
+    were created by default.
+
+    The `page_size` parameter is the maximum number of assets in the page,
+    and the `page_token` parameter is the `next_page_token` of the previous
+    page. The last page has no `next_page_token`.
     """
-    user_assets = Asset.objects.filter(user=request.user, deleted=False).all()
+    user_assets = Asset.objects.filter(user=request.user, deleted=False)
+    request_format = request.GET.get('format', '')
+    is_json = request_format.lower() == 'json'
+    try:
+        query_filter = QueryFilter.parse(request.GET.get('filter', ''))
+        if query_filter:
+            user_assets = user_assets.filter(
+                compile_filter(AssetResource, query_filter))
+        ordering = compile_ordering(
+            AssetResource, Ordering.parse(request.GET.get('order_by', '')))
+        ordering = ordering or DEFAULT_ORDERING
+        page_size, after = _page_params(request, ordering)
+        ## Only fetch the columns required by the selected fields, and
+        ## the position of the asset in the ordering
+        columns = _list_item_columns(request, is_json, ordering)
+    except (ParseError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
 
-    json_assets = ASSET_LIST_RESOURCE.to_json(dict(
+    ## Seek straight to the page (on the (user, created, id) index for the
+    ## default ordering) rather than skipping the assets of the previous pages
+    asset_rows, next_position = keyset_page(
+        user_assets, ordering, columns, page_size, after)
+    next_page_token = None
+    if next_position is not None:
+        next_page_token = encode_position_token(
+            ','.join(ordering), *next_position)
+
+    ## Serialize the assets straight from the rows of the query,
+    ## rather than constructing a model instance for each asset
+    def json_assets(selector=None):
+        return ASSET_RESOURCE.iter_json_many(
+            asset_rows, columns=columns, selector=selector)
+
+    json_asset_list = ASSET_LIST_RESOURCE.to_json(dict(
         user_id=request.user.id,
-        next_page_token=uuid.uuid4(),
-        assets=user_assets
+        next_page_token=next_page_token,
+        assets=[]
     ))
-    request_format = request.GET.get('format', '')
-    if request_format.lower() == 'json':
-        return partial_json_response(request, json_assets)
+    if is_json:
+        return streaming_json_response(
+            request, json_asset_list, 'assets', json_assets)
     else:
-        render_data = {'resource': json.dumps(json_assets)}
+        json_asset_list['assets'] = list(json_assets())
+        render_data = {'resource': json.dumps(json_asset_list)}
         render_data.update(csrf(request))
         return render('index.html', render_data)
 
@@ -151,7 +716,8 @@ def create_asset(request):
         description=resource['description'] or '',
         price=resource['price'],
         use=resource['use'] or '',
-        model_number=resource['model_number'] or ''
+        model_number=resource['model_number'] or '',
+        vendor=resource.get('vendor') or ''
     )
     if 'image' in resource and resource['image']:
         image = resource['image'][0]
@@ -159,7 +725,7 @@ def create_asset(request):
         asset.image.save(image.name, image_file, save=False)
 
     asset.save()
-    response = partial_json_response(request, ASSET_RESOURCE.to_json(asset))
+    response = partial_resource_response(request, ASSET_RESOURCE, asset)
     return response
 
 
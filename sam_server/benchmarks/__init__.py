@@ -0,0 +1,29 @@
+"""
+Micro benchmarks for the hot paths of the server.
+
+The benchmarks are plain scripts which can be run from the project
+root (the directory containing `manage.py`), eg.
+
+    python -m benchmarks.bench_serialization
+
+They do not touch the database.
+"""
+import os
+import timeit
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sam_server.settings')
+
+
+def run_benchmark(name, stmt, number=5, repeat=3):
+    """
+    Runs `stmt` (a callable), reporting the best time per call
+    over `repeat` batches of `number` calls.
+    """
+    timer = timeit.Timer(stmt)
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    print('{0:<48} {1:>10.3f} ms'.format(name, best * 1000))
+    return best
+
+
+def report_speedup(baseline, optimized):
+    print('{0:<48} {1:>10.1f} x'.format('speedup', baseline / optimized))
@@ -0,0 +1,156 @@
+"""
+Compares loading the currency table by parsing the ISO 4217 and
+currency symbol XML files against loading the compiled table module.
+The compiled table is loaded from marshalled bytecode, as it would be
+when imported from its cached .pyc file.
+
+Also compares resolving countries to currencies by scanning the
+countries of each currency against the country index, for countries
+near the start and the end of the table.
+
+Also compares sorting and totalling amounts in mixed currencies by
+converting amounts for every comparison and addition against a
+precomputed conversion of each amount.
+
+Also measures loading five years of daily rates for every currency,
+and converting asset prices at the rates on their purchase dates one
+at a time against the bulk conversion.
+"""
+import datetime
+import marshal
+
+from . import run_benchmark, report_speedup
+
+from common import currency_table, iso_4217_table
+from common.currency import Currency, MoneyAmount
+from common import exchange
+
+
+def bench_load_table():
+    def load_xml():
+        currency_table.read_currencies()
+        currency_table.read_symbols()
+
+    with open(iso_4217_table.__file__, encoding='utf-8') as f:
+        bytecode = marshal.dumps(
+            compile(f.read(), iso_4217_table.__file__, 'exec'))
+
+    def load_compiled():
+        exec(marshal.loads(bytecode), {})
+        Currency._load_table()
+
+    print('Loading the currency table')
+    baseline = run_benchmark('parse XML', load_xml, number=1)
+    optimized = run_benchmark('compiled table', load_compiled, number=1)
+    report_speedup(baseline, optimized)
+
+
+NUM_COUNTRIES = 10000
+
+
+def scan_country(country):
+    for currency in Currency._currencies.values():
+        if country in currency.countries:
+            return currency
+
+
+def bench_country_lookup():
+    first_country = iso_4217_table.CURRENCIES[0][4][0]
+    last_country = iso_4217_table.CURRENCIES[-1][4][-1]
+
+    for country in (first_country, last_country):
+        countries = [country] * NUM_COUNTRIES
+
+        def run_scan():
+            for country in countries:
+                scan_country(country)
+
+        def run_from_countries():
+            Currency.from_countries(countries)
+
+        print('Resolving {0} countries ({1})'.format(NUM_COUNTRIES, country))
+        baseline = run_benchmark('scan currencies', run_scan)
+        optimized = run_benchmark('from_countries', run_from_countries)
+        report_speedup(baseline, optimized)
+
+
+NUM_AMOUNTS = 10000
+RATES = {'AUD': '1.3456', 'EUR': '0.9123', 'GBP': '0.7891', 'JPY': '149.5'}
+
+
+def bench_mixed_currencies():
+    exchange.set_rate_source(exchange.DictRateSource('USD', RATES))
+    codes = ['USD'] + sorted(RATES)
+    amounts = [MoneyAmount(codes[i % len(codes)], (i * 7919) % 100000)
+               for i in range(NUM_AMOUNTS)]
+
+    def run_sort_pairwise():
+        sorted(amounts)
+
+    def run_sort_key():
+        sorted(amounts, key=exchange.sort_key('USD'))
+
+    def run_sum_pairwise():
+        sum(amounts, MoneyAmount('USD', 0))
+
+    def run_total():
+        exchange.total(amounts, 'USD')
+
+    print('Sorting {0} amounts in mixed currencies'.format(NUM_AMOUNTS))
+    baseline = run_benchmark('compare with conversions', run_sort_pairwise)
+    optimized = run_benchmark('rate matrix sort key', run_sort_key)
+    report_speedup(baseline, optimized)
+
+    print('Totalling {0} amounts in mixed currencies'.format(NUM_AMOUNTS))
+    baseline = run_benchmark('sum with conversions', run_sum_pairwise)
+    optimized = run_benchmark('rate matrix total', run_total)
+    report_speedup(baseline, optimized)
+    exchange.set_rate_source(None)
+
+
+NUM_HISTORY_DAYS = 5 * 365
+NUM_ASSETS = 100000
+
+
+def bench_rate_history():
+    start = datetime.date(2010, 1, 1)
+    codes = sorted(code for code, _, _, num_digits, _ in iso_4217_table.CURRENCIES
+                   if code != 'USD' and num_digits is not None)
+    rows = [
+        (start + datetime.timedelta(days=day), code, '{0}.{1:04d}'.format(i + 1, day))
+        for day in range(NUM_HISTORY_DAYS)
+        for i, code in enumerate(codes)
+    ]
+    print('Loading {0} historical rates'.format(len(rows)))
+    run_benchmark('rate history', lambda: exchange.RateHistory('USD', rows),
+                  number=1, repeat=1)
+
+    history = exchange.RateHistory('USD', rows)
+    asset_codes = ['AUD', 'EUR', 'GBP', 'JPY', 'USD']
+    amounts = [MoneyAmount(asset_codes[i % len(asset_codes)], i)
+               for i in range(NUM_ASSETS)]
+    dates = [start + datetime.timedelta(days=(i * 7) % NUM_HISTORY_DAYS)
+             for i in range(NUM_ASSETS)]
+
+    def run_convert():
+        for amount, date in zip(amounts, dates):
+            history.convert(amount, 'USD', date)
+
+    def run_convert_many():
+        history.convert_many(amounts, dates, 'USD')
+
+    print('Converting {0} asset prices as of their purchase dates'.format(NUM_ASSETS))
+    baseline = run_benchmark('convert each amount', run_convert, number=1)
+    optimized = run_benchmark('convert_many', run_convert_many, number=1)
+    report_speedup(baseline, optimized)
+
+
+def main():
+    bench_load_table()
+    bench_country_lookup()
+    bench_mixed_currencies()
+    bench_rate_history()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Compares the single pass lexer (`Lexer.run`) against trying each token
+in turn at each position of the input, for typical selector and money
+amount inputs.
+"""
+from . import run_benchmark, report_speedup
+
+from common.currency import MoneyAmountParser
+from ext_utils.json.field_selector import SelectorParser
+
+NUM_INPUTS = 10000
+
+SELECTOR_INPUT = 'user_id, next_page_token, assets(id, name, price, image_src)'
+MONEY_INPUT = 'AUD 1234.56'
+
+
+def bench_lexer(name, lexer, input):
+    def run_sequential():
+        for _ in range(NUM_INPUTS):
+            for _ in lexer._run_sequential(input):
+                pass
+
+    def run_compiled():
+        for _ in range(NUM_INPUTS):
+            for _ in lexer.run(input):
+                pass
+
+    print('Lexing {0} {1} inputs'.format(NUM_INPUTS, name))
+    baseline = run_benchmark('sequential token matching', run_sequential)
+    optimized = run_benchmark('single pass lexer', run_compiled)
+    report_speedup(baseline, optimized)
+
+
+def main():
+    bench_lexer('selector', SelectorParser.LEXER, SELECTOR_INPUT)
+    bench_lexer('money amount', MoneyAmountParser.LEXER, MONEY_INPUT)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Compares parsing money amounts with the `MoneyAmountParser` against
+`MoneyAmount.parse`, which matches the common formats with a single
+regular expression.
+
+Also compares totalling amounts by creating each partial sum from its
+currency code (looking up the currency for every addition) against
+adding amounts which share their currency, and reports the memory
+used by a list of amounts.
+
+Also compares totalling the prices of assets grouped by currency by
+adding `MoneyAmount`s against a `MoneyArray`.
+"""
+import tracemalloc
+
+from . import run_benchmark, report_speedup
+
+from common.currency import MoneyAmount, MoneyArray, MoneyAmountParser
+
+NUM_INPUTS = 10000
+NUM_AMOUNTS = 50000
+NUM_ASSETS = 100000
+
+MONEY_INPUT = 'AUD 1234.56'
+
+
+def bench_parse():
+    def run_parser():
+        for _ in range(NUM_INPUTS):
+            MoneyAmountParser().run(MONEY_INPUT)
+
+    def run_parse():
+        for _ in range(NUM_INPUTS):
+            MoneyAmount.parse(MONEY_INPUT)
+
+    print('Parsing {0} money amounts'.format(NUM_INPUTS))
+    baseline = run_benchmark('money amount parser', run_parser)
+    optimized = run_benchmark('regex money amount parse', run_parse)
+    report_speedup(baseline, optimized)
+
+
+def bench_sum():
+    tracemalloc.start()
+    amounts = [MoneyAmount('AUD', i) for i in range(NUM_AMOUNTS)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    def run_by_code():
+        total = MoneyAmount('AUD', 0)
+        for amount in amounts:
+            total = MoneyAmount(total.code, total.value + amount.value)
+
+    def run_sum():
+        sum(amounts)
+
+    print('Summing {0} money amounts ({1} bytes per amount)'
+          .format(NUM_AMOUNTS, size // NUM_AMOUNTS))
+    baseline = run_benchmark('create sums from currency code', run_by_code)
+    optimized = run_benchmark('sum amounts', run_sum)
+    report_speedup(baseline, optimized)
+
+
+def bench_group_by_currency():
+    ## Rows of (price_value, price_currency_code), as fetched for assets
+    codes = ['AUD', 'USD', 'EUR']
+    rows = [(i, codes[i % len(codes)]) for i in range(NUM_ASSETS)]
+
+    def run_amounts():
+        totals = dict()
+        for value, code in rows:
+            amount = MoneyAmount(code, value)
+            try:
+                totals[code] += amount
+            except KeyError:
+                totals[code] = amount
+        return totals
+
+    def run_money_array():
+        return MoneyArray.from_rows(rows).sum_by_currency()
+
+    assert run_amounts() == run_money_array()
+    money_array = MoneyArray.from_rows(rows)
+
+    print('Totalling {0} asset prices by currency'.format(NUM_ASSETS))
+    baseline = run_benchmark('add money amounts', run_amounts)
+    optimized = run_benchmark('money array from rows', run_money_array)
+    report_speedup(baseline, optimized)
+    run_benchmark('money array sum_by_currency', money_array.sum_by_currency)
+
+
+def main():
+    bench_parse()
+    bench_sum()
+    bench_group_by_currency()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Compares parsing selectors with the table driven selector grammar against
+the recursive descent parser it replaced, and against only lexing the same
+input and only constructing the parsed selector, to measure the overhead
+of parsing.
+"""
+from . import run_benchmark, report_speedup
+
+from ext_utils.json.field_selector import (FieldSelector, FieldListSelector,
+                                           SelectorParser)
+from parsers import parser
+from parsers.exceptions import ParseError
+
+NUM_INPUTS = 10000
+
+SELECTOR_INPUT = 'user_id, next_page_token, assets(id, name, price.value, image_src)'
+
+
+class RecursiveDescentSelectorParser(parser.Parser):
+    """
+    The hand written selector parser replaced by `SelectorParser.GRAMMAR`
+    """
+    def __init__(self):
+        super(RecursiveDescentSelectorParser, self).__init__(
+            SelectorParser.LEXER)
+
+    def begin(self):
+        return self.parse_field_list()
+
+    def parse_field(self):
+        token = self.move_next()
+        if not token or token.name != 'NAME':
+            raise ParseError(self.position, 'Expected a field name')
+        field_name = token.string
+
+        token = self.move_next(lookahead=True)
+        if not token or token.name in {'R_PARENS', 'COMMA'}:
+            return FieldSelector(field_name)
+        elif token.name == 'PERIOD':
+            self.move_next()
+            subselector = self.parse_field()
+        elif token.name == 'L_PARENS':
+            subselector = self.parse_parens_field_list()
+        else:
+            raise ParseError(self.position,
+                             'Unexpected token in stream ({0})'.format(token))
+        return FieldSelector(field_name, subselector)
+
+    def parse_field_list(self):
+        field_list = []
+        token = self.move_next(lookahead=True)
+
+        while token and token.name != 'R_PARENS':
+            if token.name == 'NAME':
+                field_list.append(self.parse_field())
+            else:
+                raise ParseError(self.position, 'Expected a field selector')
+            token = self.move_next(lookahead=True)
+            if token is None or token.name == 'R_PARENS':
+                pass
+            elif token.name == 'COMMA':
+                self.move_next()
+            else:
+                raise ParseError(self.position,
+                                 'Expected comma or end of selector list')
+            token = self.move_next(lookahead=True)
+        return FieldListSelector(field_list)
+
+    def parse_parens_field_list(self):
+        token = self.move_next()
+        if token is None or token.name != 'L_PARENS':
+            raise ParseError(self.position,
+                             'Expected start of selector list')
+        field_list = self.parse_field_list()
+        token = self.move_next()
+        if token is None or token.name != 'R_PARENS':
+            raise ParseError(self.position,
+                             'Expected end of selector list')
+        return field_list
+
+
+def main():
+    lexer = SelectorParser.LEXER
+    grammar = SelectorParser.GRAMMAR
+
+    def lex():
+        ## The table driven parser lexes the whole input with `scan`
+        for _ in range(NUM_INPUTS):
+            lexer.scan(SELECTOR_INPUT)
+
+    def construct():
+        ## The selector objects built by both parsers, without parsing
+        for _ in range(NUM_INPUTS):
+            FieldListSelector([
+                FieldSelector('user_id'),
+                FieldSelector('next_page_token'),
+                FieldSelector('assets', FieldListSelector([
+                    FieldSelector('id'),
+                    FieldSelector('name'),
+                    FieldSelector('price', FieldSelector('value')),
+                    FieldSelector('image_src'),
+                ])),
+            ])
+
+    def parse_recursive_descent():
+        for _ in range(NUM_INPUTS):
+            RecursiveDescentSelectorParser().run(SELECTOR_INPUT)
+
+    def parse():
+        for _ in range(NUM_INPUTS):
+            grammar.parse(SELECTOR_INPUT)
+
+    ## Both parsers must produce the same selector
+    assert (RecursiveDescentSelectorParser().run(SELECTOR_INPUT) ==
+            grammar.parse(SELECTOR_INPUT))
+
+    print('Parsing {0} selectors'.format(NUM_INPUTS))
+    ## The best of more (shorter) batches, as the difference between
+    ## the parsers is within the noise of a few batches
+    lex_time = run_benchmark('lex only', lex, number=2, repeat=10)
+    construct_time = run_benchmark('construct selectors only', construct,
+                                   number=2, repeat=10)
+    baseline = run_benchmark('recursive descent parse',
+                             parse_recursive_descent, number=2, repeat=10)
+    optimized = run_benchmark('table driven parse', parse,
+                              number=2, repeat=10)
+    report_speedup(baseline, optimized)
+    print('{0:<48} {1:>10.1f} x'.format('parse / lex', optimized / lex_time))
+    ## The time spent parsing, other than lexing and constructing selectors
+    print('{0:<48} {1:>10.1f} x'.format(
+        'parse overhead / lex',
+        (optimized - construct_time - lex_time) / lex_time))
+
+
+if __name__ == '__main__':
+    main()
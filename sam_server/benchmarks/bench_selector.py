@@ -0,0 +1,51 @@
+"""
+Compares selecting fields from a large nested list response with
+`Selector.select` against the compiled selector (`Selector.compile`).
+"""
+import uuid
+
+from . import run_benchmark, report_speedup
+
+from ext_utils.json.field_selector import Selector
+
+NUM_ASSETS = 10000
+
+
+def asset_list_json():
+    return {
+        'kind': 'assets#assets',
+        'user_id': 1,
+        'next_page_token': uuid.uuid4().hex,
+        'assets': [
+            {
+                'kind': 'assets#asset',
+                'id': uuid.uuid4().hex,
+                'user_id': 1,
+                'name': 'asset {0}'.format(i),
+                'description': 'benchmark asset',
+                'use': 'personal',
+                'model_number': 'MN-{0}'.format(i),
+                'price': '{0}.00 AUD'.format(i),
+                'image': []
+            }
+            for i in range(NUM_ASSETS)
+        ]
+    }
+
+
+def main():
+    resource = asset_list_json()
+    selector = Selector.parse('user_id, assets(id, name, price, image)')
+    select = selector.compile()
+    assert select(resource) == selector.select(resource)
+
+    print('Selecting from {0} assets'.format(NUM_ASSETS))
+    baseline = run_benchmark('Selector.select',
+                             lambda: selector.select(resource))
+    optimized = run_benchmark('compiled selector',
+                              lambda: select(resource))
+    report_speedup(baseline, optimized)
+
+
+if __name__ == '__main__':
+    main()
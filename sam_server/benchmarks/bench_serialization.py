@@ -0,0 +1,136 @@
+"""
+Compares the precompiled serialization plans of `ModelResource.to_json`
+against field resolution by reflection, and model serialization against
+row serialization (`ModelResource.to_json_many`), over a list of
+10000 assets. Also compares selecting fields after serialization against
+selector aware serialization (`ModelResource.to_json_selected`).
+
+The stand in assets are plain objects, so the cost of constructing
+a django model for each row (which row serialization avoids) is not
+included in the model serialization timings.
+"""
+import uuid
+from datetime import datetime
+
+from . import run_benchmark, report_speedup
+
+from common.currency import MoneyAmount
+from ext_utils.json.field_selector import Selector
+from ext_utils.json.resources import ListResource
+from asset.resources import AssetResource, AssetListResource
+
+NUM_ASSETS = 10000
+
+
+class _User(object):
+    def __init__(self, id):
+        self.id = id
+
+
+class _Asset(object):
+    """
+    Stands in for an `asset.models.Asset`, without the database
+    """
+    def __init__(self, user, index):
+        self.id = uuid.uuid4()
+        self.user = user
+        self.user_id = user.id
+        self.qr_code = 'http://localhost:8000/asset/{0}'.format(self.id.hex)
+        self.name = 'asset {0}'.format(index)
+        self.description = 'benchmark asset'
+        self.use = 'personal'
+        self.model_number = 'MN-{0}'.format(index)
+        self.vendor = 'vendor'
+        self.price_value = index
+        self.price_currency_code = 'AUD'
+        self.date_purchased = datetime(2014, 1, 1)
+        self.image = None
+
+    @property
+    def price(self):
+        ## As `Asset.price`, the amount is constructed on each access
+        return MoneyAmount(self.price_currency_code, self.price_value)
+
+    def to_row(self, columns):
+        values = dict(
+            id=self.id,
+            user_id=self.user_id,
+            name=self.name,
+            description=self.description,
+            use=self.use,
+            model_number=self.model_number,
+            vendor=self.vendor,
+            price_value=self.price_value,
+            price_currency_code=self.price_currency_code,
+            date_purchased=self.date_purchased,
+            image=''
+        )
+        return tuple(values[column] for column in columns)
+
+
+def reflective_to_json(resource, model):
+    """
+    Field resolution as performed by `ModelResource.to_json` before
+    serialization plans were compiled.
+    """
+    result = dict()
+    for field, field_resource in resource._resource_fields.items():
+        custom_getter_name = 'get_{0}'.format(field)
+        if hasattr(resource, custom_getter_name):
+            raw_value = getattr(resource, custom_getter_name)(model)
+        elif hasattr(model, '__getitem__'):
+            raw_value = model[field]
+        else:
+            raw_value = getattr(model, field)
+        if isinstance(field_resource, ListResource):
+            field_value = [reflective_to_json(field_resource.item_resource, v)
+                           for v in raw_value]
+        else:
+            field_value = field_resource.to_json(raw_value)
+        if field_value is not None:
+            result[field] = field_value
+    result['kind'] = resource.KIND
+    return result
+
+
+def main():
+    user = _User(1)
+    assets = [_Asset(user, i) for i in range(NUM_ASSETS)]
+    asset_list = dict(user_id=user.id, next_page_token=uuid.uuid4().hex,
+                      assets=assets)
+    list_resource = AssetListResource()
+
+    print('Serializing {0} assets'.format(NUM_ASSETS))
+    baseline = run_benchmark(
+        'reflective field resolution',
+        lambda: reflective_to_json(list_resource, asset_list))
+    optimized = run_benchmark(
+        'compiled serialization plan',
+        lambda: list_resource.to_json(asset_list))
+    report_speedup(baseline, optimized)
+
+    asset_resource = AssetResource()
+    columns = asset_resource.row_columns()
+    rows = [asset.to_row(columns) for asset in assets]
+    baseline = run_benchmark(
+        'model serialization',
+        lambda: list(map(asset_resource.to_json, assets)))
+    optimized = run_benchmark(
+        'row serialization',
+        lambda: asset_resource.to_json_many(rows, columns=columns))
+    report_speedup(baseline, optimized)
+
+    selector = Selector.parse('id,name')
+    baseline = run_benchmark(
+        'select fields after serialization',
+        lambda: [selector.select(asset_resource.to_json(asset))
+                 for asset in assets])
+    optimized = run_benchmark(
+        'selector aware serialization',
+        lambda: [asset_resource.to_json_selected(asset, selector)
+                 for asset in assets])
+    report_speedup(baseline, optimized)
+
+
+if __name__ == '__main__':
+    main()
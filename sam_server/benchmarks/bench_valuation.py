@@ -0,0 +1,63 @@
+"""
+Measures valuing 100000 assets (in two currencies, with three
+depreciation methods and purchase dates spread over five years)
+from rows of their valuation columns, against valuing each asset
+by computing its depreciation from its row.
+"""
+import datetime
+import uuid
+
+import django
+
+from . import run_benchmark, report_speedup
+
+## asset.valuation imports the asset models
+django.setup()
+
+from common.currency import MoneyAmount, _round_half_even
+from asset.valuation import value_assets, StraightLine, DecliningBalance
+
+NUM_ASSETS = 100000
+
+
+def main():
+    methods = {
+        'default': StraightLine(5),
+        'vehicle': DecliningBalance('0.25'),
+        'computer': DecliningBalance('0.4'),
+    }
+    uses = ['vehicle', 'tools', 'computer']
+    codes = ['AUD', 'USD']
+    start = datetime.date(2010, 1, 1)
+    rows = [
+        (uuid.uuid4(), uses[i % len(uses)], i, codes[i % len(codes)],
+         start + datetime.timedelta(days=i % 1800))
+        for i in range(NUM_ASSETS)
+    ]
+    as_of = datetime.date(2015, 6, 30)
+
+    def run_per_asset():
+        totals = dict()
+        for id, use, price_value, price_currency_code, date_purchased in rows:
+            method = methods.get(use, methods['default'])
+            numerator, denominator = method.factor(
+                (as_of - date_purchased).days)
+            book_value = MoneyAmount(
+                price_currency_code,
+                _round_half_even(price_value * numerator, denominator))
+            totals[price_currency_code] = (
+                totals.get(price_currency_code, MoneyAmount(price_currency_code, 0)) +
+                book_value)
+        return totals
+
+    def run_batch():
+        return value_assets(rows, as_of, methods).totals()
+
+    print('Valuing {0} assets'.format(NUM_ASSETS))
+    baseline = run_benchmark('value each asset', run_per_asset, number=1)
+    optimized = run_benchmark('value assets in a batch', run_batch, number=1)
+    report_speedup(baseline, optimized)
+
+
+if __name__ == '__main__':
+    main()
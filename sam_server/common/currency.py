@@ -1,26 +1,39 @@
+from array import array
 from functools import total_ordering
 from numbers import Rational
 from fractions import Fraction
-from decimal import Decimal
-import os
-from xml.etree import ElementTree
+from decimal import Decimal, ROUND_HALF_EVEN
+import re
 
-from dateutil.parser import parser as date_parser
-
-from django.conf import settings
 from parsers import parser, lexer
 from parsers.exceptions import ParseError
-
-UTIL_FILES = os.path.join(settings.BASE_DIR, 'common', 'utility_files')
-
-ISO_4217_PATH = os.path.join(UTIL_FILES, 'iso_4217.xml')
-CURRENCY_SYMBOLS_PATH = os.path.join(UTIL_FILES, 'currency_symbols.xml')
+from . import iso_4217_table
+
+## Matches a money amount, either as '{currency_code} {decimal_value}'
+## or as '{decimal_value} {currency_code}'. Codes are case insensitive
+## and the space between the code and the value is optional, as accepted
+## by `MoneyAmountParser`. Only ASCII digits are matched.
+_DECIMAL_VALUE = r'(?P<sign>[-+]?)(?P<major>[0-9]+)(?:\.(?P<minor>[0-9]+))?'
+_DECIMAL_VALUE_PATTERN = re.compile(_DECIMAL_VALUE)
+_CODE_FIRST_PATTERN = re.compile(
+    r'\s*(?P<code>[A-Za-z]{3})\s*' + _DECIMAL_VALUE + r'\s*')
+_VALUE_FIRST_PATTERN = re.compile(
+    r'\s*' + _DECIMAL_VALUE + r'\s*(?P<code>[A-Za-z]{3})\s*')
 
 ## TODO: GET RID OF INTEGER VALUE, just use decimal everywhere
 ## TODO: Money should be formatted as '{decimal_value} {currency_code}'
 
 @total_ordering
 class MoneyAmount(object):
+    """
+    An immutable amount of money, stored as an integer number of minor
+    units of the currency (eg. cents).
+
+    Amounts hold a reference to their (interned) `Currency`, so operations
+    on amounts in the same currency never need to look up the currency.
+    """
+    __slots__ = ('currency', 'value')
+
     def __init__(self, currency_code, value=None):
         """
         Creates a new money amount using the given value.
@@ -32,29 +45,71 @@ class MoneyAmount(object):
         """
         if value is None:
             money = self.parse(currency_code)
-            self.code = money.code
-            self.currency = money.currency
-            self.value = money.value
+            _set_currency(self, money.currency)
+            _set_value(self, money.value)
             return
-        self.code = currency_code
-        self.currency = Currency.from_code(currency_code)
-
-        if isinstance(value, str):
-            decimal_value = Decimal(value)
-            int_value = self.currency.to_integer_value(
-                *map(int, str(decimal_value).split('.'))
-            )
-        elif isinstance(value, int):
+        if isinstance(currency_code, Currency):
+            currency = currency_code
+        else:
+            currency = Currency.from_code(currency_code)
+
+        if isinstance(value, int):
             int_value = value
+        elif isinstance(value, str):
+            match = _DECIMAL_VALUE_PATTERN.fullmatch(value)
+            if match is None:
+                raise ValueError('Invalid decimal value: {0}'.format(value))
+            int_value = currency.value_from_digits(match.group('major'),
+                                                   match.group('minor'))
+            if match.group('sign') == '-':
+                int_value = -int_value
+        elif isinstance(value, Decimal):
+            int_value = int(value.to_integral_value(rounding=ROUND_HALF_EVEN))
+        elif isinstance(value, Rational):
+            ## round uses bankers rounding
+            int_value = round(value)
         else:
             raise TypeError('Unsupported value type {0}'.format(type(value)))
 
-        self.value = int_value
+        _set_currency(self, currency)
+        _set_value(self, int_value)
+
+    @classmethod
+    def _from_integer_value(cls, currency, value):
+        """
+        Create an amount from a `Currency` and an integer value without
+        any validation or conversion of the arguments
+        """
+        amount = _new_amount(cls)
+        _set_currency(amount, currency)
+        _set_value(amount, value)
+        return amount
 
     @classmethod
     def parse(cls, money_amount):
-        parser = MoneyAmountParser()
-        return parser.run(money_amount)
+        """
+        Parses a money amount formatted as either '{code} {value}'
+        or '{value} {code}' (eg. 'AUD 12.34' or '12.34 AUD').
+
+        The integer value is computed directly from the digits matched
+        by a regular expression. Inputs which do not match are parsed
+        by a `MoneyAmountParser`.
+        """
+        match = (_CODE_FIRST_PATTERN.fullmatch(money_amount) or
+                 _VALUE_FIRST_PATTERN.fullmatch(money_amount))
+        if match is None:
+            parser = MoneyAmountParser()
+            return parser.run(money_amount)
+        currency = Currency.from_code(match.group('code'))
+        value = currency.value_from_digits(match.group('major'),
+                                           match.group('minor'))
+        if match.group('sign') == '-':
+            value = -value
+        return cls._from_integer_value(currency, value)
+
+    @property
+    def code(self):
+        return self.currency.code
 
     @property
     def decimal_string_value(self):
@@ -71,57 +126,94 @@ class MoneyAmount(object):
             string += (leading_zeroes + str_value)
         return string
 
-    def convert_to(self, curr_code):
+    def convert_to(self, curr_code, as_of=None):
+        """
+        Convert the amount to the currency with the given code, using the
+        exchange rates of the process (see `common.exchange`).
+
+        If `as_of` is a date, the amount is converted at the rates on
+        that date.
+        """
         if self.code == curr_code:
             return self
-        raise NotImplementedError('Currency conversions')
+        from . import exchange
+        if as_of is not None:
+            return exchange.convert_as_of(self, curr_code, as_of)
+        return exchange.convert(self, curr_code)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('MoneyAmount is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('MoneyAmount is immutable')
+
+    def __reduce__(self):
+        return (MoneyAmount, (self.currency.code, self.value))
+
+    def __hash__(self):
+        return hash((self.currency.code, self.value))
 
     def __eq__(self, other):
         if self is other:
             return True
-        if other is None:
-            return False
-        return self.code == other.code and self.value == other.value
+        if not isinstance(other, MoneyAmount):
+            return NotImplemented
+        return self.currency is other.currency and self.value == other.value
 
     def __lt__(self, other):
         """
         Returns `True` if self < other. If the amounts are in different
-        currencies, convert them both to `self.curr_code` before comparison
+        currencies, convert other to `self.code` before comparison
 
-        Note that currency conversion is a *very* expensive operation
+        To sort many amounts in different currencies, use the key
+        `common.exchange.sort_key`, which converts each amount once.
         """
-        other = other.convert_to(self.code)
+        if other.currency is not self.currency:
+            other = other.convert_to(self.code)
         return self.value < other.value
 
     def __add__(self, other):
         """
         Add the two amounts. If the amounts are in different currencies,
-        convert them both to `self.curr_code` before addition
+        convert other to `self.code` before addition
         """
         if not isinstance(other, MoneyAmount):
             raise TypeError('Expected a MoneyAmount: {0}'.format(other))
-        other = other.convert_to(self.code)
-        return MoneyAmount(self.code, self.value + other.value)
+        if other.currency is not self.currency:
+            other = other.convert_to(self.code)
+        return self._from_integer_value(self.currency, self.value + other.value)
+
+    def __radd__(self, other):
+        ## Allow amounts to be totalled with sum()
+        if other == 0:
+            return self
+        return self.__add__(other)
 
     def __pos__(self):
-        return MoneyAmount(self.code, +self.value)
+        return self
 
     def __neg__(self):
-        return MoneyAmount(self.code, -self.value)
+        return self._from_integer_value(self.currency, -self.value)
 
     def __sub__(self, other):
-        return self.__add__(other.__neg__())
+        if not isinstance(other, MoneyAmount):
+            raise TypeError('Expected a MoneyAmount: {0}'.format(other))
+        if other.currency is not self.currency:
+            other = other.convert_to(self.code)
+        return self._from_integer_value(self.currency, self.value - other.value)
 
     def __mul__(self, frac):
         """
         Multiply the amount by the given fraction, using bankers rounding
         to round to the nearest value
         """
+        if isinstance(frac, int):
+            return self._from_integer_value(self.currency, frac * self.value)
         if isinstance(frac, Decimal):
             frac = Fraction.from_decimal(frac)
         elif not isinstance(frac, Rational):
             raise TypeError('Expected a Decimal or a numbers.Rational value')
-        return MoneyAmount(self.code, frac * self.value)
+        return self._from_integer_value(self.currency, round(frac * self.value))
 
     def __repr__(self):
         return str(self)
@@ -130,116 +222,348 @@ class MoneyAmount(object):
         string = '{0} {1}'.format(self.code, self.decimal_string_value)
         return string
 
+## The slots of MoneyAmount, bypassing the (immutable) __setattr__
+_new_amount = object.__new__
+_set_currency = MoneyAmount.__dict__['currency'].__set__
+_set_value = MoneyAmount.__dict__['value'].__set__
+
+
+class MoneyArray(object):
+    """
+    A sequence of money amounts, possibly in different currencies, stored
+    as an `array('q')` of integer values (in minor units of the currency)
+    and a parallel column of currencies.
+
+    Aggregates are computed over the integer values of each currency,
+    without creating a `MoneyAmount` for each item of the array.
+    """
+    __slots__ = ('values', '_currency_indexes', '_currencies',
+                 '_currency_index')
+
+    def __init__(self, amounts=()):
+        self.values = array('q')
+        ## The currency of each value, as an index into _currencies
+        self._currency_indexes = array('H')
+        self._currencies = []
+        self._currency_index = dict()
+        self.extend(amounts)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Create an array from an iterable of (value, currency_code) pairs,
+        eg. as returned by `values_list('price_value', 'price_currency_code')`.
+        Rows with a `None` value are skipped.
+        """
+        money_array = cls()
+        append_value = money_array.append_value
+        for value, currency_code in rows:
+            if value is not None:
+                append_value(value, currency_code)
+        return money_array
+
+    @classmethod
+    def from_values(cls, currency_code, values):
+        """
+        Create an array from an iterable of integer values, all in the
+        currency with the given code
+        """
+        money_array = cls()
+        money_array.values.extend(values)
+        if money_array.values:
+            index = money_array._index_of(Currency.from_code(currency_code))
+            money_array._currency_indexes.extend([index] * len(money_array.values))
+        return money_array
+
+    @property
+    def currencies(self):
+        """
+        The currencies of the values in the array
+        """
+        return list(self._currencies)
+
+    @property
+    def currency_codes(self):
+        """
+        The currency code of each of the values in the array
+        """
+        codes = [currency.code for currency in self._currencies]
+        return [codes[i] for i in self._currency_indexes]
+
+    def _index_of(self, currency):
+        try:
+            return self._currency_index[currency.code]
+        except KeyError:
+            index = len(self._currencies)
+            self._currencies.append(currency)
+            self._currency_index[currency.code] = index
+            return index
+
+    def append(self, amount):
+        if not isinstance(amount, MoneyAmount):
+            raise TypeError('Expected a MoneyAmount: {0}'.format(amount))
+        self._currency_indexes.append(self._index_of(amount.currency))
+        self.values.append(amount.value)
+
+    def append_value(self, value, currency_code):
+        """
+        Append an integer value in minor units of the given currency
+        """
+        try:
+            index = self._currency_index[currency_code]
+        except KeyError:
+            index = self._index_of(Currency.from_code(currency_code))
+        self._currency_indexes.append(index)
+        self.values.append(value)
+
+    def extend(self, amounts):
+        for amount in amounts:
+            self.append(amount)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        currency = self._currencies[self._currency_indexes[index]]
+        return MoneyAmount._from_integer_value(currency, self.values[index])
+
+    def __iter__(self):
+        currencies = self._currencies
+        from_integer_value = MoneyAmount._from_integer_value
+        for index, value in zip(self._currency_indexes, self.values):
+            yield from_integer_value(currencies[index], value)
+
+    def to_amounts(self):
+        """
+        Convert the array to a list of `MoneyAmount`
+        """
+        return list(self)
+
+    def _partition(self):
+        """
+        Returns a list of (currency, values) pairs, where values is an
+        array of all the values of the currency.
+        """
+        if len(self._currencies) <= 1:
+            return [(currency, self.values) for currency in self._currencies]
+        partitions = [array('q') for _ in self._currencies]
+        appends = [partition.append for partition in partitions]
+        for index, value in zip(self._currency_indexes, self.values):
+            appends[index](value)
+        return list(zip(self._currencies, partitions))
+
+    def _aggregate_by_currency(self, aggregate):
+        from_integer_value = MoneyAmount._from_integer_value
+        return {
+            currency.code: from_integer_value(currency, aggregate(values))
+            for currency, values in self._partition()
+            if values
+        }
+
+    def sum_by_currency(self):
+        """
+        Returns a dict mapping each currency code to the total of the
+        values in that currency
+        """
+        return self._aggregate_by_currency(sum)
+
+    def min_by_currency(self):
+        return self._aggregate_by_currency(min)
+
+    def max_by_currency(self):
+        return self._aggregate_by_currency(max)
+
+    def mean_by_currency(self):
+        """
+        Returns a dict mapping each currency code to the mean of the
+        values in that currency, using bankers rounding to round to
+        the nearest value
+        """
+        return self._aggregate_by_currency(
+            lambda values: round(Fraction(sum(values), len(values))))
+
+    def __mul__(self, frac):
+        """
+        Multiply every amount by the given fraction, using bankers rounding
+        to round to the nearest value
+        """
+        if isinstance(frac, Decimal):
+            frac = Fraction.from_decimal(frac)
+        elif not isinstance(frac, Rational):
+            raise TypeError('Expected a Decimal or a numbers.Rational value')
+        numerator, denominator = frac.numerator, frac.denominator
+        if denominator == 1:
+            values = array('q', [value * numerator for value in self.values])
+        else:
+            values = array('q', [
+                _round_half_even(value * numerator, denominator)
+                for value in self.values
+            ])
+        return self.with_values(values)
+
+    def with_values(self, values):
+        """
+        Returns an array of the given values (an `array('q')`), with the
+        same currency at each position as this array
+        """
+        if len(values) != len(self.values):
+            raise ValueError('Expected {0} values'.format(len(self.values)))
+        money_array = MoneyArray()
+        money_array.values = values
+        money_array._currency_indexes = array('H', self._currency_indexes)
+        money_array._currencies = list(self._currencies)
+        money_array._currency_index = dict(self._currency_index)
+        return money_array
+
+    def __repr__(self):
+        return 'MoneyArray({0!r})'.format(self.to_amounts())
+
+
+def _round_half_even(numerator, denominator):
+    """
+    Divide numerator by (positive) denominator, rounding to the nearest
+    integer and rounding halves to the nearest even integer
+    """
+    quotient, remainder = divmod(numerator, denominator)
+    remainder *= 2
+    if remainder > denominator or (remainder == denominator and quotient & 1):
+        quotient += 1
+    return quotient
+
 
 class Currency(object):
+    """
+    An ISO 4217 currency.
+
+    Currencies are immutable and are created once, when the module is
+    imported, from the compiled currency table (see common.currency_table)
+    """
+    __slots__ = ('code', 'name', 'countries', 'number',
+                 'num_digits_in_minor_units')
+
     """
     A dict mapping currency codes to currency, loaded from the
     ISO 4217 standards document
     """
     _currencies = None
 
+    """
+    Indexes of the currencies by ISO 4217 number and by (upper case)
+    country name
+    """
+    _currencies_by_number = None
+    _currencies_by_country = None
+
     """
     The date that the currency list was published
     """
-    _date_published = None
+    _date_published = iso_4217_table.DATE_PUBLISHED
 
     """
     A map of currency codes to symbols
     """
-    _symbols = None
+    _symbols = iso_4217_table.SYMBOLS
 
-    @classmethod
-    def _load_currencies_from_iso(cls):
-        tree = ElementTree.parse(ISO_4217_PATH)
-        root = tree.getroot()
-        cls._date_published = date_parser(root.attrib['Pblshd'])
-        currencies = dict()
-        for element in root.findall('./CcyTbl/CcyNtry'):
-            currency_code_elem = element.find('Ccy')
-            if currency_code_elem is None:
-                # The entry does not represent a currency
-                continue
-            currency_code = currency_code_elem.text
-            try:
-                currency = currencies[currency_code]
-                # The currency already exists, just add the country to it
-                country_name_elem = element.find('CtryNm')
-                currency.countries.add(country_name_elem.text)
+    def __init__(self, code, name, countries, number,
+                 num_digits_in_minor_units=None):
+        set_attr = super(Currency, self).__setattr__
+        set_attr('code', code)
+        set_attr('name', name)
+        set_attr('countries', frozenset(countries))
+        set_attr('number', number)
+        set_attr('num_digits_in_minor_units', num_digits_in_minor_units)
 
-            except KeyError:
-                currencies[currency_code] = Currency._from_element(currency_code, element)
-        cls._currencies = currencies
+    def __setattr__(self, name, value):
+        raise AttributeError('Currency is immutable')
 
-    @classmethod
-    def _load_symbols(cls):
-        def to_symbol(hex_codepoints):
-            if hex_codepoints == '':
-                return ''
-            return ''.join(chr(int(d, base=16)) for d in hex_codepoints.split(','))
-        tree = ElementTree.parse(CURRENCY_SYMBOLS_PATH)
-        root = tree.getroot()
-        symbols = dict()
-        for element in root.findall('entry'):
-            code = element.attrib['code']
-            symbol = to_symbol(element.attrib['unicode-hex'])
-            symbols[code] = symbol
-        cls._symbols = symbols
+    def __delattr__(self, name):
+        raise AttributeError('Currency is immutable')
 
-    def __init__(self, code, name, countries, number,
-                 num_digits_in_minor_units=None):
-        self.code = code
-        self.name = name
-        self.countries = countries
-        self.number = number
-        self.num_digits_in_minor_units = num_digits_in_minor_units
+    def __reduce__(self):
+        ## Unpickle to the interned currency
+        return (Currency.from_code, (self.code,))
+
+    def __repr__(self):
+        return 'Currency({0!r})'.format(self.code)
 
     @classmethod
-    def _from_element(cls, currency_code, element):
-        country_name_elem = element.find('CtryNm')
-        if country_name_elem is None:
-            return None
-        num_digits = element.find('CcyMnrUnts').text
-        if num_digits == 'N.A.':
-            num_digits = None
-        else:
-            num_digits = int(num_digits)
-        return cls(
-            code=currency_code,
-            name=element.find('CcyNm').text,
-            number=int(element.find('CcyNbr').text),
-            countries=set([country_name_elem.text, ]),
-            num_digits_in_minor_units=num_digits
-        )
+    def _load_table(cls):
+        currencies = dict()
+        by_number = dict()
+        by_country = dict()
+        for code, name, number, num_digits, countries in iso_4217_table.CURRENCIES:
+            currency = cls(code, name, countries, number, num_digits)
+            currencies[code] = currency
+            by_number.setdefault(number, currency)
+            for country in countries:
+                ## Some countries use more than one currency.
+                ## The first listed currency is the currency of the country.
+                by_country.setdefault(country.upper(), currency)
+        cls._currencies = currencies
+        cls._currencies_by_number = by_number
+        cls._currencies_by_country = by_country
 
     @classmethod
     def from_code(cls, code):
         """
-        Load the currency from the ISO document stored at
-        settings.ISO_4217_PATH
+        Get the currency with the given ISO 4217 currency code.
+        The code is case insensitive
         """
-        if cls._currencies is None:
-            cls._load_currencies_from_iso()
         try:
-            currency = cls._currencies[code]
+            return cls._currencies[code]
         except KeyError:
+            pass
+        try:
+            return cls._currencies[code.upper()]
+        except (KeyError, AttributeError):
             raise CurrencyException(
                 'Unrecognised ISO currency code: {0}'.format(code))
-        return currency
+
+    @classmethod
+    def from_number(cls, number):
+        """
+        Get the currency with the given ISO 4217 numeric code
+        (either an int or a string of digits, eg. '036')
+        """
+        try:
+            return cls._currencies_by_number[int(number)]
+        except (KeyError, ValueError, TypeError):
+            raise CurrencyException(
+                'Unrecognised ISO currency number: {0}'.format(number))
 
     @classmethod
     def from_country(cls, country):
-        if cls._currencies is None:
-            cls._load_currencies_from_iso()
-        for currency in cls._currencies.values():
-            if country in currency.countries:
-                return currency
-        raise CurrencyException(
-            'No ISO currency for country {0}'.format(country))
+        """
+        Get the currency of the country with the given (case insensitive)
+        ISO 3166 country name.
+        """
+        try:
+            return cls._currencies_by_country[country.upper()]
+        except (KeyError, AttributeError):
+            raise CurrencyException(
+                'No ISO currency for country {0}'.format(country))
+
+    @classmethod
+    def from_countries(cls, countries):
+        """
+        Get the currencies of each of the countries in the iterable
+        (see `from_country`).
+
+        Returns a list of currencies, in the same order as the countries.
+        """
+        by_country = cls._currencies_by_country
+        currencies = []
+        append = currencies.append
+        for country in countries:
+            try:
+                append(by_country[country.upper()])
+            except (KeyError, AttributeError):
+                raise CurrencyException(
+                    'No ISO currency for country {0}'.format(country))
+        return currencies
 
     @classmethod
     def _get_symbol(cls, code):
-        if cls._symbols is None:
-            cls._load_symbols()
         return cls._symbols[code]
 
     @property
@@ -270,6 +594,23 @@ class Currency(object):
         value += minor_units
         return value
 
+    def value_from_digits(self, major_digits, minor_digits=None):
+        """
+        Returns the integer value of the decimal value with the given
+        string of major and (optionally) minor digits, in amounts of the
+        minor unit.
+
+        eg. for AUD, ('12', '3') represents 12.30 and returns 1230
+        """
+        num_digits = self.num_digits_in_minor_units or 0
+        if not minor_digits:
+            return int(major_digits) * pow(10, num_digits)
+        if len(minor_digits) > num_digits:
+            raise CurrencyException(
+                'Minor units of {0} limited to {1} digits'
+                .format(self.code, num_digits))
+        return int(major_digits + minor_digits.ljust(num_digits, '0'))
+
     def from_integer_value(self, currency_value):
         """
         Returns a tuple (major_units, minor_units) representing the decimal
@@ -282,6 +623,10 @@ class Currency(object):
         return (currency_value // self.minor_units,
                 currency_value % self.minor_units)
 
+## Built at import, so that processes forked after importing the module
+## share the currency table
+Currency._load_table()
+
 
 class MoneyAmountParser(parser.Parser):
     LEXER_TOKENS = [
@@ -290,10 +635,11 @@ class MoneyAmountParser(parser.Parser):
         ('INT', lexer.RegexToken(r'[0-9]+')),
         ('CURR_CODE', lexer.RegexToken(r'[a-zA-Z]{3}')),
     ]
+    ## Lexers are stateless, so a single lexer is shared by all parsers
+    LEXER = lexer.Lexer(LEXER_TOKENS)
 
     def __init__(self):
-        lex = lexer.Lexer(self.LEXER_TOKENS)
-        super(MoneyAmountParser, self).__init__(lex)
+        super(MoneyAmountParser, self).__init__(self.LEXER)
 
     def begin(self):
         code = self.parse_currency_code()
@@ -302,7 +648,7 @@ class MoneyAmountParser(parser.Parser):
         except CurrencyException as e:
             raise ParseError(self.position, str(e))
         value = self.parse_currency_value(currency)
-        return MoneyAmount(code, value)
+        return MoneyAmount._from_integer_value(currency, value)
 
     def parse_currency_code(self):
         token = self.move_next()
@@ -319,37 +665,38 @@ class MoneyAmountParser(parser.Parser):
         elif token.name == 'SIGN':
             is_negative_value = (token.string == '-')
             token = self.move_next()
-        major_units = self.parse_major_units()
-        minor_units = self.parse_minor_units(currency)
-        value = currency.to_integer_value(major_units, minor_units)
+        major_digits = self.parse_major_units()
+        minor_digits = self.parse_minor_units()
+        ## Scaled to the minor units of the currency as in
+        ## `MoneyAmount.parse`, so that '4.1' is 4.10
+        value = currency.value_from_digits(major_digits, minor_digits)
         if is_negative_value:
             value = -value
         return value
 
     def parse_major_units(self):
+        """
+        The digits of the major units
+        """
         token = self.move_next()
         if not token or token.name != 'INT':
             raise ParseError(self.position, 'Expected major units')
-        return int(token.string)
+        return token.string
 
-    def parse_minor_units(self, currency):
+    def parse_minor_units(self):
+        """
+        The digits of the minor units, or None if the value has no
+        decimal point
+        """
         token = self.move_next()
-        if (currency.minor_units is None or currency.minor_units == 0):
-            if token is not None:
-                raise ParseError(self.position,
-                                 'Currency {0} has no minor units'
-                                 .format(currency.currency_name))
-            return 0
         if token is None:
-            raise ParseError(self.position,
-                             'Currency {0} has minor units'
-                             .format(currency.name))
+            return None
+        if token.name != 'PERIOD':
+            raise ParseError(self.position, 'Expected decimal point')
         token = self.move_next()
         if token is None or token.name != 'INT':
-            raise ParseError(self.position,
-                             'Currency {0} has minor units'
-                             .format(currency.name))
-        return int(token.string)
+            raise ParseError(self.position, 'Expected minor units')
+        return token.string
 
 
 class CurrencyException(Exception):
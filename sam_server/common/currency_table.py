@@ -0,0 +1,150 @@
+"""
+currency_table
+Compiles the ISO 4217 currency list (common/utility_files/iso_4217.xml)
+and the currency symbols (common/utility_files/currency_symbols.xml)
+into an importable python module (common/iso_4217_table.py), so that
+the XML files do not need to be parsed when a process first looks up
+a currency.
+
+The compiled table needs to be regenerated whenever either of the XML
+files is updated.
+
+Usage (from the sam_server directory):
+    python -m common.currency_table
+        Writes the compiled table
+    python -m common.currency_table --check
+        Exits with a non-zero status if the compiled table does
+        not match the XML files
+"""
+import datetime
+import os
+import pprint
+import sys
+from xml.etree import ElementTree
+
+UTIL_FILES = os.path.join(os.path.dirname(__file__), 'utility_files')
+
+ISO_4217_PATH = os.path.join(UTIL_FILES, 'iso_4217.xml')
+CURRENCY_SYMBOLS_PATH = os.path.join(UTIL_FILES, 'currency_symbols.xml')
+
+TABLE_PATH = os.path.join(os.path.dirname(__file__), 'iso_4217_table.py')
+
+TABLE_HEADER = '''\
+## Generated by common/currency_table.py from the ISO 4217 currency list
+## and the currency symbols in common/utility_files. DO NOT EDIT.
+##
+## CURRENCIES is a tuple of
+##     (code, name, number, num_digits_in_minor_units, countries)
+## SYMBOLS maps currency codes to currency symbols
+import datetime
+
+'''
+
+
+def read_currencies(path=ISO_4217_PATH):
+    """
+    Reads the ISO 4217 document at the given path.
+    Returns a tuple (date_published, currencies), where currencies is
+    a tuple of (code, name, number, num_digits_in_minor_units, countries)
+    entries, ordered by the first appearance of each currency code.
+    """
+    root = ElementTree.parse(path).getroot()
+    date_published = datetime.datetime.strptime(
+        root.attrib['Pblshd'], '%Y-%m-%d').date()
+    currencies = dict()
+    for element in root.findall('./CcyTbl/CcyNtry'):
+        currency_code_elem = element.find('Ccy')
+        country_name_elem = element.find('CtryNm')
+        if currency_code_elem is None or country_name_elem is None:
+            # The entry does not represent a currency
+            continue
+        code = currency_code_elem.text
+        try:
+            currency = currencies[code]
+            # The currency already exists, just add the country to it
+            if country_name_elem.text not in currency[4]:
+                currency[4].append(country_name_elem.text)
+        except KeyError:
+            num_digits = element.find('CcyMnrUnts').text
+            if num_digits == 'N.A.':
+                num_digits = None
+            else:
+                num_digits = int(num_digits)
+            currencies[code] = (
+                code,
+                element.find('CcyNm').text,
+                int(element.find('CcyNbr').text),
+                num_digits,
+                [country_name_elem.text]
+            )
+    return date_published, tuple(
+        currency[:4] + (tuple(currency[4]),)
+        for currency in currencies.values()
+    )
+
+
+def read_symbols(path=CURRENCY_SYMBOLS_PATH):
+    """
+    Reads the currency symbols document at the given path.
+    Returns a dict mapping currency codes to symbols.
+    """
+    def to_symbol(hex_codepoints):
+        if hex_codepoints == '':
+            return ''
+        return ''.join(chr(int(d, base=16)) for d in hex_codepoints.split(','))
+    root = ElementTree.parse(path).getroot()
+    symbols = dict()
+    for element in root.findall('entry'):
+        symbols[element.attrib['code']] = to_symbol(element.attrib['unicode-hex'])
+    return symbols
+
+
+def render_table(date_published, currencies, symbols):
+    """
+    Returns the source of the compiled table module
+    """
+    return ''.join([
+        TABLE_HEADER,
+        'DATE_PUBLISHED = {0!r}\n\n'.format(date_published),
+        'CURRENCIES = ', pprint.pformat(currencies), '\n\n',
+        'SYMBOLS = ', pprint.pformat(symbols), '\n',
+    ])
+
+
+def compile_table():
+    date_published, currencies = read_currencies()
+    return render_table(date_published, currencies, read_symbols())
+
+
+def check_table(table_path=TABLE_PATH):
+    """
+    Returns True if the compiled table at the given path matches the
+    source XML documents
+    """
+    try:
+        with open(table_path, encoding='utf-8') as f:
+            return f.read() == compile_table()
+    except FileNotFoundError:
+        return False
+
+
+def write_table(table_path=TABLE_PATH):
+    with open(table_path, 'w', encoding='utf-8') as f:
+        f.write(compile_table())
+
+
+def main(argv):
+    if '--check' in argv:
+        if not check_table():
+            print('{0} does not match the ISO 4217 XML files. '
+                  'Run `python -m common.currency_table` to regenerate it'
+                  .format(TABLE_PATH), file=sys.stderr)
+            return 1
+        return 0
+    write_table()
+    print('Wrote {0}'.format(TABLE_PATH))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
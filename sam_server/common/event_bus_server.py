@@ -0,0 +1,161 @@
+"""
+event_bus_server
+A stand-in for a redis server, which implements the commands used by the
+redis event bus (see `common.events`), for development and tests.
+
+    python -m common.event_bus_server [host:port]
+"""
+from collections import defaultdict
+import selectors
+import socket
+import sys
+
+from .events import (DEFAULT_HOST, DEFAULT_PORT, SEND_TIMEOUT, EventBusError,
+                     _Incomplete, _encode_bulk, encode_command, parse_reply)
+
+
+def _encode_integer(value):
+    return b':' + str(value).encode('ascii') + b'\r\n'
+
+
+def _encode_subscription_reply(kind, channel, num_channels):
+    return (b'*3\r\n' + _encode_bulk(kind) + _encode_bulk(channel) +
+            _encode_integer(num_channels))
+
+
+class EventBusServer(object):
+    """
+    A stand-in for a redis server, which only implements the PING, PUBLISH,
+    SUBSCRIBE and UNSUBSCRIBE commands
+    """
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((host, port))
+        self.socket.listen(128)
+        self.socket.setblocking(False)
+        self.address = self.socket.getsockname()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.socket, selectors.EVENT_READ)
+        self._buffers = dict()
+        self._subscriptions = defaultdict(set)
+        self._client_channels = defaultdict(set)
+        self._closed = False
+
+    def serve_forever(self):
+        try:
+            while not self._closed:
+                for key, _ in self._selector.select(timeout=0.5):
+                    if key.fileobj is self.socket:
+                        self._accept()
+                    else:
+                        self._read(key.fileobj)
+        finally:
+            for client in list(self._buffers):
+                self._disconnect(client)
+            self._selector.close()
+            self.socket.close()
+
+    def shutdown(self):
+        self._closed = True
+
+    def _accept(self):
+        try:
+            client, _ = self.socket.accept()
+        except BlockingIOError:
+            return
+        ## A subscriber which stops reading its messages is disconnected,
+        ## rather than blocking the server
+        client.settimeout(SEND_TIMEOUT)
+        self._buffers[client] = b''
+        self._selector.register(client, selectors.EVENT_READ)
+
+    def _disconnect(self, client):
+        self._selector.unregister(client)
+        del self._buffers[client]
+        for channel in self._client_channels.pop(client, ()):
+            self._subscriptions[channel].discard(client)
+        client.close()
+
+    def _send(self, client, data):
+        if client not in self._buffers:
+            return
+        try:
+            client.sendall(data)
+        except OSError:
+            self._disconnect(client)
+
+    def _read(self, client):
+        try:
+            data = client.recv(4096)
+        except OSError:
+            data = b''
+        if not data:
+            self._disconnect(client)
+            return
+        buffer = self._buffers[client] + data
+        position = 0
+        while True:
+            try:
+                command, position = parse_reply(buffer, position)
+            except _Incomplete:
+                break
+            except (EventBusError, ValueError):
+                self._disconnect(client)
+                return
+            self._handle(client, command)
+            if client not in self._buffers:
+                return
+        self._buffers[client] = buffer[position:]
+
+    def _handle(self, client, command):
+        if not isinstance(command, list) or not command:
+            self._send(client, b'-ERR invalid command\r\n')
+            return
+        name = command[0].upper()
+        args = [arg.decode('utf-8') for arg in command[1:]]
+        if name == b'PING':
+            self._send(client, b'+PONG\r\n')
+        elif name == b'PUBLISH' and len(args) == 2:
+            channel, message = args
+            subscribers = list(self._subscriptions.get(channel, ()))
+            for subscriber in subscribers:
+                self._send(subscriber,
+                           encode_command('message', channel, message))
+            self._send(client, _encode_integer(len(subscribers)))
+        elif name == b'SUBSCRIBE' and args:
+            channels = self._client_channels[client]
+            for channel in args:
+                channels.add(channel)
+                self._subscriptions[channel].add(client)
+                self._send(client, _encode_subscription_reply(
+                    'subscribe', channel, len(channels)))
+        elif name == b'UNSUBSCRIBE':
+            channels = self._client_channels[client]
+            for channel in args or list(channels):
+                channels.discard(channel)
+                self._subscriptions[channel].discard(client)
+                self._send(client, _encode_subscription_reply(
+                    'unsubscribe', channel, len(channels)))
+        else:
+            self._send(client, '-ERR unknown command {0}\r\n'.format(
+                name.decode('utf-8', 'replace')).encode('utf-8'))
+
+
+def main(argv):
+    host, port = DEFAULT_HOST, DEFAULT_PORT
+    if argv:
+        host, _, port = argv[0].rpartition(':')
+        host = host or DEFAULT_HOST
+        port = int(port)
+    server = EventBusServer(host, port)
+    print('Event bus listening on {0}:{1}'.format(*server.address))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,440 @@
+"""
+event_gateway
+Holds the requests which wait for messages published to the event bus
+(see `common.events`), so that they are not held by the application's
+workers.
+
+The application authorizes a request and redirects it to the gateway with
+nginx's X-Accel-Redirect, and the gateway responds when a message is
+published to the requested channel. The redirect alone does not release
+the request: nginx proxies it to another upstream, which must still hold
+the connection open and subscribe to the bus, and stock nginx cannot
+subscribe to redis. The gateway is that upstream, holding all of the
+waiting requests of a server in a single thread with a single connection
+to the bus (a uwsgi worker would hold one request per thread).
+
+The gateway of asset events is run by `manage.py serve_asset_events`, and
+is configured by settings.EVENT_GATEWAY, eg.
+
+    {'REDIRECT': '/internal/events', 'HOST': 'localhost', 'PORT': 8090}
+
+where REDIRECT is the (internal) nginx location which proxies to the
+gateway at HOST:PORT.
+"""
+from collections import defaultdict
+import heapq
+import json
+import logging
+import selectors
+import socket
+import time
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+from .events import (DEFAULT_HOST, DEFAULT_PORT, SEND_TIMEOUT, EventBusError,
+                     _Incomplete, encode_command, parse_reply)
+
+DEFAULT_GATEWAY_PORT = 8090
+
+logger = logging.getLogger(__name__)
+
+
+def format_sse_event(event, data):
+    """
+    Formats a Server-Sent Event, with the json encoded data
+    """
+    return 'event: {0}\ndata: {1}\n\n'.format(
+        event, json.dumps(data, separators=(',', ':')))
+
+
+## A comment, so that idle event streams are not closed by proxies
+SSE_KEEPALIVE = ': keepalive\n\n'
+
+
+def format_sse_retry(milliseconds):
+    """
+    Sets the time the client waits before reconnecting a closed stream
+    """
+    return 'retry: {0}\n\n'.format(milliseconds)
+
+
+class _GatewayRequest(object):
+    __slots__ = ('socket', 'request', 'channel', 'stream', 'deadline',
+                 'keepalive_at', 'outbox', 'closing')
+
+    def __init__(self, client):
+        self.socket = client
+        self.request = b''
+        self.channel = None
+        self.stream = False
+        self.deadline = None
+        self.keepalive_at = None
+        self.outbox = b''
+        self.closing = False
+
+
+def _http_response(status, content_type, body=None):
+    lines = [
+        'HTTP/1.1 {0}'.format(status),
+        'Content-Type: {0}'.format(content_type),
+        'Cache-Control: no-cache',
+        'Connection: close',
+        ## Don't buffer the response in nginx
+        'X-Accel-Buffering: no',
+    ]
+    if body is not None:
+        body = body.encode('utf-8')
+        lines.append('Content-Length: {0}'.format(len(body)))
+    head = ('\r\n'.join(lines) + '\r\n\r\n').encode('ascii')
+    return head + (body or b'')
+
+
+class EventGateway(object):
+    """
+    Serves requests which wait for the messages published to a channel of
+    a redis protocol event bus, so that waiting requests are not held by the
+    application's workers.
+
+    A request is a GET of `(prefix)/(channel)?timeout=(seconds)` (the
+    prefix is ignored). The response is sent as soon as messages are
+    published to the channel, or with no messages once the timeout expires.
+    With `format=sse`, the messages are sent as Server-Sent Events as they
+    are published, until the stream is closed after `stream_time` seconds.
+
+    The body of a response (and the data of an event) is the json encoded
+    result of `render(channel, messages)`.
+
+    All requests are held by a single thread with a single connection to
+    the bus, so a waiting request costs a socket and a few hundred bytes.
+    The gateway does not authorize requests, so should only be reachable
+    through the application's redirects.
+    """
+    ## The maximum size of the head of a request, and of the unsent
+    ## data of a response before the client is disconnected
+    MAX_REQUEST_SIZE = 8192
+    MAX_OUTBOX_SIZE = 65536
+
+    def __init__(self, render, bus_host=DEFAULT_HOST, bus_port=DEFAULT_PORT,
+                 host=DEFAULT_HOST, port=DEFAULT_GATEWAY_PORT, event='message',
+                 max_timeout=60, stream_time=300, keepalive_interval=15,
+                 retry=1000):
+        self.render = render
+        self.bus_address = (bus_host, bus_port)
+        self.event = event
+        self.max_timeout = max_timeout
+        self.stream_time = stream_time
+        self.keepalive_interval = keepalive_interval
+        self.retry = retry
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((host, port))
+        self.socket.listen(1024)
+        self.socket.setblocking(False)
+        self.address = self.socket.getsockname()
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self.socket, selectors.EVENT_READ, self._accept)
+        self._requests = set()
+        ## The waiting requests for each channel
+        self._waiting = defaultdict(set)
+        ## A heap of (time, sequence, request) of the deadlines and
+        ## keepalives of the waiting requests
+        self._timers = []
+        self._sequence = 0
+        self._bus = None
+        self._bus_buffer = b''
+        self._bus_retry_at = 0
+        self._closed = False
+
+    def serve_forever(self):
+        try:
+            while not self._closed:
+                if self._bus is None:
+                    self._connect_bus()
+                for key, mask in self._selector.select(self._select_timeout()):
+                    key.data(key.fileobj, mask)
+                self._run_timers()
+        finally:
+            for request in list(self._requests):
+                self._close(request)
+            self._disconnect_bus()
+            self._selector.close()
+            self.socket.close()
+
+    def shutdown(self):
+        self._closed = True
+
+    def _select_timeout(self):
+        timeout = 0.5
+        if self._timers:
+            timeout = min(timeout, max(0, self._timers[0][0] - time.monotonic()))
+        return timeout
+
+    ## The connection to the bus
+
+    def _connect_bus(self):
+        now = time.monotonic()
+        if now < self._bus_retry_at:
+            return
+        try:
+            self._bus = socket.create_connection(self.bus_address, timeout=1)
+        except OSError as e:
+            logger.warning('Could not connect to event bus at %s:%s: %s',
+                           self.bus_address[0], self.bus_address[1], e)
+            self._bus_retry_at = now + 1
+            return
+        ## Commands are small, so are sent with a blocking send
+        self._bus.settimeout(SEND_TIMEOUT)
+        self._selector.register(self._bus, selectors.EVENT_READ, self._read_bus)
+        if self._waiting:
+            self._send_bus('SUBSCRIBE', *self._waiting)
+
+    def _disconnect_bus(self):
+        if self._bus is None:
+            return
+        self._selector.unregister(self._bus)
+        self._bus.close()
+        self._bus = None
+        self._bus_buffer = b''
+        self._bus_retry_at = time.monotonic() + 1
+
+    def _send_bus(self, *args):
+        if self._bus is None:
+            return
+        try:
+            self._bus.sendall(encode_command(*args))
+        except OSError as e:
+            logger.warning('Event bus connection lost: %s', e)
+            self._disconnect_bus()
+
+    def _read_bus(self, bus, mask):
+        try:
+            data = bus.recv(65536)
+        except OSError:
+            data = b''
+        if not data:
+            logger.warning('Event bus connection closed')
+            self._disconnect_bus()
+            return
+        buffer = self._bus_buffer + data
+        position = 0
+        messages = defaultdict(list)
+        while True:
+            try:
+                reply, position = parse_reply(buffer, position)
+            except _Incomplete:
+                break
+            except (EventBusError, ValueError):
+                self._disconnect_bus()
+                return
+            if (isinstance(reply, list) and len(reply) == 3
+                    and reply[0] == b'message'):
+                messages[reply[1].decode('utf-8')].append(
+                    reply[2].decode('utf-8'))
+        self._bus_buffer = buffer[position:]
+        ## Messages which arrived together are sent in a single response
+        for channel, channel_messages in messages.items():
+            for request in list(self._waiting.get(channel, ())):
+                self._deliver(request, channel_messages)
+
+    ## Requests
+
+    def _accept(self, listener, mask):
+        while True:
+            try:
+                client, _ = listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.warning('Could not accept connection: %s', e)
+                return
+            client.setblocking(False)
+            request = _GatewayRequest(client)
+            self._requests.add(request)
+            self._selector.register(client, selectors.EVENT_READ,
+                                    self._request_event(request))
+
+    def _request_event(self, request):
+        def handle(client, mask):
+            if mask & selectors.EVENT_WRITE:
+                self._flush(request)
+            if mask & selectors.EVENT_READ and request in self._requests:
+                self._read_request(request)
+        return handle
+
+    def _read_request(self, request):
+        try:
+            data = request.socket.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b''
+        if not data:
+            ## The client has gone away
+            self._close(request)
+            return
+        if request.channel is not None or request.closing:
+            return
+        request.request += data
+        if b'\r\n\r\n' in request.request:
+            self._start(request)
+        elif len(request.request) > self.MAX_REQUEST_SIZE:
+            self._respond(request, '431 Request Header Fields Too Large')
+
+    def _start(self, request):
+        try:
+            request_line = request.request.split(b'\r\n', 1)[0].decode('ascii')
+            method, target, _ = request_line.split(' ')
+        except ValueError:
+            self._respond(request, '400 Bad Request')
+            return
+        if method != 'GET':
+            self._respond(request, '405 Method Not Allowed')
+            return
+        url = urlsplit(target)
+        channel = unquote(url.path.rsplit('/', 1)[-1])
+        if not channel:
+            self._respond(request, '404 Not Found')
+            return
+        params = parse_qs(url.query)
+        now = time.monotonic()
+        request.stream = params.get('format', [''])[0].lower() == 'sse'
+        if request.stream:
+            request.deadline = now + self.stream_time
+            request.keepalive_at = now + self.keepalive_interval
+            self._schedule(request.keepalive_at, request)
+        else:
+            try:
+                timeout = float(params.get('timeout', [self.max_timeout])[0])
+            except ValueError:
+                timeout = -1
+            if not timeout >= 0:
+                self._respond(request, '400 Bad Request')
+                return
+            request.deadline = now + min(timeout, self.max_timeout)
+        self._schedule(request.deadline, request)
+
+        request.channel = channel
+        if not self._waiting[channel]:
+            self._send_bus('SUBSCRIBE', channel)
+        self._waiting[channel].add(request)
+        if request.stream:
+            self._send(request, _http_response(
+                '200 OK', 'text/event-stream') +
+                format_sse_retry(self.retry).encode('utf-8'))
+
+    def _deliver(self, request, messages):
+        data = self.render(request.channel, messages)
+        if request.stream:
+            self._send(request,
+                       format_sse_event(self.event, data).encode('utf-8'))
+        else:
+            self._respond(request, '200 OK', data)
+
+    def _respond(self, request, status, data=None):
+        """
+        Sends the response (the json encoded data) and closes the request
+        """
+        self._stop_waiting(request)
+        if data is None:
+            body = json.dumps({'error': status})
+        else:
+            body = json.dumps(data)
+        self._send(request, _http_response(status, 'application/json', body))
+        request.closing = True
+        self._flush(request)
+
+    def _stop_waiting(self, request):
+        channel = request.channel
+        if channel is None:
+            return
+        request.channel = None
+        waiting = self._waiting.get(channel)
+        if waiting is None:
+            return
+        waiting.discard(request)
+        if not waiting:
+            del self._waiting[channel]
+            self._send_bus('UNSUBSCRIBE', channel)
+
+    def _send(self, request, data):
+        request.outbox += data
+        if len(request.outbox) > self.MAX_OUTBOX_SIZE:
+            ## The client is not reading its responses
+            self._close(request)
+            return
+        self._flush(request)
+
+    def _flush(self, request):
+        if request not in self._requests:
+            return
+        if request.outbox:
+            try:
+                sent = request.socket.send(request.outbox)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError:
+                self._close(request)
+                return
+            request.outbox = request.outbox[sent:]
+        if request.outbox:
+            events = selectors.EVENT_READ | selectors.EVENT_WRITE
+        elif request.closing:
+            self._close(request)
+            return
+        else:
+            events = selectors.EVENT_READ
+        key = self._selector.get_key(request.socket)
+        if key.events != events:
+            self._selector.modify(request.socket, events, key.data)
+
+    def _close(self, request):
+        if request not in self._requests:
+            return
+        self._stop_waiting(request)
+        self._requests.discard(request)
+        self._selector.unregister(request.socket)
+        request.socket.close()
+
+    ## Timeouts and keepalives
+
+    def _schedule(self, at, request):
+        self._sequence += 1
+        heapq.heappush(self._timers, (at, self._sequence, request))
+
+    def _run_timers(self):
+        now = time.monotonic()
+        while self._timers and self._timers[0][0] <= now:
+            at, _, request = heapq.heappop(self._timers)
+            if request.channel is None:
+                ## The request has already been answered
+                continue
+            if at == request.deadline:
+                if request.stream:
+                    self._stop_waiting(request)
+                    request.closing = True
+                    self._flush(request)
+                else:
+                    self._respond(request, '200 OK',
+                                  self.render(request.channel, []))
+            elif at == request.keepalive_at:
+                request.keepalive_at = now + self.keepalive_interval
+                self._schedule(request.keepalive_at, request)
+                self._send(request, SSE_KEEPALIVE.encode('utf-8'))
+
+
+def gateway_redirect(channel, **params):
+    """
+    The url which redirects a request to the event gateway, to wait for
+    messages published to the channel, or None if no gateway is configured
+    """
+    from django.conf import settings
+    config = getattr(settings, 'EVENT_GATEWAY', None)
+    if not config or not config.get('REDIRECT'):
+        return None
+    url = '{0}/{1}'.format(config['REDIRECT'].rstrip('/'),
+                           quote(channel, safe=':'))
+    if params:
+        url += '?' + '&'.join(
+            '{0}={1}'.format(key, quote(str(value), safe=''))
+            for key, value in sorted(params.items()))
+    return url
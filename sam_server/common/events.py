@@ -0,0 +1,486 @@
+"""
+events
+A publish/subscribe event bus, used to notify waiting requests of
+changes made by other requests.
+
+Messages are strings published to named channels, and are delivered to
+every subscription to the channel at the time of publishing (messages are
+not stored, so a subscriber only receives the messages published while
+it is subscribed).
+
+The bus is configured by settings.EVENT_BUS:
+    {'BACKEND': 'inprocess'}
+        Delivers messages to the subscribers in the same process.
+        Only suitable for a single process server (eg. runserver).
+    {'BACKEND': 'redis', 'HOST': 'localhost', 'PORT': 6379}
+        Publishes and subscribes with the PUBLISH and SUBSCRIBE commands of
+        the redis protocol, so that messages are delivered to subscribers
+        in all of the server's workers. The server can be redis itself,
+        or the stand-in server in `common.event_bus_server`.
+
+Messages are published with `publish_after_commit`, which waits for the
+current transaction to commit (with the `on_commit` hooks of the
+`common.postgresql` database backend), and publishes to the redis backend
+from a background thread, so that saving a model never waits for the bus.
+
+Requests which wait for messages are held by the gateway in
+`common.event_gateway`, rather than by the application's workers.
+"""
+from collections import defaultdict, deque
+import logging
+import os
+import queue
+import select
+import socket
+import threading
+import time
+
+from django.db import connections
+
+DEFAULT_HOST = 'localhost'
+DEFAULT_PORT = 6379
+
+## The time (in seconds) the stand-in server and the gateway wait to
+## send to a connection
+SEND_TIMEOUT = 1
+
+## The maximum number of messages waiting to be published by the
+## background publisher of a process
+MAX_PUBLISH_QUEUE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class EventBusError(Exception):
+    pass
+
+
+class EventBus(object):
+    ## Whether publishing waits for I/O, so should be done from the
+    ## background publisher rather than the thread saving a model
+    PUBLISH_IN_BACKGROUND = False
+
+    def publish(self, channel, message):
+        """
+        Deliver the message to all of the current subscribers to the channel
+        """
+        raise NotImplementedError('EventBus.publish')
+
+    def subscribe(self, channels):
+        """
+        Subscribe to the channels.
+        Returns a `Subscription`, which should be closed when it is
+        no longer required.
+        """
+        raise NotImplementedError('EventBus.subscribe')
+
+
+class Subscription(object):
+    def wait(self, timeout=None):
+        """
+        Blocks until at least one message has been published to the
+        subscribed channels, or the timeout (in seconds) expires.
+
+        Returns a list of (channel, message) pairs of all the messages
+        received since the last wait (an empty list on timeout).
+        """
+        raise NotImplementedError('Subscription.wait')
+
+    def close(self):
+        raise NotImplementedError('Subscription.close')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InProcessEventBus(EventBus):
+    """
+    Delivers messages to the subscribers in the current process
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscriptions = self._subscriptions.get(channel, ())
+            for subscription in subscriptions:
+                subscription._messages.append((channel, message))
+                subscription._condition.notify()
+            return len(subscriptions)
+
+    def subscribe(self, channels):
+        subscription = _InProcessSubscription(self, tuple(channels))
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            for channel in subscription.channels:
+                subscriptions = self._subscriptions.get(channel)
+                if subscriptions is None:
+                    continue
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[channel]
+
+
+class _InProcessSubscription(Subscription):
+    def __init__(self, bus, channels):
+        self.bus = bus
+        self.channels = channels
+        self._messages = deque()
+        ## Shares the lock of the bus, so is notified under the same lock
+        ## that messages are appended under
+        self._condition = threading.Condition(bus._lock)
+
+    def wait(self, timeout=None):
+        with self._condition:
+            if not self._messages:
+                self._condition.wait(timeout)
+            messages = list(self._messages)
+            self._messages.clear()
+        return messages
+
+    def close(self):
+        self.bus._unsubscribe(self)
+
+
+## The redis serialization protocol (RESP)
+
+class _Incomplete(Exception):
+    pass
+
+
+def _encode_bulk(arg):
+    if isinstance(arg, str):
+        arg = arg.encode('utf-8')
+    elif isinstance(arg, int):
+        arg = str(arg).encode('ascii')
+    return b'$' + str(len(arg)).encode('ascii') + b'\r\n' + arg + b'\r\n'
+
+
+def encode_command(*args):
+    """
+    Encodes a command as a RESP array of bulk strings
+    """
+    return (b'*' + str(len(args)).encode('ascii') + b'\r\n' +
+            b''.join(map(_encode_bulk, args)))
+
+
+def parse_reply(buffer, position=0):
+    """
+    Parses a single RESP value from the buffer.
+    Returns a tuple (value, position) of the value and the position after
+    the value. Bulk strings are returned as bytes, and errors as
+    `EventBusError`s.
+
+    Raises `_Incomplete` if the buffer does not contain a complete value.
+    """
+    end = buffer.find(b'\r\n', position)
+    if end < 0:
+        raise _Incomplete()
+    kind = buffer[position:position + 1]
+    line = buffer[position + 1:end]
+    position = end + 2
+    if kind == b'+':
+        return (line.decode('utf-8'), position)
+    if kind == b'-':
+        return (EventBusError(line.decode('utf-8')), position)
+    if kind == b':':
+        return (int(line), position)
+    if kind == b'$':
+        length = int(line)
+        if length < 0:
+            return (None, position)
+        if len(buffer) < position + length + 2:
+            raise _Incomplete()
+        return (buffer[position:position + length], position + length + 2)
+    if kind == b'*':
+        length = int(line)
+        if length < 0:
+            return (None, position)
+        values = []
+        for _ in range(length):
+            value, position = parse_reply(buffer, position)
+            values.append(value)
+        return (values, position)
+    raise EventBusError('Invalid reply: {0!r}'.format(buffer[position - 2:]))
+
+
+class _Connection(object):
+    """
+    A connection to a RESP server, which buffers partially received replies
+    """
+    def __init__(self, host, port, timeout=None):
+        try:
+            self.socket = socket.create_connection((host, port), timeout=timeout)
+        except OSError as e:
+            raise EventBusError(
+                'Could not connect to event bus at {0}:{1} ({2})'
+                .format(host, port, e))
+        self.socket.settimeout(None)
+        self.buffer = b''
+
+    def send(self, *args):
+        self.socket.sendall(encode_command(*args))
+
+    def read_buffered(self):
+        """
+        The next complete reply in the buffer.
+        Raises `_Incomplete` if there is no complete reply.
+        """
+        value, position = parse_reply(self.buffer)
+        self.buffer = self.buffer[position:]
+        return value
+
+    def read(self, timeout=None):
+        """
+        Reads the next reply, waiting at most `timeout` seconds for it to
+        arrive. Returns `_Incomplete` if the timeout expires, leaving any
+        part of the reply which has arrived in the buffer.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self.read_buffered()
+            except _Incomplete:
+                pass
+            if deadline is not None:
+                ## Each select waits for the rest of the timeout, as the
+                ## reply may arrive in several parts
+                remaining = max(deadline - time.monotonic(), 0)
+                readable, _, _ = select.select(
+                    [self.socket], [], [], remaining)
+                if not readable:
+                    return _Incomplete
+            data = self.socket.recv(4096)
+            if not data:
+                raise EventBusError('Event bus connection closed')
+            self.buffer += data
+
+    def close(self):
+        self.socket.close()
+
+
+class RedisEventBus(EventBus):
+    """
+    Publishes and subscribes with the PUBLISH and SUBSCRIBE commands of the
+    redis protocol. Each subscription holds its own connection to the server.
+    """
+    PUBLISH_IN_BACKGROUND = True
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, timeout=1):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def publish(self, channel, message):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._connection is None:
+                        self._connection = _Connection(
+                            self.host, self.port, self.timeout)
+                    self._connection.send('PUBLISH', channel, message)
+                    reply = self._connection.read(self.timeout)
+                    break
+                except (OSError, EventBusError):
+                    ## The connection may have been closed by the server
+                    ## since the last publish, so reconnect once
+                    self._close_connection()
+                    if attempt:
+                        raise
+            if reply is _Incomplete:
+                self._close_connection()
+                raise EventBusError('No reply to PUBLISH')
+            if isinstance(reply, EventBusError):
+                raise reply
+            return reply
+
+    def close(self):
+        """
+        Close the connection used to publish messages
+        """
+        with self._lock:
+            self._close_connection()
+
+    def _close_connection(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def subscribe(self, channels):
+        return _RedisSubscription(self, tuple(channels))
+
+
+class _RedisSubscription(Subscription):
+    def __init__(self, bus, channels):
+        self.channels = channels
+        self._connection = _Connection(bus.host, bus.port, bus.timeout)
+        self._connection.send('SUBSCRIBE', *channels)
+        ## Wait for the subscriptions to be confirmed, so that no message
+        ## published after `subscribe` returns is missed
+        confirmed = 0
+        while confirmed < len(channels):
+            reply = self._connection.read(bus.timeout)
+            if reply is _Incomplete:
+                self.close()
+                raise EventBusError('No reply to SUBSCRIBE')
+            if isinstance(reply, EventBusError):
+                self.close()
+                raise reply
+            if reply[0] == b'subscribe':
+                confirmed += 1
+
+    def _message(self, reply):
+        if (isinstance(reply, list) and len(reply) == 3
+                and reply[0] == b'message'):
+            return (reply[1].decode('utf-8'), reply[2].decode('utf-8'))
+        return None
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        messages = []
+        reply = self._connection.read(timeout)
+        while reply is not _Incomplete:
+            message = self._message(reply)
+            if message is not None:
+                messages.append(message)
+            ## Collect any other messages which have already arrived
+            reply = self._connection.read(0)
+            if reply is _Incomplete and self._connection.buffer:
+                ## Part of a message has arrived, wait for the rest of it
+                remaining = None
+                if deadline is not None:
+                    remaining = max(deadline - time.monotonic(), 0)
+                reply = self._connection.read(remaining)
+        return messages
+
+    def close(self):
+        self._connection.close()
+
+
+class BackgroundPublisher(object):
+    """
+    Publishes messages to the event bus from a background thread, so
+    the thread which publishes a message never waits for the bus.
+
+    If the queue of unpublished messages is full, or the bus cannot be
+    reached, messages are dropped (and logged).
+    """
+    def __init__(self, max_queue=MAX_PUBLISH_QUEUE):
+        self._queue = queue.Queue(max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def put(self, channel, message):
+        self._start()
+        try:
+            self._queue.put_nowait((channel, message))
+        except queue.Full:
+            logger.warning('Event publish queue full, dropped message '
+                           'to %s', channel)
+
+    def _start(self):
+        with self._lock:
+            ## The thread is started in each (forked) worker process
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name='event-publisher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            channel, message = self._queue.get()
+            try:
+                get_event_bus().publish(channel, message)
+            except (EventBusError, OSError) as e:
+                logger.warning('Could not publish to %s: %s', channel, e)
+            finally:
+                self._queue.task_done()
+
+    def join(self):
+        """
+        Blocks until all of the queued messages have been published
+        """
+        self._queue.join()
+
+
+_publisher = BackgroundPublisher()
+
+
+def publish_after_commit(channel, message, using='default'):
+    """
+    Publishes the message once the current transaction of the database
+    connection has committed (or immediately, if the connection is not in
+    a transaction), so that subscribers do not look for a change before it
+    is visible. If the transaction is rolled back, the message is dropped.
+
+    The connection must support `on_commit` (see `common.postgresql`),
+    otherwise the message is published immediately.
+    """
+    connection = connections[using]
+    if not hasattr(connection, 'on_commit'):
+        _publish(channel, message)
+        return
+    connection.on_commit(lambda: _publish(channel, message))
+
+
+def _publish(channel, message):
+    bus = get_event_bus()
+    if bus.PUBLISH_IN_BACKGROUND:
+        _publisher.put(channel, message)
+        return
+    try:
+        bus.publish(channel, message)
+    except (EventBusError, OSError) as e:
+        logger.warning('Could not publish to %s: %s', channel, e)
+
+
+_BACKENDS = {
+    'inprocess': InProcessEventBus,
+    'redis': RedisEventBus,
+}
+
+_event_bus = None
+_event_bus_lock = threading.Lock()
+
+
+def event_bus_from_settings():
+    from django.conf import settings
+    config = dict(getattr(settings, 'EVENT_BUS', None) or {})
+    backend = config.pop('BACKEND', 'inprocess')
+    try:
+        bus_cls = _BACKENDS[backend]
+    except KeyError:
+        raise EventBusError('Unknown event bus backend: {0}'.format(backend))
+    return bus_cls(**{key.lower(): value for key, value in config.items()})
+
+
+def get_event_bus():
+    global _event_bus
+    ## Requests are served on multiple threads, and publishers and
+    ## subscribers must share a single in process bus
+    with _event_bus_lock:
+        if _event_bus is None:
+            _event_bus = event_bus_from_settings()
+        return _event_bus
+
+
+def set_event_bus(event_bus):
+    """
+    Replace the event bus. If `None`, the bus configured in settings is used.
+    """
+    global _event_bus
+    _event_bus = event_bus
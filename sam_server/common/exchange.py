@@ -0,0 +1,660 @@
+"""
+Conversions of money amounts between currencies.
+
+Exchange rates are loaded from a `RateSource`, which provides the rate
+of each currency against a single base currency. The rates are compiled
+into a `RateMatrix`, which holds the (triangulated) factor to convert
+an integer value between every pair of currencies, so a conversion
+is a pair of list lookups and an integer division.
+
+Historical rates are loaded from a `RateHistorySource` into a
+`RateHistory`, which keeps the rates of each currency in columns sorted
+by date, so the rate on a date is found by bisecting the dates.
+
+The tables are cached by the process and reloaded from the source once
+they are older than the TTL of the cache.
+"""
+from array import array
+from bisect import bisect_right
+import csv
+import datetime
+from fractions import Fraction
+import json
+import logging
+from math import gcd
+from operator import itemgetter
+import time
+
+from django.conf import settings
+
+from .currency import (
+    Currency, CurrencyException, MoneyAmount, MoneyArray, _round_half_even
+)
+
+DEFAULT_TTL = 60 * 60
+
+logger = logging.getLogger(__name__)
+
+
+class RateSource(object):
+    """
+    A source of exchange rates
+    """
+    def load(self):
+        """
+        Returns a tuple (base_code, rates), where rates maps currency codes
+        to the number of units of the currency equal to one unit of the
+        base currency.
+        """
+        raise NotImplementedError('RateSource.load')
+
+
+class DictRateSource(RateSource):
+    def __init__(self, base_code, rates):
+        self.base_code = base_code
+        self.rates = rates
+
+    def load(self):
+        return (self.base_code, self.rates)
+
+
+class JSONRateSource(RateSource):
+    """
+    Loads rates from a json file formatted as
+        {"base": "USD", "rates": {"AUD": "1.2345", ...}}
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        with open(self.path, encoding='utf-8') as f:
+            content = json.load(f)
+        return (content['base'], content['rates'])
+
+
+class CSVRateSource(RateSource):
+    """
+    Loads rates from a csv file with a 'currency' and a 'rate' column
+    """
+    def __init__(self, path, base_code):
+        self.path = path
+        self.base_code = base_code
+
+    def load(self):
+        with open(self.path, encoding='utf-8', newline='') as f:
+            rates = {row['currency']: row['rate'] for row in csv.DictReader(f)}
+        return (self.base_code, rates)
+
+
+class QuerySetRateSource(RateSource):
+    """
+    Loads rates from the rows of a database table.
+    The queryset is re-evaluated every time the rates are loaded.
+    """
+    def __init__(self, queryset, base_code,
+                 code_field='currency_code', rate_field='rate'):
+        self.queryset = queryset
+        self.base_code = base_code
+        self.code_field = code_field
+        self.rate_field = rate_field
+
+    def load(self):
+        rows = self.queryset.all().values_list(self.code_field, self.rate_field)
+        return (self.base_code, dict(rows))
+
+
+def _rate_currency(code):
+    """
+    The currency with the given code, or None if the code is not in
+    the ISO 4217 table.
+
+    Rate sources often include codes which are not in the table (eg. newer
+    currencies, or BTC). Their rates are skipped, rather than making the
+    rates of every other currency unavailable.
+    """
+    try:
+        return Currency.from_code(code)
+    except CurrencyException:
+        logger.warning('Skipping exchange rate of unknown currency %s', code)
+        return None
+
+
+class RateMatrix(object):
+    """
+    The conversion factors between every pair of currencies with an
+    exchange rate against the base currency.
+
+    Conversions between currencies which are not the base currency
+    are triangulated through the base currency.
+    """
+    def __init__(self, base_code, rates):
+        base_currency = Currency.from_code(base_code)
+        currency_rates = dict()
+        for code, rate in rates.items():
+            currency = _rate_currency(code)
+            if currency is None:
+                continue
+            rate = Fraction(str(rate))
+            if rate <= 0:
+                raise CurrencyException(
+                    'Invalid exchange rate for {0}: {1}'.format(code, rate))
+            currency_rates[currency.code] = (currency, rate)
+        currency_rates[base_currency.code] = (base_currency, Fraction(1))
+        self.base_code = base_currency.code
+        self.currencies = [
+            currency_rates[code][0] for code in sorted(currency_rates)
+        ]
+        self._index = {
+            currency.code: i for i, currency in enumerate(self.currencies)
+        }
+        rates = {code: rate for code, (_, rate) in currency_rates.items()}
+        self._rates = [rates[currency.code] for currency in self.currencies]
+        ## The rate of each currency against the base currency,
+        ## in minor units of the currency
+        minor_rates = [
+            rates[currency.code] * pow(10, currency.num_digits_in_minor_units or 0)
+            for currency in self.currencies
+        ]
+        ## _factors[i][j] is the (numerator, denominator) of the factor
+        ## which converts a value of currencies[i] into currencies[j]
+        self._factors = [
+            [_as_ratio(to_rate / from_rate) for to_rate in minor_rates]
+            for from_rate in minor_rates
+        ]
+
+    def _index_of(self, code):
+        try:
+            return self._index[code]
+        except KeyError:
+            raise CurrencyException('No exchange rate for {0}'.format(code))
+
+    def _factors_to(self, code):
+        """
+        Returns the list of the factors converting each currency into
+        the currency with the given code
+        """
+        to_index = self._index_of(code)
+        return [factors[to_index] for factors in self._factors]
+
+    def rate(self, from_code, to_code):
+        """
+        The number of units of to_code equal to one unit of from_code
+        """
+        return self._rates[self._index_of(to_code)] / self._rates[self._index_of(from_code)]
+
+    def factor(self, from_code, to_code):
+        """
+        The (numerator, denominator) of the factor which converts a
+        value in minor units of from_code to minor units of to_code
+        """
+        return self._factors[self._index_of(from_code)][self._index_of(to_code)]
+
+    def convert_value(self, value, from_code, to_code, rounded=True):
+        """
+        Convert an integer value in minor units of from_code to minor
+        units of to_code, using bankers rounding to round to the nearest
+        value.
+        If rounded is False, returns the exact value as a Fraction
+        """
+        numerator, denominator = self.factor(from_code, to_code)
+        if not rounded:
+            return Fraction(value * numerator, denominator)
+        return _round_half_even(value * numerator, denominator)
+
+    def convert(self, amount, to_code):
+        """
+        Convert the money amount to the currency with the given code
+        """
+        if amount.code == to_code:
+            return amount
+        currency = Currency.from_code(to_code)
+        return MoneyAmount._from_integer_value(
+            currency, self.convert_value(amount.value, amount.code, to_code))
+
+    def convert_many(self, amounts, to_code):
+        """
+        Convert each of the amounts (any iterable of `MoneyAmount`, including
+        a `MoneyArray`) to the given currency.
+
+        Returns a `MoneyArray` of the converted amounts
+        """
+        if not isinstance(amounts, MoneyArray):
+            amounts = MoneyArray(amounts)
+        factors_to = self._factors_to(to_code)
+        factors = [factors_to[self._index_of(currency.code)]
+                   for currency in amounts.currencies]
+        return MoneyArray.from_values(to_code, [
+            _round_half_even(value * factors[index][0], factors[index][1])
+            for index, value in zip(amounts._currency_indexes, amounts.values)
+        ])
+
+    def sort_key(self, to_code):
+        """
+        Returns a key function for sorting money amounts in any of the
+        currencies of the matrix, by their exact value in the given currency.
+
+        The keys are integers, the value in the given currency scaled by the
+        lowest common denominator of the conversion factors.
+        """
+        factors_to = self._factors_to(to_code)
+        common_denominator = 1
+        for _, denominator in factors_to:
+            common_denominator = (common_denominator * denominator //
+                                  gcd(common_denominator, denominator))
+        multipliers = {
+            currency.code: numerator * (common_denominator // denominator)
+            for currency, (numerator, denominator)
+            in zip(self.currencies, factors_to)
+        }
+
+        def key(amount):
+            try:
+                return amount.value * multipliers[amount.code]
+            except KeyError:
+                raise CurrencyException(
+                    'No exchange rate for {0}'.format(amount.code))
+        return key
+
+    def total(self, amounts, to_code):
+        """
+        The total of the amounts (any iterable of `MoneyAmount`, including
+        a `MoneyArray`), in the given currency.
+
+        The amounts are totalled in their own currencies, then the totals
+        are converted and rounded once.
+        """
+        if not isinstance(amounts, MoneyArray):
+            amounts = MoneyArray(amounts)
+        factors_to = self._factors_to(to_code)
+        total = Fraction(0)
+        for code, subtotal in amounts.sum_by_currency().items():
+            numerator, denominator = factors_to[self._index_of(code)]
+            total += Fraction(subtotal.value * numerator, denominator)
+        return MoneyAmount(to_code, total)
+
+
+def _as_ratio(fraction):
+    return (fraction.numerator, fraction.denominator)
+
+
+class RateHistorySource(object):
+    """
+    A source of historical exchange rates
+    """
+    def load(self):
+        """
+        Returns a tuple (base_code, rows), where rows is an iterable of
+        (date, currency_code, rate) tuples and rate is the number of units
+        of the currency equal to one unit of the base currency on the date.
+        """
+        raise NotImplementedError('RateHistorySource.load')
+
+
+class ListRateHistorySource(RateHistorySource):
+    def __init__(self, base_code, rows):
+        self.base_code = base_code
+        self.rows = rows
+
+    def load(self):
+        return (self.base_code, self.rows)
+
+
+class CSVRateHistorySource(RateHistorySource):
+    """
+    Loads historical rates from a csv file with a 'date' (formatted as
+    YYYY-MM-DD), a 'currency' and a 'rate' column
+    """
+    def __init__(self, path, base_code):
+        self.path = path
+        self.base_code = base_code
+
+    def load(self):
+        strptime = datetime.datetime.strptime
+        with open(self.path, encoding='utf-8', newline='') as f:
+            rows = [
+                (strptime(row['date'], '%Y-%m-%d').date(), row['currency'], row['rate'])
+                for row in csv.DictReader(f)
+            ]
+        return (self.base_code, rows)
+
+
+class QuerySetRateHistorySource(RateHistorySource):
+    """
+    Loads historical rates from the rows of a database table.
+    The queryset is re-evaluated every time the rates are loaded.
+    """
+    def __init__(self, queryset, base_code, date_field='date',
+                 code_field='currency_code', rate_field='rate'):
+        self.queryset = queryset
+        self.base_code = base_code
+        self.date_field = date_field
+        self.code_field = code_field
+        self.rate_field = rate_field
+
+    def load(self):
+        rows = self.queryset.all().values_list(
+            self.date_field, self.code_field, self.rate_field)
+        return (self.base_code, list(rows))
+
+
+## The largest numerator or denominator of the rates of a `_RateSeries`
+MAX_RATE_TERM = 2 ** 63 - 1
+
+
+def _fit_rate(code, numerator, denominator):
+    """
+    Returns the (numerator, denominator) of the rate, rounded to the nearest
+    rate which fits in the columns of a `_RateSeries` if it has too many
+    digits.
+    Raises a `CurrencyException` if the rate is too large or too small to fit.
+    """
+    if numerator <= MAX_RATE_TERM and denominator <= MAX_RATE_TERM:
+        return (numerator, denominator)
+    rate = Fraction(numerator, denominator)
+    if rate < MAX_RATE_TERM:
+        ## The numerator of the nearest fraction is at most about
+        ## rate * max_denominator
+        rate = rate.limit_denominator(MAX_RATE_TERM // (int(rate) + 1))
+        if 0 < rate.numerator <= MAX_RATE_TERM:
+            return _as_ratio(rate)
+    raise CurrencyException(
+        'Exchange rate for {0} out of range: {1}'
+        .format(code, Fraction(numerator, denominator)))
+
+
+class _RateSeries(object):
+    """
+    The rates of a currency against the base currency, as parallel columns
+    sorted by date.
+    The rate on dates[i] is numerators[i] / denominators[i], in minor units
+    of the currency.
+    Rates with more digits than fit in the (int64) columns are rounded.
+    """
+    __slots__ = ('currency', 'dates', 'numerators', 'denominators')
+
+    def __init__(self, currency, dated_rates):
+        self.currency = currency
+        self.dates = array('l')
+        self.numerators = array('q')
+        self.denominators = array('q')
+        minor_units = pow(10, currency.num_digits_in_minor_units or 0)
+        for date_ordinal, numerator, denominator in sorted(dated_rates, key=itemgetter(0)):
+            numerator, denominator = _fit_rate(
+                currency.code, numerator * minor_units, denominator)
+            if self.dates and self.dates[-1] == date_ordinal:
+                ## The last rate for a date replaces any earlier rates
+                self.numerators[-1] = numerator
+                self.denominators[-1] = denominator
+                continue
+            self.dates.append(date_ordinal)
+            self.numerators.append(numerator)
+            self.denominators.append(denominator)
+
+    def rate_at(self, date_ordinal):
+        """
+        The (numerator, denominator) of the most recent rate on or before
+        the date
+        """
+        i = bisect_right(self.dates, date_ordinal) - 1
+        if i < 0:
+            raise CurrencyException(
+                'No exchange rate for {0} on {1}'
+                .format(self.currency.code, datetime.date.fromordinal(date_ordinal)))
+        return (self.numerators[i], self.denominators[i])
+
+
+def _parse_rate(rate):
+    """
+    Returns the (numerator, denominator) of the rate.
+    Decimal strings are converted directly, without creating a Fraction
+    """
+    if isinstance(rate, str):
+        whole, _, decimals = rate.partition('.')
+        digits = whole + decimals
+        if digits.isdigit():
+            numerator = int(digits)
+            denominator = pow(10, len(decimals))
+            divisor = gcd(numerator, denominator)
+            return (numerator // divisor, denominator // divisor)
+    return _as_ratio(Fraction(str(rate)))
+
+
+class RateHistory(object):
+    """
+    The daily exchange rates of each currency against a base currency.
+
+    The rate on a date is the most recent rate published on or before
+    the date. Conversions between currencies which are not the base
+    currency are triangulated through the base currency.
+    """
+    def __init__(self, base_code, rows):
+        dated_rates = dict()
+        for date, code, rate in rows:
+            numerator, denominator = _parse_rate(rate)
+            if numerator <= 0:
+                raise CurrencyException(
+                    'Invalid exchange rate for {0}: {1}'.format(code, rate))
+            try:
+                dated_rates[code].append((date.toordinal(), numerator, denominator))
+            except KeyError:
+                dated_rates[code] = [(date.toordinal(), numerator, denominator)]
+        self.base_code = base_code
+        self._series = dict()
+        for code, rates in dated_rates.items():
+            currency = _rate_currency(code)
+            if currency is not None:
+                self._series[currency.code] = _RateSeries(currency, rates)
+        self._base_minor_units = pow(
+            10, Currency.from_code(base_code).num_digits_in_minor_units or 0)
+
+    def _rate_at(self, code, date_ordinal):
+        if code == self.base_code:
+            return (self._base_minor_units, 1)
+        try:
+            series = self._series[code]
+        except KeyError:
+            raise CurrencyException('No exchange rate for {0}'.format(code))
+        return series.rate_at(date_ordinal)
+
+    def factor(self, from_code, to_code, date):
+        """
+        The (numerator, denominator) of the factor which converts a
+        value in minor units of from_code to minor units of to_code
+        on the given date
+        """
+        date_ordinal = date.toordinal()
+        from_numerator, from_denominator = self._rate_at(from_code, date_ordinal)
+        to_numerator, to_denominator = self._rate_at(to_code, date_ordinal)
+        return (to_numerator * from_denominator, to_denominator * from_numerator)
+
+    def convert(self, amount, to_code, date):
+        """
+        Convert the amount to the currency with the given code, at the
+        rates on the given date
+        """
+        if amount.code == to_code:
+            return amount
+        numerator, denominator = self.factor(amount.code, to_code, date)
+        return MoneyAmount._from_integer_value(
+            Currency.from_code(to_code),
+            _round_half_even(amount.value * numerator, denominator))
+
+    def convert_many(self, amounts, dates, to_code):
+        """
+        Convert each of the amounts (any iterable of `MoneyAmount`, including
+        a `MoneyArray`) to the given currency, at the rates on the date at
+        the same position in dates.
+
+        Returns a `MoneyArray` of the converted amounts
+        """
+        if not isinstance(amounts, MoneyArray):
+            amounts = MoneyArray(amounts)
+        codes = [currency.code for currency in amounts.currencies]
+        ## Assets are often bought on the same dates, so only look up the
+        ## factor for each currency and date once
+        factors = dict()
+        values = []
+        append = values.append
+        for index, value, date in zip(amounts._currency_indexes, amounts.values, dates):
+            try:
+                numerator, denominator = factors[index, date]
+            except KeyError:
+                numerator, denominator = factors[index, date] = \
+                    self.factor(codes[index], to_code, date)
+            append(_round_half_even(value * numerator, denominator))
+        if len(values) != len(amounts):
+            raise ValueError('Expected a date for each amount')
+        return MoneyArray.from_values(to_code, values)
+
+
+class ExchangeRates(object):
+    """
+    A process local cache of the rate table (by default, a `RateMatrix`)
+    loaded from a rate source.
+    The table is reloaded when it is older than `ttl` seconds.
+
+    A failed load is also cached for `ttl` seconds, so that the source is
+    not read again on every conversion. If a previous table was loaded,
+    it is used until the next reload instead.
+    """
+    def __init__(self, source, ttl=DEFAULT_TTL, table_class=RateMatrix):
+        self.source = source
+        self.ttl = ttl
+        self.table_class = table_class
+        self._table = None
+        self._error = None
+        self._expires = None
+
+    def _load(self):
+        try:
+            base_code, rates = self.source.load()
+        except (OSError, ValueError, KeyError) as e:
+            raise CurrencyException(
+                'Could not load exchange rates: {0}'.format(e))
+        try:
+            return self.table_class(base_code, rates)
+        except (ValueError, TypeError, ArithmeticError) as e:
+            ## A malformed rate (eg. 'abc' or 'inf')
+            raise CurrencyException(
+                'Invalid exchange rates: {0}'.format(e))
+
+    @property
+    def table(self):
+        if self._expires is not None and time.monotonic() < self._expires:
+            if self._error is not None:
+                raise CurrencyException(self._error)
+            return self._table
+        try:
+            table = self._load()
+        except CurrencyException as e:
+            self._expires = time.monotonic() + self.ttl
+            if self._table is not None:
+                logger.warning('Using the previous exchange rates: %s', e)
+                return self._table
+            self._error = str(e)
+            raise
+        self._table = table
+        self._error = None
+        self._expires = time.monotonic() + self.ttl
+        return table
+
+    def invalidate(self):
+        self._table = None
+        self._error = None
+        self._expires = None
+
+
+def default_rate_source():
+    """
+    The rate source configured by settings.EXCHANGE_RATES, which is either
+    a json file or a csv file (with the rates of `BASE`)
+    """
+    config = getattr(settings, 'EXCHANGE_RATES', None)
+    if config is None or not config.get('PATH'):
+        raise CurrencyException('No exchange rate source configured')
+    path = config['PATH']
+    if path.endswith('.csv'):
+        return CSVRateSource(path, config['BASE'])
+    return JSONRateSource(path)
+
+
+def default_rate_history_source():
+    """
+    The historical rate source configured by settings.EXCHANGE_RATES,
+    a csv file of the rates against `BASE`
+    """
+    config = getattr(settings, 'EXCHANGE_RATES', None)
+    if config is None or not config.get('HISTORY_PATH'):
+        raise CurrencyException('No historical exchange rate source configured')
+    return CSVRateHistorySource(config['HISTORY_PATH'], config['BASE'])
+
+
+_exchange_rates = None
+_rate_history = None
+
+
+def set_rate_source(source, ttl=DEFAULT_TTL):
+    """
+    Set the source of the exchange rates used by this process.
+    If source is None, the rate source is reset to the default
+    """
+    global _exchange_rates
+    if source is None:
+        _exchange_rates = None
+    else:
+        _exchange_rates = ExchangeRates(source, ttl)
+
+
+def get_rate_matrix():
+    global _exchange_rates
+    if _exchange_rates is None:
+        config = getattr(settings, 'EXCHANGE_RATES', None) or {}
+        _exchange_rates = ExchangeRates(
+            default_rate_source(), config.get('TTL', DEFAULT_TTL))
+    return _exchange_rates.table
+
+
+def set_rate_history_source(source, ttl=DEFAULT_TTL):
+    """
+    Set the source of the historical exchange rates used by this process.
+    If source is None, the rate source is reset to the default
+    """
+    global _rate_history
+    if source is None:
+        _rate_history = None
+    else:
+        _rate_history = ExchangeRates(source, ttl, table_class=RateHistory)
+
+
+def get_rate_history():
+    global _rate_history
+    if _rate_history is None:
+        config = getattr(settings, 'EXCHANGE_RATES', None) or {}
+        _rate_history = ExchangeRates(
+            default_rate_history_source(), config.get('TTL', DEFAULT_TTL),
+            table_class=RateHistory)
+    return _rate_history.table
+
+
+def convert(amount, to_code):
+    return get_rate_matrix().convert(amount, to_code)
+
+
+def convert_many(amounts, to_code):
+    return get_rate_matrix().convert_many(amounts, to_code)
+
+
+def total(amounts, to_code):
+    return get_rate_matrix().total(amounts, to_code)
+
+
+def sort_key(to_code):
+    return get_rate_matrix().sort_key(to_code)
+
+
+def convert_as_of(amount, to_code, date):
+    return get_rate_history().convert(amount, to_code, date)
+
+
+def convert_many_as_of(amounts, dates, to_code):
+    return get_rate_history().convert_many(amounts, dates, to_code)
@@ -0,0 +1,468 @@
+## Generated by common/currency_table.py from the ISO 4217 currency list
+## and the currency symbols in common/utility_files. DO NOT EDIT.
+##
+## CURRENCIES is a tuple of
+##     (code, name, number, num_digits_in_minor_units, countries)
+## SYMBOLS maps currency codes to currency symbols
+import datetime
+
+DATE_PUBLISHED = datetime.date(2014, 8, 15)
+
+CURRENCIES = (('AFN', 'Afghani', 971, 2, ('AFGHANISTAN',)),
+ ('EUR',
+  'Euro',
+  978,
+  2,
+  ('ÅLAND ISLANDS',
+   'ANDORRA',
+   'AUSTRIA',
+   'BELGIUM',
+   'CYPRUS',
+   'ESTONIA',
+   'EUROPEAN UNION',
+   'FINLAND',
+   'FRANCE',
+   'FRENCH GUIANA',
+   'FRENCH SOUTHERN TERRITORIES',
+   'GERMANY',
+   'GREECE',
+   'GUADELOUPE',
+   'HOLY SEE (VATICAN CITY STATE)',
+   'IRELAND',
+   'ITALY',
+   'LATVIA',
+   'LUXEMBOURG',
+   'MALTA',
+   'MARTINIQUE',
+   'MAYOTTE',
+   'MONACO',
+   'MONTENEGRO',
+   'NETHERLANDS',
+   'PORTUGAL',
+   'RÉUNION',
+   'SAINT BARTHÉLEMY',
+   'SAINT MARTIN (FRENCH PART)',
+   'SAINT PIERRE AND MIQUELON',
+   'SAN MARINO',
+   'SLOVAKIA',
+   'SLOVENIA',
+   'SPAIN')),
+ ('ALL', 'Lek', 8, 2, ('ALBANIA',)),
+ ('DZD', 'Algerian Dinar', 12, 2, ('ALGERIA',)),
+ ('USD',
+  'US Dollar',
+  840,
+  2,
+  ('AMERICAN SAMOA',
+   'BONAIRE, SINT EUSTATIUS AND SABA',
+   'BRITISH INDIAN OCEAN TERRITORY',
+   'ECUADOR',
+   'EL SALVADOR',
+   'GUAM',
+   'HAITI',
+   'MARSHALL ISLANDS',
+   'MICRONESIA, FEDERATED STATES OF',
+   'NORTHERN MARIANA ISLANDS',
+   'PALAU',
+   'PANAMA',
+   'PUERTO RICO',
+   'TIMOR-LESTE',
+   'TURKS AND CAICOS ISLANDS',
+   'UNITED STATES',
+   'UNITED STATES MINOR OUTLYING ISLANDS',
+   'VIRGIN ISLANDS (BRITISH)',
+   'VIRGIN ISLANDS (U.S.)')),
+ ('AOA', 'Kwanza', 973, 2, ('ANGOLA',)),
+ ('XCD',
+  'East Caribbean Dollar',
+  951,
+  2,
+  ('ANGUILLA',
+   'ANTIGUA AND BARBUDA',
+   'DOMINICA',
+   'GRENADA',
+   'MONTSERRAT',
+   'SAINT KITTS AND NEVIS',
+   'SAINT LUCIA',
+   'SAINT VINCENT AND THE GRENADINES')),
+ ('ARS', 'Argentine Peso', 32, 2, ('ARGENTINA',)),
+ ('AMD', 'Armenian Dram', 51, 2, ('ARMENIA',)),
+ ('AWG', 'Aruban Florin', 533, 2, ('ARUBA',)),
+ ('AUD',
+  'Australian Dollar',
+  36,
+  2,
+  ('AUSTRALIA',
+   'CHRISTMAS ISLAND',
+   'COCOS (KEELING) ISLANDS',
+   'HEARD ISLAND AND McDONALD ISLANDS',
+   'KIRIBATI',
+   'NAURU',
+   'NORFOLK ISLAND',
+   'TUVALU')),
+ ('AZN', 'Azerbaijanian Manat', 944, 2, ('AZERBAIJAN',)),
+ ('BSD', 'Bahamian Dollar', 44, 2, ('BAHAMAS',)),
+ ('BHD', 'Bahraini Dinar', 48, 3, ('BAHRAIN',)),
+ ('BDT', 'Taka', 50, 2, ('BANGLADESH',)),
+ ('BBD', 'Barbados Dollar', 52, 2, ('BARBADOS',)),
+ ('BYR', 'Belarussian Ruble', 974, 0, ('BELARUS',)),
+ ('BZD', 'Belize Dollar', 84, 2, ('BELIZE',)),
+ ('XOF',
+  'CFA Franc BCEAO',
+  952,
+  0,
+  ('BENIN',
+   'BURKINA FASO',
+   "CÔTE D'IVOIRE",
+   'GUINEA-BISSAU',
+   'MALI',
+   'NIGER',
+   'SENEGAL',
+   'TOGO')),
+ ('BMD', 'Bermudian Dollar', 60, 2, ('BERMUDA',)),
+ ('BTN', 'Ngultrum', 64, 2, ('BHUTAN',)),
+ ('INR', 'Indian Rupee', 356, 2, ('BHUTAN', 'INDIA')),
+ ('BOB', 'Boliviano', 68, 2, ('BOLIVIA, PLURINATIONAL STATE OF',)),
+ ('BOV', 'Mvdol', 984, 2, ('BOLIVIA, PLURINATIONAL STATE OF',)),
+ ('BAM', 'Convertible Mark', 977, 2, ('BOSNIA AND HERZEGOVINA',)),
+ ('BWP', 'Pula', 72, 2, ('BOTSWANA',)),
+ ('NOK',
+  'Norwegian Krone',
+  578,
+  2,
+  ('BOUVET ISLAND', 'NORWAY', 'SVALBARD AND JAN MAYEN')),
+ ('BRL', 'Brazilian Real', 986, 2, ('BRAZIL',)),
+ ('BND', 'Brunei Dollar', 96, 2, ('BRUNEI DARUSSALAM',)),
+ ('BGN', 'Bulgarian Lev', 975, 2, ('BULGARIA',)),
+ ('BIF', 'Burundi Franc', 108, 0, ('BURUNDI',)),
+ ('KHR', 'Riel', 116, 2, ('CAMBODIA',)),
+ ('XAF',
+  'CFA Franc BEAC',
+  950,
+  0,
+  ('CAMEROON',
+   'CENTRAL AFRICAN REPUBLIC',
+   'CHAD',
+   'CONGO',
+   'EQUATORIAL GUINEA',
+   'GABON')),
+ ('CAD', 'Canadian Dollar', 124, 2, ('CANADA',)),
+ ('CVE', 'Cabo Verde Escudo', 132, 2, ('CABO VERDE',)),
+ ('KYD', 'Cayman Islands Dollar', 136, 2, ('CAYMAN ISLANDS',)),
+ ('CLF', 'Unidad de Fomento', 990, 4, ('CHILE',)),
+ ('CLP', 'Chilean Peso', 152, 0, ('CHILE',)),
+ ('CNY', 'Yuan Renminbi', 156, 2, ('CHINA',)),
+ ('COP', 'Colombian Peso', 170, 2, ('COLOMBIA',)),
+ ('COU', 'Unidad de Valor Real', 970, 2, ('COLOMBIA',)),
+ ('KMF', 'Comoro Franc', 174, 0, ('COMOROS',)),
+ ('CDF', 'Congolese Franc', 976, 2, ('CONGO, DEMOCRATIC REPUBLIC OF THE ',)),
+ ('NZD',
+  'New Zealand Dollar',
+  554,
+  2,
+  ('COOK ISLANDS', 'NEW ZEALAND', 'NIUE', 'PITCAIRN', 'TOKELAU')),
+ ('CRC', 'Costa Rican Colon', 188, 2, ('COSTA RICA',)),
+ ('HRK', 'Croatian Kuna', 191, 2, ('CROATIA',)),
+ ('CUC', 'Peso Convertible', 931, 2, ('CUBA',)),
+ ('CUP', 'Cuban Peso', 192, 2, ('CUBA',)),
+ ('ANG',
+  'Netherlands Antillean Guilder',
+  532,
+  2,
+  ('CURAÇAO', 'SINT MAARTEN (DUTCH PART)')),
+ ('CZK', 'Czech Koruna', 203, 2, ('CZECH REPUBLIC',)),
+ ('DKK', 'Danish Krone', 208, 2, ('DENMARK', 'FAROE ISLANDS', 'GREENLAND')),
+ ('DJF', 'Djibouti Franc', 262, 0, ('DJIBOUTI',)),
+ ('DOP', 'Dominican Peso', 214, 2, ('DOMINICAN REPUBLIC',)),
+ ('EGP', 'Egyptian Pound', 818, 2, ('EGYPT',)),
+ ('SVC', 'El Salvador Colon', 222, 2, ('EL SALVADOR',)),
+ ('ERN', 'Nakfa', 232, 2, ('ERITREA',)),
+ ('ETB', 'Ethiopian Birr', 230, 2, ('ETHIOPIA',)),
+ ('FKP', 'Falkland Islands Pound', 238, 2, ('FALKLAND ISLANDS (MALVINAS)',)),
+ ('FJD', 'Fiji Dollar', 242, 2, ('FIJI',)),
+ ('XPF',
+  'CFP Franc',
+  953,
+  0,
+  ('FRENCH POLYNESIA', 'NEW CALEDONIA', 'WALLIS AND FUTUNA')),
+ ('GMD', 'Dalasi', 270, 2, ('GAMBIA',)),
+ ('GEL', 'Lari', 981, 2, ('GEORGIA',)),
+ ('GHS', 'Ghana Cedi', 936, 2, ('GHANA',)),
+ ('GIP', 'Gibraltar Pound', 292, 2, ('GIBRALTAR',)),
+ ('GTQ', 'Quetzal', 320, 2, ('GUATEMALA',)),
+ ('GBP',
+  'Pound Sterling',
+  826,
+  2,
+  ('GUERNSEY', 'ISLE OF MAN', 'JERSEY', 'UNITED KINGDOM')),
+ ('GNF', 'Guinea Franc', 324, 0, ('GUINEA',)),
+ ('GYD', 'Guyana Dollar', 328, 2, ('GUYANA',)),
+ ('HTG', 'Gourde', 332, 2, ('HAITI',)),
+ ('HNL', 'Lempira', 340, 2, ('HONDURAS',)),
+ ('HKD', 'Hong Kong Dollar', 344, 2, ('HONG KONG',)),
+ ('HUF', 'Forint', 348, 2, ('HUNGARY',)),
+ ('ISK', 'Iceland Krona', 352, 0, ('ICELAND',)),
+ ('IDR', 'Rupiah', 360, 2, ('INDONESIA',)),
+ ('XDR',
+  'SDR (Special Drawing Right)',
+  960,
+  None,
+  ('INTERNATIONAL MONETARY FUND (IMF)\xa0',)),
+ ('IRR', 'Iranian Rial', 364, 2, ('IRAN, ISLAMIC REPUBLIC OF',)),
+ ('IQD', 'Iraqi Dinar', 368, 3, ('IRAQ',)),
+ ('ILS', 'New Israeli Sheqel', 376, 2, ('ISRAEL',)),
+ ('JMD', 'Jamaican Dollar', 388, 2, ('JAMAICA',)),
+ ('JPY', 'Yen', 392, 0, ('JAPAN',)),
+ ('JOD', 'Jordanian Dinar', 400, 3, ('JORDAN',)),
+ ('KZT', 'Tenge', 398, 2, ('KAZAKHSTAN',)),
+ ('KES', 'Kenyan Shilling', 404, 2, ('KENYA',)),
+ ('KPW',
+  'North Korean Won',
+  408,
+  2,
+  ('KOREA, DEMOCRATIC PEOPLE’S REPUBLIC OF',)),
+ ('KRW', 'Won', 410, 0, ('KOREA, REPUBLIC OF',)),
+ ('KWD', 'Kuwaiti Dinar', 414, 3, ('KUWAIT',)),
+ ('KGS', 'Som', 417, 2, ('KYRGYZSTAN',)),
+ ('LAK', 'Kip', 418, 2, ('LAO PEOPLE’S DEMOCRATIC REPUBLIC',)),
+ ('LBP', 'Lebanese Pound', 422, 2, ('LEBANON',)),
+ ('LSL', 'Loti', 426, 2, ('LESOTHO',)),
+ ('ZAR', 'Rand', 710, 2, ('LESOTHO', 'NAMIBIA', 'SOUTH AFRICA')),
+ ('LRD', 'Liberian Dollar', 430, 2, ('LIBERIA',)),
+ ('LYD', 'Libyan Dinar', 434, 3, ('LIBYA',)),
+ ('CHF', 'Swiss Franc', 756, 2, ('LIECHTENSTEIN', 'SWITZERLAND')),
+ ('LTL', 'Lithuanian Litas', 440, 2, ('LITHUANIA',)),
+ ('MOP', 'Pataca', 446, 2, ('MACAO',)),
+ ('MKD', 'Denar', 807, 2, ('MACEDONIA, THE FORMER \nYUGOSLAV REPUBLIC OF',)),
+ ('MGA', 'Malagasy Ariary', 969, 2, ('MADAGASCAR',)),
+ ('MWK', 'Kwacha', 454, 2, ('MALAWI',)),
+ ('MYR', 'Malaysian Ringgit', 458, 2, ('MALAYSIA',)),
+ ('MVR', 'Rufiyaa', 462, 2, ('MALDIVES',)),
+ ('MRO', 'Ouguiya', 478, 2, ('MAURITANIA',)),
+ ('MUR', 'Mauritius Rupee', 480, 2, ('MAURITIUS',)),
+ ('XUA',
+  'ADB Unit of Account',
+  965,
+  None,
+  ('MEMBER COUNTRIES OF THE AFRICAN DEVELOPMENT BANK GROUP',)),
+ ('MXN', 'Mexican Peso', 484, 2, ('MEXICO',)),
+ ('MXV', 'Mexican Unidad de Inversion (UDI)', 979, 2, ('MEXICO',)),
+ ('MDL', 'Moldovan Leu', 498, 2, ('MOLDOVA, REPUBLIC OF',)),
+ ('MNT', 'Tugrik', 496, 2, ('MONGOLIA',)),
+ ('MAD', 'Moroccan Dirham', 504, 2, ('MOROCCO', 'WESTERN SAHARA')),
+ ('MZN', 'Mozambique Metical', 943, 2, ('MOZAMBIQUE',)),
+ ('MMK', 'Kyat', 104, 2, ('MYANMAR',)),
+ ('NAD', 'Namibia Dollar', 516, 2, ('NAMIBIA',)),
+ ('NPR', 'Nepalese Rupee', 524, 2, ('NEPAL',)),
+ ('NIO', 'Cordoba Oro', 558, 2, ('NICARAGUA',)),
+ ('NGN', 'Naira', 566, 2, ('NIGERIA',)),
+ ('OMR', 'Rial Omani', 512, 3, ('OMAN',)),
+ ('PKR', 'Pakistan Rupee', 586, 2, ('PAKISTAN',)),
+ ('PAB', 'Balboa', 590, 2, ('PANAMA',)),
+ ('PGK', 'Kina', 598, 2, ('PAPUA NEW GUINEA',)),
+ ('PYG', 'Guarani', 600, 0, ('PARAGUAY',)),
+ ('PEN', 'Nuevo Sol', 604, 2, ('PERU',)),
+ ('PHP', 'Philippine Peso', 608, 2, ('PHILIPPINES',)),
+ ('PLN', 'Zloty', 985, 2, ('POLAND',)),
+ ('QAR', 'Qatari Rial', 634, 2, ('QATAR',)),
+ ('RON', 'New Romanian Leu', 946, 2, ('ROMANIA',)),
+ ('RUB', 'Russian Ruble', 643, 2, ('RUSSIAN FEDERATION',)),
+ ('RWF', 'Rwanda Franc', 646, 0, ('RWANDA',)),
+ ('SHP',
+  'Saint Helena Pound',
+  654,
+  2,
+  ('SAINT HELENA, ASCENSION AND \nTRISTAN DA CUNHA',)),
+ ('WST', 'Tala', 882, 2, ('SAMOA',)),
+ ('STD', 'Dobra', 678, 2, ('SAO TOME AND PRINCIPE',)),
+ ('SAR', 'Saudi Riyal', 682, 2, ('SAUDI ARABIA',)),
+ ('RSD', 'Serbian Dinar', 941, 2, ('SERBIA',)),
+ ('SCR', 'Seychelles Rupee', 690, 2, ('SEYCHELLES',)),
+ ('SLL', 'Leone', 694, 2, ('SIERRA LEONE',)),
+ ('SGD', 'Singapore Dollar', 702, 2, ('SINGAPORE',)),
+ ('XSU',
+  'Sucre',
+  994,
+  None,
+  ('SISTEMA UNITARIO DE COMPENSACION REGIONAL DE PAGOS "SUCRE"',)),
+ ('SBD', 'Solomon Islands Dollar', 90, 2, ('SOLOMON ISLANDS',)),
+ ('SOS', 'Somali Shilling', 706, 2, ('SOMALIA',)),
+ ('SSP', 'South Sudanese Pound', 728, 2, ('SOUTH SUDAN',)),
+ ('LKR', 'Sri Lanka Rupee', 144, 2, ('SRI LANKA',)),
+ ('SDG', 'Sudanese Pound', 938, 2, ('SUDAN',)),
+ ('SRD', 'Surinam Dollar', 968, 2, ('SURINAME',)),
+ ('SZL', 'Lilangeni', 748, 2, ('SWAZILAND',)),
+ ('SEK', 'Swedish Krona', 752, 2, ('SWEDEN',)),
+ ('CHE', 'WIR Euro', 947, 2, ('SWITZERLAND',)),
+ ('CHW', 'WIR Franc', 948, 2, ('SWITZERLAND',)),
+ ('SYP', 'Syrian Pound', 760, 2, ('SYRIAN ARAB REPUBLIC',)),
+ ('TWD', 'New Taiwan Dollar', 901, 2, ('TAIWAN, PROVINCE OF CHINA',)),
+ ('TJS', 'Somoni', 972, 2, ('TAJIKISTAN',)),
+ ('TZS', 'Tanzanian Shilling', 834, 2, ('TANZANIA, UNITED REPUBLIC OF',)),
+ ('THB', 'Baht', 764, 2, ('THAILAND',)),
+ ('TOP', 'Pa’anga', 776, 2, ('TONGA',)),
+ ('TTD', 'Trinidad and Tobago Dollar', 780, 2, ('TRINIDAD AND TOBAGO',)),
+ ('TND', 'Tunisian Dinar', 788, 3, ('TUNISIA',)),
+ ('TRY', 'Turkish Lira', 949, 2, ('TURKEY',)),
+ ('TMT', 'Turkmenistan New Manat', 934, 2, ('TURKMENISTAN',)),
+ ('UGX', 'Uganda Shilling', 800, 0, ('UGANDA',)),
+ ('UAH', 'Hryvnia', 980, 2, ('UKRAINE',)),
+ ('AED', 'UAE Dirham', 784, 2, ('UNITED ARAB EMIRATES',)),
+ ('USN', 'US Dollar (Next day)', 997, 2, ('UNITED STATES',)),
+ ('UYI', 'Uruguay Peso en Unidades Indexadas (URUIURUI)', 940, 0, ('URUGUAY',)),
+ ('UYU', 'Peso Uruguayo', 858, 2, ('URUGUAY',)),
+ ('UZS', 'Uzbekistan Sum', 860, 2, ('UZBEKISTAN',)),
+ ('VUV', 'Vatu', 548, 0, ('VANUATU',)),
+ ('VEF', 'Bolivar', 937, 2, ('VENEZUELA, BOLIVARIAN REPUBLIC OF',)),
+ ('VND', 'Dong', 704, 0, ('VIET NAM',)),
+ ('YER', 'Yemeni Rial', 886, 2, ('YEMEN',)),
+ ('ZMW', 'Zambian Kwacha', 967, 2, ('ZAMBIA',)),
+ ('ZWL', 'Zimbabwe Dollar', 932, 2, ('ZIMBABWE',)),
+ ('XBA',
+  'Bond Markets Unit European Composite Unit (EURCO)',
+  955,
+  None,
+  ('ZZ01_Bond Markets Unit European_EURCO',)),
+ ('XBB',
+  'Bond Markets Unit European Monetary Unit (E.M.U.-6)',
+  956,
+  None,
+  ('ZZ02_Bond Markets Unit European_EMU-6',)),
+ ('XBC',
+  'Bond Markets Unit European Unit of Account 9 (E.U.A.-9)',
+  957,
+  None,
+  ('ZZ03_Bond Markets Unit European_EUA-9',)),
+ ('XBD',
+  'Bond Markets Unit European Unit of Account 17 (E.U.A.-17)',
+  958,
+  None,
+  ('ZZ04_Bond Markets Unit European_EUA-17',)),
+ ('XTS',
+  'Codes specifically reserved for testing purposes',
+  963,
+  None,
+  ('ZZ06_Testing_Code',)),
+ ('XXX',
+  'The codes assigned for transactions where no currency is involved',
+  999,
+  None,
+  ('ZZ07_No_Currency',)),
+ ('XAU', 'Gold', 959, None, ('ZZ08_Gold',)),
+ ('XPD', 'Palladium', 964, None, ('ZZ09_Palladium',)),
+ ('XPT', 'Platinum', 962, None, ('ZZ10_Platinum',)),
+ ('XAG', 'Silver', 961, None, ('ZZ11_Silver',)))
+
+SYMBOLS = {'AFN': '؋',
+ 'ALL': 'Lek',
+ 'ANG': 'ƒ',
+ 'ARS': '$',
+ 'AUD': '$',
+ 'AWG': 'ƒ',
+ 'AZN': 'ман',
+ 'BAM': 'KM',
+ 'BBD': '$',
+ 'BGN': 'лв',
+ 'BMD': '$',
+ 'BND': '$',
+ 'BOB': '$b',
+ 'BRL': 'R$',
+ 'BSD': '$',
+ 'BWP': 'P',
+ 'BYR': 'p.',
+ 'BZD': 'BZ$',
+ 'CAD': '$',
+ 'CHF': 'CHF',
+ 'CLP': '$',
+ 'CNY': '¥',
+ 'COP': '$',
+ 'CRC': '₡',
+ 'CUP': '₱',
+ 'CZK': 'Kč',
+ 'DKK': 'kr',
+ 'DOP': 'RD$',
+ 'EEK': 'kr',
+ 'EGP': '£',
+ 'EUR': '€',
+ 'FJD': '$',
+ 'FKP': '£',
+ 'GBP': '£',
+ 'GGP': '£',
+ 'GHC': '¢',
+ 'GIP': '£',
+ 'GTQ': 'Q',
+ 'GYD': '$',
+ 'HKD': '$',
+ 'HNL': 'L',
+ 'HRK': 'kn',
+ 'HUF': 'Ft',
+ 'IDR': 'Rp',
+ 'ILS': '₪',
+ 'IMP': '£',
+ 'INR': '',
+ 'IRR': '﷼',
+ 'ISK': 'kr',
+ 'JEP': '£',
+ 'JMD': 'J$',
+ 'JPY': '¥',
+ 'KGS': 'лв',
+ 'KHR': '៛',
+ 'KPW': '₩',
+ 'KRW': '₩',
+ 'KYD': '$',
+ 'KZT': 'лв',
+ 'LAK': '₭',
+ 'LBP': '£',
+ 'LKR': '₨',
+ 'LRD': '$',
+ 'LTL': 'Lt',
+ 'LVL': 'Ls',
+ 'MKD': 'ден',
+ 'MNT': '₮',
+ 'MUR': '₨',
+ 'MXN': '$',
+ 'MYR': 'RM',
+ 'MZN': 'MT',
+ 'NAD': '$',
+ 'NGN': '₦',
+ 'NIO': 'C$',
+ 'NOK': 'kr',
+ 'NPR': '₨',
+ 'NZD': '$',
+ 'OMR': '﷼',
+ 'PAB': 'B/.',
+ 'PEN': 'S/.',
+ 'PHP': '₱',
+ 'PKR': '₨',
+ 'PLN': 'zł',
+ 'PYG': 'Gs',
+ 'QAR': '﷼',
+ 'RON': 'lei',
+ 'RSD': 'Дин.',
+ 'RUB': 'руб',
+ 'SAR': '﷼',
+ 'SBD': '$',
+ 'SCR': '₨',
+ 'SEK': 'kr',
+ 'SGD': '$',
+ 'SHP': '£',
+ 'SOS': 'S',
+ 'SRD': '$',
+ 'SVC': '$',
+ 'SYP': '£',
+ 'THB': '฿',
+ 'TRL': '₤',
+ 'TRY': '',
+ 'TTD': 'TT$',
+ 'TVD': '$',
+ 'TWD': 'NT$',
+ 'UAH': '₴',
+ 'USD': '$',
+ 'UYU': '$U',
+ 'UZS': 'лв',
+ 'VEF': 'Bs',
+ 'VND': '₫',
+ 'XCD': '$',
+ 'YER': '﷼',
+ 'ZAR': 'R',
+ 'ZWD': 'Z$'}
@@ -2,12 +2,20 @@
 Defines models common to all of the sam server models
 """
 
+import base64
+import binascii
+import datetime
+import json
 import uuid
 
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import connection, models
+from django.utils import timezone
 
 from .fields import UUIDField
 
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=timezone.utc)
+
 
 class ModelBase(models.Model):
     """
@@ -27,3 +35,202 @@ class ModelBase(models.Model):
     @property
     def uuid(self):
         return uuid.UUID(self.id)
+
+
+def _encode_position_value(value):
+    if isinstance(value, datetime.datetime):
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, timezone.utc)
+        delta = value - _EPOCH
+        return ['t', (delta.days * 86400 + delta.seconds) * 1000000 +
+                delta.microseconds]
+    if isinstance(value, datetime.date):
+        return ['d', value.toordinal()]
+    if isinstance(value, uuid.UUID):
+        return ['u', value.hex]
+    if value is None or isinstance(value, (str, int)):
+        return value
+    raise TypeError('Cannot encode {0!r} in a position token'.format(value))
+
+
+def _decode_position_value(value):
+    if not isinstance(value, list):
+        return value
+    tag, encoded = value
+    if tag == 't':
+        return _EPOCH + datetime.timedelta(microseconds=encoded)
+    if tag == 'd':
+        return datetime.date.fromordinal(encoded)
+    if tag == 'u':
+        return uuid.UUID(encoded)
+    raise ValueError('Unknown position value: {0}'.format(tag))
+
+
+def encode_position_token(*values):
+    """
+    Encodes the position of a row in an ordering (the values of the
+    ordered columns of the row) as an opaque, url safe token.
+
+    The values can be datetimes, dates, uuids, strings, integers or None.
+    """
+    raw = json.dumps([_encode_position_value(v) for v in values],
+                     separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_position_token(token):
+    """
+    Decodes a token created by `encode_position_token`.
+    Returns the tuple of encoded values.
+    Raises a `ValueError` if the token is invalid.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+        values = json.loads(raw)
+        if not isinstance(values, list) or not values:
+            raise ValueError('Not a position')
+        return tuple(_decode_position_value(v) for v in values)
+    except (ValueError, TypeError, UnicodeError, binascii.Error, OverflowError):
+        raise ValueError('Invalid page token: {0}'.format(token))
+
+
+def _ordering_fields(model, ordering):
+    """
+    The (field, descending) pairs of an ordering of the model, given as
+    field names with an optional '-' prefix (as accepted by `order_by`).
+    """
+    ## Fields can also be named by their column (eg. 'user_id')
+    fields = {field.attname: field for field in model._meta.fields}
+    fields.update((field.name, field) for field in model._meta.fields)
+    try:
+        return [(fields[name.lstrip('-')], name.startswith('-'))
+                for name in ordering]
+    except KeyError as e:
+        raise ValueError('Cannot order by {0}'.format(e.args[0]))
+
+
+def clean_position(model, ordering, position):
+    """
+    Validates a position in an ordering of the model (eg. one decoded from
+    a page token), converting each value with the `to_python` method of
+    its field.
+    Returns the tuple of converted values.
+
+    Raises a `ValueError` if the position does not have a value for each
+    of the ordered fields and the primary key, or if a value is not valid
+    for its field.
+    """
+    fields = ([field for field, _ in _ordering_fields(model, ordering)] +
+              [model._meta.pk])
+    if len(position) != len(fields):
+        raise ValueError('Position does not match the ordering')
+    values = []
+    for field, value in zip(fields, position):
+        if value is None:
+            if not field.null:
+                raise ValueError(
+                    'Invalid position value for {0}: None'.format(field.name))
+            values.append(None)
+            continue
+        try:
+            values.append(field.to_python(value))
+        ## `to_python` can raise other errors for values of the wrong type
+        except (ValidationError, TypeError, ValueError, AttributeError):
+            raise ValueError(
+                'Invalid position value for {0}: {1!r}'
+                .format(field.name, value))
+    return tuple(values)
+
+
+def _after_value_q(field, value, descending):
+    """
+    Selects the rows which are ordered strictly after the value of the
+    field. Nulls are ordered after all other values in an ascending
+    ordering, and before them in a descending ordering (as in postgres).
+    """
+    if descending:
+        if value is None:
+            return models.Q(**{field.name + '__isnull': False})
+        return models.Q(**{field.name + '__lt': value})
+    if value is None:
+        return models.Q(pk__in=[])
+    after = models.Q(**{field.name + '__gt': value})
+    if field.null:
+        after |= models.Q(**{field.name + '__isnull': True})
+    return after
+
+
+def _equal_value_q(field, value):
+    if value is None:
+        return models.Q(**{field.name + '__isnull': True})
+    return models.Q(**{field.name: value})
+
+
+def keyset_queryset(queryset, ordering, after=None):
+    """
+    Orders the queryset by the ordering (a sequence of field names, with
+    an optional '-' prefix for descending fields) and then by primary key,
+    and selects the rows after the position `after` (if it is not None).
+    The position is a tuple of the values of each of the ordered fields
+    and the primary key.
+
+    If the ordering is by a single non null ascending field, the rows are
+    selected by comparing the row value (field, pk) with the position, so
+    a composite index on the columns can be used to seek directly to the
+    position, however far into the ordering it is.
+    """
+    ordering = tuple(ordering)
+    queryset = queryset.order_by(*(ordering + ('pk',)))
+    if after is None:
+        return queryset
+    opts = queryset.model._meta
+    fields = _ordering_fields(queryset.model, ordering) + [(opts.pk, False)]
+    if len(after) != len(fields):
+        raise ValueError('Position does not match the ordering')
+
+    if len(fields) == 2 and not fields[0][1] and not fields[0][0].null:
+        qn = connection.ops.quote_name
+        where = '({0}.{1}, {0}.{2}) > (%s, %s)'.format(
+            qn(opts.db_table), qn(fields[0][0].column), qn(opts.pk.column))
+        params = [field.get_db_prep_value(value, connection)
+                  for (field, _), value in zip(fields, after)]
+        return queryset.extra(where=[where], params=params)
+
+    ## (f1 after v1) or (f1 = v1 and f2 after v2) or ...
+    after_q = models.Q(pk__in=[])
+    equal_q = models.Q()
+    for (field, descending), value in zip(fields, after):
+        after_q |= equal_q & _after_value_q(field, value, descending)
+        equal_q &= _equal_value_q(field, value)
+    return queryset.filter(after_q)
+
+
+def keyset_page(queryset, ordering, columns, page_size, after=None):
+    """
+    Fetches a page of the `values_list` rows of the given columns of the
+    queryset, ordered by the ordering and then by primary key.
+
+    `after` is the position of the last row of the previous page, or None
+    for the first page (see `keyset_queryset`).
+
+    Returns a tuple (rows, next_position), where next_position is the
+    position of the last row of the page, or None if there are no more rows.
+    The columns must include the ordered fields and the primary key ('id').
+    """
+    ordering = tuple(ordering)
+    columns = tuple(columns)
+    try:
+        position_indexes = [columns.index(name.lstrip('-'))
+                            for name in ordering + ('id',)]
+    except ValueError:
+        raise ValueError(
+            'Columns must include the ordered fields ({0}) and \'id\''
+            .format(', '.join(ordering)))
+    queryset = keyset_queryset(queryset, ordering, after)
+    rows = list(queryset.values_list(*columns)[:page_size + 1])
+    if len(rows) <= page_size:
+        return (rows, None)
+    rows = rows[:page_size]
+    last_row = rows[-1]
+    return (rows, tuple(last_row[i] for i in position_indexes))
@@ -0,0 +1,69 @@
+"""
+The postgres database backend, with the `on_commit` hooks of later
+versions of django (backported from django 1.9).
+
+Used as the ENGINE of a database with
+
+    'ENGINE': 'common.postgresql'
+
+after which `connection.on_commit(func)` calls `func` after the current transaction commits, or immediately if the
+connection is not in a transaction. If the transaction is rolled back,
+or rolled back to a savepoint created before the call, `func` is dropped.
+"""
+from django.db import transaction
+from django.db.backends.postgresql_psycopg2 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        ## (savepoint ids, func) of the hooks of the current transaction
+        self.run_on_commit = []
+        ## Hooks run once autocommit is restored after the commit of an
+        ## atomic block, so that they are run outside the transaction
+        self.run_commit_hooks_on_set_autocommit_on = False
+
+    def on_commit(self, func):
+        if self.in_atomic_block:
+            self.run_on_commit.append((set(self.savepoint_ids), func))
+        elif not self.get_autocommit():
+            raise transaction.TransactionManagementError(
+                'on_commit() cannot be used in manual transaction management')
+        else:
+            func()
+
+    def run_and_clear_commit_hooks(self):
+        self.validate_no_atomic_block()
+        hooks, self.run_on_commit = self.run_on_commit, []
+        for _, func in hooks:
+            func()
+
+    def connect(self):
+        ## A transaction interrupted by a closed connection never commits
+        self.run_on_commit = []
+        self.run_commit_hooks_on_set_autocommit_on = False
+        super().connect()
+
+    def commit(self):
+        super().commit()
+        self.run_commit_hooks_on_set_autocommit_on = True
+
+    def rollback(self):
+        super().rollback()
+        self.run_on_commit = []
+
+    def savepoint_rollback(self, sid):
+        super().savepoint_rollback(sid)
+        self.run_on_commit = [
+            (sids, func) for (sids, func) in self.run_on_commit
+            if sid not in sids]
+
+    def set_autocommit(self, autocommit):
+        super().set_autocommit(autocommit)
+        if autocommit and self.run_commit_hooks_on_set_autocommit_on:
+            self.run_commit_hooks_on_set_autocommit_on = False
+            self.run_and_clear_commit_hooks()
+
+    def close(self):
+        super().close()
+        self.run_on_commit = []
@@ -0,0 +1,62 @@
+"""
+Helpers for inspecting the postgres query plans of querysets, so that tests
+can assert that the hot queries of the API are answered from an index.
+
+    plan = explain(Asset.objects.filter(user=user, deleted=False))
+    assert not sequential_scans(plan, 'asset_asset')
+"""
+import json
+
+from django.db import connection
+
+
+def explain(queryset):
+    """
+    Runs `EXPLAIN (FORMAT JSON)` on the sql of the queryset.
+    Returns the root node of the plan, as a dict.
+
+    The query is planned but not executed.
+    """
+    if connection.vendor != 'postgresql':
+        raise ValueError(
+            'Query plans are only supported on postgresql, not {0}'
+            .format(connection.vendor))
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        result = cursor.fetchone()[0]
+    ## Older versions of psycopg2 do not decode json columns
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]['Plan']
+
+
+def iter_plan_nodes(plan):
+    """
+    Iterates over the nodes of the plan (depth first, from the root)
+    """
+    yield plan
+    for child in plan.get('Plans', ()):
+        yield from iter_plan_nodes(child)
+
+
+def sequential_scans(plan, table=None):
+    """
+    The sequential scan nodes of the plan, optionally restricted to the
+    scans of the given table.
+    """
+    return [
+        node for node in iter_plan_nodes(plan)
+        if node['Node Type'] == 'Seq Scan'
+        and (table is None or node.get('Relation Name') == table)
+    ]
+
+
+def index_names(plan):
+    """
+    The names of the indexes scanned by the plan
+    """
+    return set(
+        node['Index Name'] for node in iter_plan_nodes(plan)
+        if 'Index Name' in node
+    )
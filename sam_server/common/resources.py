@@ -1,13 +1,9 @@
-import re
-
 from ext_utils.json.resources import Resource
-from .currency import MoneyAmount
+from parsers.exceptions import ParseError
+from .currency import MoneyAmount, CurrencyException
 
 
 class MoneyAmountResource(Resource):
-    CURRENCY_PATTERN = re.compile(
-        r'([-+]?\d+\.\d+) ([A-Z]{3})'
-    )
 
     def to_json(self, value):
         self.check_mandatory(value)
@@ -22,11 +18,12 @@ class MoneyAmountResource(Resource):
         if resource is None:
             return None
         if isinstance(resource, str):
-            match = MoneyAmountResource.CURRENCY_PATTERN.match(resource)
-            if match is None:
-                raise ValueError('Invalid format for money value: {0}'.format(resource))
-            value = '{0} {1}'.format(match.group(2), match.group(1))
-            return MoneyAmount.parse(value)
+            try:
+                return MoneyAmount.parse(resource)
+            except (ParseError, CurrencyException) as e:
+                raise ValueError(
+                    'Invalid format for money value: {0} ({1})'
+                    .format(resource, e))
         raise ValueError('Expected a string: {0}'.format(resource))
 
 
@@ -1,9 +1,13 @@
 from fractions import Fraction
+import pickle
 from decimal import Decimal
 
 from django.test import TestCase
 
-from ..currency import MoneyAmount, Currency, MoneyAmountParser
+from parsers.exceptions import ParseError
+
+from ..currency import MoneyAmount, MoneyArray, Currency, MoneyAmountParser, CurrencyException
+from .. import currency_table
 
 
 class MoneyAmountTest(TestCase):
@@ -31,6 +35,32 @@ class MoneyAmountTest(TestCase):
         self.assertEqual(amt1 * Fraction(4, 5), MoneyAmount('USD', 320))
         self.assertEqual(amt1 * Decimal(0.8), MoneyAmount('USD', 320))
 
+    def test_hash(self):
+        amounts = {MoneyAmount('USD', 400), MoneyAmount('USD', 400),
+                   MoneyAmount('AUD', 400)}
+        self.assertEqual(len(amounts), 2)
+
+    def test_immutable(self):
+        amt1 = MoneyAmount('USD', 400)
+        with self.assertRaises(AttributeError):
+            amt1.value = 500
+        with self.assertRaises(AttributeError):
+            amt1.extra = 500
+
+    def test_shares_currency(self):
+        amt1 = MoneyAmount('USD', 400) + MoneyAmount('USD', 100)
+        self.assertIs(amt1.currency, Currency.from_code('USD'))
+
+    def test_sum(self):
+        amounts = [MoneyAmount('USD', 100)] * 4
+        self.assertEqual(sum(amounts), MoneyAmount('USD', 400))
+
+    def test_pickle(self):
+        amt1 = MoneyAmount('USD', 400)
+        amt2 = pickle.loads(pickle.dumps(amt1))
+        self.assertEqual(amt1, amt2)
+        self.assertIs(amt2.currency, amt1.currency)
+
     def test_to_string(self):
         amt1 = MoneyAmount('AUD', 412)
         self.assertEqual(str(amt1), 'AUD 4.12')
@@ -39,6 +69,60 @@ class MoneyAmountTest(TestCase):
         self.assertEqual(str(amt2), 'AUD 40.00')
 
 
+class MoneyArrayTest(TestCase):
+    def setUp(self):
+        self.amounts = [
+            MoneyAmount('USD', 400),
+            MoneyAmount('AUD', 250),
+            MoneyAmount('USD', 101),
+            MoneyAmount('AUD', -50),
+        ]
+        self.array = MoneyArray(self.amounts)
+
+    def test_to_amounts(self):
+        self.assertEqual(len(self.array), 4)
+        self.assertEqual(self.array.to_amounts(), self.amounts)
+        self.assertEqual(self.array[1], MoneyAmount('AUD', 250))
+        self.assertEqual(self.array.currency_codes, ['USD', 'AUD', 'USD', 'AUD'])
+
+    def test_from_rows(self):
+        money_array = MoneyArray.from_rows([(400, 'USD'), (None, 'USD'), (250, 'AUD')])
+        self.assertEqual(money_array.to_amounts(),
+                         [MoneyAmount('USD', 400), MoneyAmount('AUD', 250)])
+
+    def test_aggregates(self):
+        self.assertEqual(self.array.sum_by_currency(), {
+            'USD': MoneyAmount('USD', 501),
+            'AUD': MoneyAmount('AUD', 200)
+        })
+        self.assertEqual(self.array.min_by_currency(), {
+            'USD': MoneyAmount('USD', 101),
+            'AUD': MoneyAmount('AUD', -50)
+        })
+        self.assertEqual(self.array.max_by_currency(), {
+            'USD': MoneyAmount('USD', 400),
+            'AUD': MoneyAmount('AUD', 250)
+        })
+        ## 250.5 and 100, rounded to even
+        self.assertEqual(self.array.mean_by_currency(), {
+            'USD': MoneyAmount('USD', 250),
+            'AUD': MoneyAmount('AUD', 100)
+        })
+        self.assertEqual(MoneyArray().sum_by_currency(), {})
+
+    def test_multiplication(self):
+        scaled = self.array * Fraction(1, 2)
+        self.assertEqual(scaled.to_amounts(), [
+            MoneyAmount('USD', 200),
+            MoneyAmount('AUD', 125),
+            MoneyAmount('USD', 50),
+            MoneyAmount('AUD', -25),
+        ])
+        self.assertEqual(scaled.to_amounts(),
+                         [amount * Fraction(1, 2) for amount in self.amounts])
+        self.assertEqual((self.array * 2)[0], MoneyAmount('USD', 800))
+
+
 class CurrencyTest(TestCase):
     def test_currency_from_code(self):
         currency = Currency.from_code('NZD')
@@ -73,6 +157,37 @@ class CurrencyTest(TestCase):
         currency = Currency.from_code('EUR')
         self.assertEqual(currency.symbol, '€')
 
+    def test_currency_from_code_case_insensitive(self):
+        self.assertIs(Currency.from_code('nzd'), Currency.from_code('NZD'))
+        with self.assertRaises(CurrencyException):
+            Currency.from_code('ZZZ')
+
+    def test_currency_from_number(self):
+        self.assertEqual(Currency.from_number(36).code, 'AUD')
+        self.assertEqual(Currency.from_number('036').code, 'AUD')
+        with self.assertRaises(CurrencyException):
+            Currency.from_number('AUD')
+
+    def test_currency_from_country(self):
+        self.assertEqual(Currency.from_country('NIUE').code, 'NZD')
+        self.assertEqual(Currency.from_country('New Zealand').code, 'NZD')
+        with self.assertRaises(CurrencyException):
+            Currency.from_country('ATLANTIS')
+
+    def test_currency_from_countries(self):
+        currencies = Currency.from_countries(['AUSTRALIA', 'france', 'NIUE'])
+        self.assertEqual([c.code for c in currencies], ['AUD', 'EUR', 'NZD'])
+
+    def test_currency_immutable(self):
+        currency = Currency.from_code('AUD')
+        with self.assertRaises(AttributeError):
+            currency.code = 'USD'
+        with self.assertRaises(AttributeError):
+            currency.rate = 1
+
+    def test_compiled_table_matches_xml(self):
+        self.assertTrue(currency_table.check_table())
+
 
 class ParsingTest(TestCase):
     def test_parse_monetary_value(self):
@@ -82,3 +197,37 @@ class ParsingTest(TestCase):
 
         result = parser.run('USD 4.02')
         self.assertEqual(result, MoneyAmount('USD', 402))
+
+    def test_parse(self):
+        self.assertEqual(MoneyAmount.parse('AUD 4.12'), MoneyAmount('AUD', 412))
+        self.assertEqual(MoneyAmount.parse('4.12 AUD'), MoneyAmount('AUD', 412))
+        self.assertEqual(MoneyAmount.parse('-4.1 USD'), MoneyAmount('USD', -410))
+        self.assertEqual(MoneyAmount.parse('USD 40'), MoneyAmount('USD', 4000))
+        self.assertEqual(MoneyAmount.parse('JPY 400'), MoneyAmount('JPY', 400))
+
+    def test_parse_case_and_spacing(self):
+        ## The value does not depend on the case of the code or on the
+        ## space between the code and the value
+        for string in ['AUD 4.1', 'aud 4.1', 'AUD4.1', 'aud4.1',
+                       '4.1 aud', '4.1AUD', ' Aud  4.1 ']:
+            self.assertEqual(MoneyAmount.parse(string), MoneyAmount('AUD', 410))
+        ## The fallback parser scales the minor units in the same way
+        for string in ['AUD 4.1', 'aud 4.1', 'AUD4.1']:
+            self.assertEqual(MoneyAmountParser().run(string),
+                             MoneyAmount('AUD', 410))
+        for string in ['AUD 4.123', 'aud 4.123', 'AUD4.123']:
+            with self.assertRaises(CurrencyException):
+                MoneyAmount.parse(string)
+
+    def test_parse_rejects_non_ascii_digits(self):
+        for string in ['AUD \u0664.\u0661\u0662', 'AUD \uff14.12']:
+            with self.assertRaises(ParseError):
+                MoneyAmount.parse(string)
+        with self.assertRaises(ValueError):
+            MoneyAmount('AUD', '\u0664.12')
+
+    def test_parse_enforces_minor_units(self):
+        with self.assertRaises(CurrencyException):
+            MoneyAmount.parse('AUD 4.123')
+        with self.assertRaises(CurrencyException):
+            MoneyAmount.parse('400.5 JPY')
@@ -0,0 +1,97 @@
+import http.client
+import json
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from ..event_bus_server import EventBusServer
+from ..event_gateway import EventGateway
+from ..events import RedisEventBus
+
+
+class EventGatewayTest(SimpleTestCase):
+    def setUp(self):
+        self.server = EventBusServer('127.0.0.1', 0)
+        self.gateway = EventGateway(
+            self.render, *self.server.address, host='127.0.0.1', port=0,
+            keepalive_interval=0.5)
+        self.threads = [
+            threading.Thread(target=self.server.serve_forever),
+            threading.Thread(target=self.gateway.serve_forever)
+        ]
+        for thread in self.threads:
+            thread.start()
+        self.bus = RedisEventBus(*self.server.address)
+        self.connection = http.client.HTTPConnection(*self.gateway.address,
+                                                     timeout=5)
+
+    def tearDown(self):
+        self.connection.close()
+        self.bus.close()
+        self.gateway.shutdown()
+        self.threads[1].join()
+        self.server.shutdown()
+        self.threads[0].join()
+
+    def render(self, channel, messages):
+        return {'channel': channel, 'messages': messages}
+
+    def publish_when_subscribed(self, channel, message):
+        ## The message is only published once the gateway has subscribed
+        for _ in range(100):
+            if self.bus.publish(channel, message):
+                return
+            time.sleep(0.01)
+        self.fail('Gateway did not subscribe to {0}'.format(channel))
+
+    def test_long_poll(self):
+        self.connection.request('GET', '/events/a:1?timeout=5')
+        self.publish_when_subscribed('a:1', 'changed')
+        response = self.connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(response.read().decode('utf-8')),
+                         {'channel': 'a:1', 'messages': ['changed']})
+
+    def test_long_poll_timeout(self):
+        self.connection.request('GET', '/events/a?timeout=0.1')
+        response = self.connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(json.loads(response.read().decode('utf-8')),
+                         {'channel': 'a', 'messages': []})
+
+    def test_invalid_request(self):
+        self.connection.request('GET', '/events/a?timeout=soon')
+        self.assertEqual(self.connection.getresponse().status, 400)
+        self.connection.close()
+        self.connection.request('POST', '/events/a')
+        self.assertEqual(self.connection.getresponse().status, 405)
+
+    def test_event_stream(self):
+        self.connection.request('GET', '/events/a?format=sse')
+        response = self.connection.getresponse()
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader('Content-Type'),
+                         'text/event-stream')
+        self.assertEqual(response.readline(), b'retry: 1000\n')
+        self.assertEqual(response.readline(), b'\n')
+        self.publish_when_subscribed('a', 'changed')
+        self.assertEqual(response.readline(), b'event: message\n')
+        self.assertEqual(
+            json.loads(response.readline()[len(b'data: '):].decode('utf-8')),
+            {'channel': 'a', 'messages': ['changed']})
+        self.assertEqual(response.readline(), b'\n')
+        self.assertEqual(response.readline(), b': keepalive\n')
+
+    def test_disconnect(self):
+        self.connection.request('GET', '/events/a?format=sse')
+        response = self.connection.getresponse()
+        response.readline()
+        self.publish_when_subscribed('a', 'changed')
+        response.close()
+        ## The gateway unsubscribes once its last request has gone away
+        for _ in range(100):
+            if not self.bus.publish('a', 'ping'):
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.bus.publish('a', 'ping'), 0)
@@ -0,0 +1,231 @@
+import socket
+import threading
+import time
+
+from django.test import SimpleTestCase, TransactionTestCase
+
+from .. import events
+from ..event_bus_server import EventBusServer
+from ..events import (InProcessEventBus, RedisEventBus, BackgroundPublisher,
+                      encode_command, parse_reply)
+
+
+class EventBusTests(object):
+    """
+    Tests run against each of the event bus backends
+    """
+    def wait_for_messages(self, subscription, count):
+        messages = []
+        while len(messages) < count:
+            received = subscription.wait(1)
+            if not received:
+                break
+            messages.extend(received)
+        return messages
+
+    def test_publish(self):
+        with self.bus.subscribe(['a', 'b']) as subscription:
+            self.bus.publish('a', '1')
+            self.bus.publish('c', 'ignored')
+            self.bus.publish('b', '2')
+            self.assertEqual(self.wait_for_messages(subscription, 2),
+                             [('a', '1'), ('b', '2')])
+
+    def test_wait(self):
+        with self.bus.subscribe(['a']) as subscription:
+            timer = threading.Timer(0.1, self.bus.publish, ('a', 'late'))
+            timer.start()
+            try:
+                self.assertEqual(subscription.wait(5), [('a', 'late')])
+            finally:
+                timer.join()
+
+    def test_wait_timeout(self):
+        with self.bus.subscribe(['a']) as subscription:
+            start = time.monotonic()
+            self.assertEqual(subscription.wait(0.1), [])
+            self.assertGreaterEqual(time.monotonic() - start, 0.09)
+
+    def test_multiple_subscribers(self):
+        with self.bus.subscribe(['a']) as first, \
+                self.bus.subscribe(['a']) as second:
+            self.bus.publish('a', '1')
+            self.assertEqual(first.wait(1), [('a', '1')])
+            self.assertEqual(second.wait(1), [('a', '1')])
+
+    def test_close(self):
+        subscription = self.bus.subscribe(['a'])
+        subscription.close()
+        ## Nothing is delivered after the subscription is closed
+        self.assertEqual(self.wait_for_subscribers('a', 0), 0)
+
+
+class InProcessEventBusTest(EventBusTests, SimpleTestCase):
+    def setUp(self):
+        self.bus = InProcessEventBus()
+
+    def wait_for_subscribers(self, channel, expected):
+        return self.bus.publish(channel, 'ping')
+
+
+class RedisEventBusTest(EventBusTests, SimpleTestCase):
+    def setUp(self):
+        self.server = EventBusServer('127.0.0.1', 0)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.bus = RedisEventBus(*self.server.address)
+
+    def tearDown(self):
+        self.bus.close()
+        self.server.shutdown()
+        self.thread.join()
+
+    def wait_for_subscribers(self, channel, expected):
+        ## Subscriptions are closed asynchronously by the server
+        for _ in range(50):
+            num_subscribers = self.bus.publish(channel, 'ping')
+            if num_subscribers == expected:
+                break
+            time.sleep(0.01)
+        return num_subscribers
+
+
+class RespTest(SimpleTestCase):
+    def test_encode_command(self):
+        self.assertEqual(encode_command('PUBLISH', 'a', 'b'),
+                         b'*3\r\n$7\r\nPUBLISH\r\n$1\r\na\r\n$1\r\nb\r\n')
+
+    def test_parse_reply(self):
+        buffer = b':2\r\n*2\r\n$1\r\na\r\n$-1\r\n+OK\r\n'
+        reply, position = parse_reply(buffer)
+        self.assertEqual(reply, 2)
+        reply, position = parse_reply(buffer, position)
+        self.assertEqual(reply, [b'a', None])
+        reply, position = parse_reply(buffer, position)
+        self.assertEqual(reply, 'OK')
+        self.assertEqual(position, len(buffer))
+
+
+class SplitReplyTest(SimpleTestCase):
+    """
+    Replies which arrive in several parts, from a server which splits
+    each of its replies across two sends
+    """
+    def setUp(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.listen(1)
+        self.bus = RedisEventBus(*self.socket.getsockname())
+        self.thread = None
+
+    def tearDown(self):
+        if self.thread is not None:
+            self.thread.join()
+        self.socket.close()
+
+    def serve(self, *replies):
+        def run():
+            client, _ = self.socket.accept()
+            with client:
+                ## Confirm the SUBSCRIBE
+                client.recv(4096)
+                client.sendall(
+                    b'*3\r\n$9\r\nsubscribe\r\n$1\r\na\r\n:1\r\n')
+                for reply in replies:
+                    time.sleep(0.2)
+                    client.sendall(reply)
+                ## Wait for the subscription to be closed
+                client.recv(4096)
+        self.thread = threading.Thread(target=run)
+        self.thread.start()
+
+    def message(self, message):
+        return encode_command('message', 'a', message)
+
+    def test_wait(self):
+        message = self.message('1')
+        self.serve(message[:10], message[10:])
+        with self.bus.subscribe(['a']) as subscription:
+            self.assertEqual(subscription.wait(5), [('a', '1')])
+
+    def test_wait_for_rest_of_message(self):
+        message = self.message('2')
+        self.serve(self.message('1') + message[:10], message[10:])
+        with self.bus.subscribe(['a']) as subscription:
+            self.assertEqual(subscription.wait(5), [('a', '1'), ('a', '2')])
+
+
+class EventBusSettingsTest(SimpleTestCase):
+    def tearDown(self):
+        events.set_event_bus(None)
+
+    def test_backend(self):
+        with self.settings(EVENT_BUS={'BACKEND': 'redis', 'PORT': 6380}):
+            bus = events.event_bus_from_settings()
+        self.assertIsInstance(bus, RedisEventBus)
+        self.assertEqual(bus.port, 6380)
+
+    def test_unknown_backend(self):
+        with self.settings(EVENT_BUS={'BACKEND': 'carrier_pigeon'}):
+            with self.assertRaises(events.EventBusError):
+                events.event_bus_from_settings()
+
+
+class PublishTest(TransactionTestCase):
+    ## Messages are published by the on commit hooks of the connection,
+    ## which a `TestCase` never runs
+
+    def tearDown(self):
+        events.set_event_bus(None)
+
+    def test_publish(self):
+        bus = InProcessEventBus()
+        events.set_event_bus(bus)
+        with bus.subscribe(['a']) as subscription:
+            ## Not in a transaction, so published immediately
+            events.publish_after_commit('a', '1')
+            self.assertEqual(subscription.wait(0), [('a', '1')])
+
+    def test_publish_in_background(self):
+        server = EventBusServer('127.0.0.1', 0)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        bus = RedisEventBus(*server.address)
+        events.set_event_bus(bus)
+        try:
+            with bus.subscribe(['a']) as subscription:
+                events.publish_after_commit('a', '1')
+                self.assertEqual(subscription.wait(5), [('a', '1')])
+        finally:
+            bus.close()
+            server.shutdown()
+            thread.join()
+
+    def test_publish_failure(self):
+        server = EventBusServer('127.0.0.1', 0)
+        address = server.address
+        server.socket.close()
+        events.set_event_bus(RedisEventBus(*address))
+        publisher = BackgroundPublisher()
+        with self.assertLogs('common.events', 'WARNING'):
+            publisher.put('a', '1')
+            publisher.join()
+
+    def test_queue_full(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        class BlockingEventBus(events.EventBus):
+            def publish(self, channel, message):
+                started.set()
+                release.wait(5)
+        events.set_event_bus(BlockingEventBus())
+        publisher = BackgroundPublisher(max_queue=1)
+        publisher.put('a', '1')
+        started.wait(5)
+        publisher.put('a', '2')
+        ## The publisher never blocks, the message is dropped
+        with self.assertLogs('common.events', 'WARNING'):
+            publisher.put('a', '3')
+        release.set()
+        publisher.join()
@@ -0,0 +1,236 @@
+import datetime
+from fractions import Fraction
+import os
+import tempfile
+
+from django.test import TestCase
+
+from ..currency import MoneyAmount, MoneyArray, CurrencyException
+from .. import exchange
+from ..exchange import (
+    RateMatrix, ExchangeRates, DictRateSource, JSONRateSource, CSVRateSource,
+    RateHistory, ListRateHistorySource, CSVRateHistorySource
+)
+
+RATES = {'AUD': '1.25', 'EUR': '0.8', 'JPY': '120'}
+
+
+class CountingRateSource(DictRateSource):
+    def __init__(self, base_code, rates):
+        super(CountingRateSource, self).__init__(base_code, rates)
+        self.num_loads = 0
+        self.failing = False
+
+    def load(self):
+        self.num_loads += 1
+        if self.failing:
+            raise OSError('Rates unavailable')
+        return super(CountingRateSource, self).load()
+
+
+class RateMatrixTest(TestCase):
+    def setUp(self):
+        self.matrix = RateMatrix('USD', RATES)
+
+    def test_rate(self):
+        self.assertEqual(self.matrix.rate('USD', 'AUD'), Fraction(5, 4))
+        ## Triangulated through USD
+        self.assertEqual(self.matrix.rate('AUD', 'EUR'), Fraction(16, 25))
+
+    def test_convert(self):
+        amount = MoneyAmount('USD', 400)
+        self.assertEqual(self.matrix.convert(amount, 'AUD'), MoneyAmount('AUD', 500))
+        self.assertEqual(self.matrix.convert(amount, 'JPY'), MoneyAmount('JPY', 480))
+        self.assertEqual(self.matrix.convert(MoneyAmount('JPY', 1), 'USD'),
+                         MoneyAmount('USD', 1))
+        with self.assertRaises(CurrencyException):
+            self.matrix.convert(amount, 'NZD')
+
+    def test_convert_many(self):
+        amounts = [MoneyAmount('USD', 400), MoneyAmount('AUD', 500), MoneyAmount('EUR', 80)]
+        converted = self.matrix.convert_many(amounts, 'USD')
+        self.assertIsInstance(converted, MoneyArray)
+        self.assertEqual(converted.to_amounts(), [
+            MoneyAmount('USD', 400), MoneyAmount('USD', 400), MoneyAmount('USD', 100)
+        ])
+
+    def test_sort_key(self):
+        amounts = [MoneyAmount('USD', 400), MoneyAmount('AUD', 400), MoneyAmount('EUR', 400)]
+        self.assertEqual(sorted(amounts, key=self.matrix.sort_key('USD')), [
+            MoneyAmount('AUD', 400), MoneyAmount('USD', 400), MoneyAmount('EUR', 400)
+        ])
+
+    def test_total(self):
+        amounts = [MoneyAmount('USD', 400), MoneyAmount('AUD', 500), MoneyAmount('EUR', 80)]
+        self.assertEqual(self.matrix.total(amounts, 'AUD'), MoneyAmount('AUD', 1125))
+
+
+class UnknownCurrencyTest(TestCase):
+    def test_unknown_codes_skipped(self):
+        rates = dict(RATES, BTC='0.002', XYZ='3')
+        matrix = RateMatrix('USD', rates)
+        self.assertEqual(matrix.rate('USD', 'AUD'), Fraction(5, 4))
+        with self.assertRaises(CurrencyException):
+            matrix.rate('USD', 'XYZ')
+
+    def test_unknown_codes_skipped_in_history(self):
+        history = RateHistory('USD', HISTORY + [
+            (datetime.date(2014, 1, 1), 'BTC', '0.002'),
+        ])
+        self.assertEqual(
+            history.convert(MoneyAmount('USD', 100), 'AUD',
+                            datetime.date(2014, 1, 15)),
+            MoneyAmount('AUD', 125))
+
+    def test_unknown_base(self):
+        with self.assertRaises(CurrencyException):
+            RateMatrix('XYZ', RATES)
+
+
+class ExchangeRatesTest(TestCase):
+    def test_ttl(self):
+        source = CountingRateSource('USD', RATES)
+        rates = ExchangeRates(source, ttl=60)
+        self.assertIs(rates.table, rates.table)
+        self.assertEqual(source.num_loads, 1)
+
+        rates = ExchangeRates(source, ttl=0)
+        rates.table
+        rates.table
+        self.assertEqual(source.num_loads, 3)
+
+    def test_failed_load_cached(self):
+        source = CountingRateSource('USD', RATES)
+        source.failing = True
+        rates = ExchangeRates(source, ttl=60)
+        for _ in range(3):
+            with self.assertRaises(CurrencyException):
+                rates.table
+        self.assertEqual(source.num_loads, 1)
+        rates.invalidate()
+        source.failing = False
+        self.assertEqual(rates.table.base_code, 'USD')
+        self.assertEqual(source.num_loads, 2)
+
+    def test_failed_reload_uses_previous_rates(self):
+        source = CountingRateSource('USD', RATES)
+        rates = ExchangeRates(source, ttl=0)
+        table = rates.table
+        source.failing = True
+        self.assertIs(rates.table, table)
+
+    def test_malformed_rate(self):
+        for rate in ['abc', 'inf', '']:
+            rates = ExchangeRates(DictRateSource('USD', {'AUD': rate}))
+            with self.assertRaises(CurrencyException):
+                rates.table
+
+    def test_file_sources(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            json_path = os.path.join(tmpdir, 'rates.json')
+            with open(json_path, 'w') as f:
+                f.write('{"base": "USD", "rates": {"AUD": 1.25}}')
+            csv_path = os.path.join(tmpdir, 'rates.csv')
+            with open(csv_path, 'w') as f:
+                f.write('currency,rate\nAUD,1.25\n')
+
+            for source in (JSONRateSource(json_path), CSVRateSource(csv_path, 'USD')):
+                matrix = RateMatrix(*source.load())
+                self.assertEqual(matrix.rate('USD', 'AUD'), Fraction(5, 4))
+
+    def test_missing_file(self):
+        rates = ExchangeRates(JSONRateSource('/nonexistent/rates.json'))
+        with self.assertRaises(CurrencyException):
+            rates.table
+
+
+HISTORY = [
+    (datetime.date(2014, 1, 1), 'AUD', '1.25'),
+    (datetime.date(2014, 3, 1), 'AUD', '1.5'),
+    (datetime.date(2014, 2, 1), 'AUD', '1.4'),
+    (datetime.date(2014, 1, 1), 'JPY', '100'),
+    (datetime.date(2014, 2, 1), 'JPY', '120'),
+]
+
+
+class RateHistoryTest(TestCase):
+    def setUp(self):
+        self.history = RateHistory('USD', HISTORY)
+
+    def test_convert(self):
+        amount = MoneyAmount('USD', 400)
+        convert = self.history.convert
+        self.assertEqual(convert(amount, 'AUD', datetime.date(2014, 1, 1)),
+                         MoneyAmount('AUD', 500))
+        ## Uses the most recent rate on or before the date
+        self.assertEqual(convert(amount, 'AUD', datetime.date(2014, 2, 20)),
+                         MoneyAmount('AUD', 560))
+        self.assertEqual(convert(amount, 'AUD', datetime.date(2015, 1, 1)),
+                         MoneyAmount('AUD', 600))
+        ## Triangulated through USD
+        self.assertEqual(convert(MoneyAmount('AUD', 140), 'JPY', datetime.date(2014, 2, 1)),
+                         MoneyAmount('JPY', 120))
+        with self.assertRaises(CurrencyException):
+            convert(amount, 'AUD', datetime.date(2013, 12, 31))
+        with self.assertRaises(CurrencyException):
+            convert(amount, 'EUR', datetime.date(2014, 1, 1))
+
+    def test_convert_many(self):
+        amounts = [MoneyAmount('USD', 400), MoneyAmount('AUD', 500), MoneyAmount('AUD', 500)]
+        dates = [datetime.date(2014, 1, 1), datetime.date(2014, 1, 1),
+                 datetime.date(2014, 3, 1)]
+        converted = self.history.convert_many(amounts, dates, 'USD')
+        self.assertEqual(converted.to_amounts(), [
+            MoneyAmount('USD', 400), MoneyAmount('USD', 400), MoneyAmount('USD', 333)
+        ])
+        with self.assertRaises(ValueError):
+            self.history.convert_many(amounts, dates[:2], 'USD')
+
+    def test_precise_rates(self):
+        ## More digits than fit in the rate columns are rounded
+        history = RateHistory('USD', [
+            (datetime.date(2020, 1, 1), 'EUR', '0.8912345678901234567891'),
+            (datetime.date(2020, 1, 1), 'JPY', '108.12345678901234567891'),
+        ])
+        self.assertEqual(
+            history.convert(MoneyAmount('USD', 1000000), 'EUR',
+                            datetime.date(2020, 1, 1)),
+            MoneyAmount('EUR', 891235))
+        self.assertEqual(
+            history.convert(MoneyAmount('USD', 1000000), 'JPY',
+                            datetime.date(2020, 1, 1)),
+            MoneyAmount('JPY', 1081235))
+        for rate in ['1' + '0' * 20, '0.' + '0' * 30 + '1']:
+            with self.assertRaises(CurrencyException):
+                RateHistory('USD', [(datetime.date(2020, 1, 1), 'EUR', rate)])
+
+    def test_csv_source(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            csv_path = os.path.join(tmpdir, 'history.csv')
+            with open(csv_path, 'w') as f:
+                f.write('date,currency,rate\n2014-01-01,AUD,1.25\n')
+            history = RateHistory(*CSVRateHistorySource(csv_path, 'USD').load())
+            self.assertEqual(
+                history.convert(MoneyAmount('USD', 400), 'AUD', datetime.date(2014, 1, 2)),
+                MoneyAmount('AUD', 500))
+
+
+class ConvertToTest(TestCase):
+    def setUp(self):
+        exchange.set_rate_source(DictRateSource('USD', RATES))
+        exchange.set_rate_history_source(ListRateHistorySource('USD', HISTORY))
+
+    def tearDown(self):
+        exchange.set_rate_source(None)
+        exchange.set_rate_history_source(None)
+
+    def test_as_of(self):
+        amount = MoneyAmount('USD', 400)
+        self.assertEqual(amount.convert_to('AUD', as_of=datetime.date(2014, 3, 1)),
+                         MoneyAmount('AUD', 600))
+
+    def test_mixed_currency_arithmetic(self):
+        amount = MoneyAmount('USD', 400)
+        self.assertEqual(amount.convert_to('AUD'), MoneyAmount('AUD', 500))
+        self.assertEqual(amount + MoneyAmount('AUD', 500), MoneyAmount('USD', 800))
+        self.assertTrue(MoneyAmount('AUD', 400) < amount)
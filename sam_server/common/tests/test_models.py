@@ -0,0 +1,34 @@
+import datetime
+import uuid
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import decode_position_token, encode_position_token, keyset_page
+
+
+class PositionTokenTest(TestCase):
+
+    def test_round_trip(self):
+        timestamp = datetime.datetime(
+            2015, 2, 6, 4, 50, 12, 345678, tzinfo=timezone.utc)
+        pk = uuid.uuid4()
+        token = encode_position_token(timestamp, pk)
+        self.assertNotIn('=', token)
+        self.assertEqual(decode_position_token(token), (timestamp, pk))
+
+    def test_naive_timestamp(self):
+        timestamp = datetime.datetime(2015, 2, 6, 4, 50, 12)
+        pk = uuid.uuid4()
+        decoded, _ = decode_position_token(encode_position_token(timestamp, pk))
+        self.assertEqual(decoded, timezone.make_aware(timestamp, timezone.utc))
+
+    def test_invalid_token(self):
+        for token in ['', 'abc', '!!!!', encode_position_token(
+                datetime.datetime(2015, 1, 1), uuid.uuid4())[:-3]]:
+            with self.assertRaises(ValueError):
+                decode_position_token(token)
+
+    def test_keyset_page_columns(self):
+        with self.assertRaises(ValueError):
+            keyset_page(None, ('created',), ('id', 'name'), 10)
@@ -1,6 +1,23 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from parsers.exceptions import ParseError
+from .field_selector import Selector, FieldListSelector
 
-from django.http import JsonResponse
-from .field_selector import Selector
+## The number of list items encoded in each chunk of a streaming response
+STREAM_CHUNK_SIZE = 100
+
+
+def request_selector(request):
+    """
+    Parses the selector 'fields' out of the request's query set.
+    Returns `None` if the request has no 'fields' parameter.
+
+    Raises a `ParseError` if the selector is invalid.
+    """
+    fields = request.GET.get('fields', None)
+    if fields is None:
+        return None
+    return Selector.parse(fields)
 
 
 def partial_json_response(request, resource):
@@ -9,8 +26,121 @@ def partial_json_response(request, resource):
     and returns the partial response which results from selecting
     said fields from the provided resource
     """
-    fields = request.GET.get('fields', None)
-    if fields is not None:
-        selector = Selector.parse(fields)
-        resource = selector.select(resource)
+    selector = request_selector(request)
+    if selector is not None:
+        resource = selector.compile()(resource)
     return JsonResponse(resource)
+
+
+def partial_resource_response(request, resource, value):
+    """
+    Serializes the value using the given resource, only resolving
+    the fields selected by the 'fields' selector in the request's
+    query set.
+
+    If the selector is invalid for the resource, a 400 response
+    is returned.
+    """
+    try:
+        selector = request_selector(request)
+        if selector is not None:
+            json_value = resource.to_json_selected(value, selector)
+        else:
+            json_value = resource.to_json(value)
+    except (ParseError, ValueError) as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(json_value)
+
+
+def streaming_json_response(request, resource, list_field, items):
+    """
+    Returns a response which streams the json encoding of `resource`,
+    with the (already serialized) `items` written incrementally as the
+    value of `list_field`.
+
+    `items` can be any iterable (eg. a generator which serializes rows
+    as they are fetched from the database), so the full list is never
+    held in memory.
+
+    As with `partial_json_response`, the 'fields' selector is parsed
+    out of the request's query set. It is applied to the resource
+    up front, and to each of the items as they are streamed.
+
+    If `items` is callable, it is called with the selector of the list
+    items (or `None` if all fields are selected) and should return
+    the iterable of selected items. This allows the items to be
+    serialized with `ModelResource.iter_json_many`, so that unselected
+    fields are never resolved.
+    """
+    resource = dict(resource)
+    resource.pop(list_field, None)
+
+    try:
+        selector = request_selector(request)
+    except ParseError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    resource_selector, include_items, item_selector = \
+        split_list_selector(selector, list_field)
+    if resource_selector is not None:
+        resource = resource_selector.select(resource)
+
+    if not include_items:
+        items = ()
+    elif callable(items):
+        try:
+            items = items(item_selector)
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+    elif item_selector is not None:
+        items = map(item_selector.compile(), items)
+
+    return StreamingHttpResponse(
+        _iter_json_chunks(resource, list_field, items, include_items),
+        content_type='application/json'
+    )
+
+
+def split_list_selector(selector, list_field):
+    """
+    Splits the selector of a resource into the selector of the fields
+    of the resource other than `list_field`, and the selector of the
+    items of `list_field`.
+
+    Returns a tuple (resource_selector, include_items, item_selector).
+    The resource selector is `None` if all fields are selected, and the
+    item selector is `None` if all fields of the items are selected.
+    """
+    if selector is None:
+        return (None, True, None)
+    resource_fields = []
+    include_items = False
+    item_selector = None
+    for field in selector.fields:
+        if field.field == list_field:
+            include_items = True
+            item_selector = field.subselector
+        else:
+            resource_fields.append(field)
+    return (FieldListSelector(resource_fields), include_items, item_selector)
+
+
+def _iter_json_chunks(resource, list_field, items, include_items):
+    encode = DjangoJSONEncoder().encode
+    members = ['{0}: {1}'.format(encode(k), encode(v))
+               for k, v in resource.items()]
+    if not include_items:
+        yield '{' + ', '.join(members) + '}'
+        return
+    members.append('{0}: ['.format(encode(list_field)))
+    yield '{' + ', '.join(members)
+
+    chunk = []
+    separator = ''
+    for item in items:
+        chunk.append(separator + encode(item))
+        separator = ', '
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            yield ''.join(chunk)
+            chunk = []
+    chunk.append(']}')
+    yield ''.join(chunk)
@@ -26,23 +26,77 @@ p_field_list := '(' field_list ')'
 field_specifier = field (('.' field) | p_field_list)?
 
 selector := field | field_list
+
+(see `SelectorParser.GRAMMAR` for the declaration of the LL(1) grammar
+which is used to parse selectors).
+
+Selectors are immutable, and are held in a canonical form, where the
+fields of a field list are sorted by name and duplicate fields are removed
+(the last selection of a field takes precedence, as it would when selecting).
+The string representation of a selector is its canonical form, which can
+be used as a cache key for the selected response.
 """
-from parsers import lexer, parser
+from functools import lru_cache
+
+from parsers import grammar, lexer
+
+## The maximum number of parsed selectors cached by the process
+SELECTOR_CACHE_SIZE = 512
 
 
 class Selector(object):
+    __slots__ = ('_hash', '_compiled')
 
     @classmethod
     def parse(cls, fields):
         """
         Parses a selector from the given `fields` specifier.
+
+        Parsed selectors are cached, so equivalent specifiers
+        (eg. 'a,b' and 'b, a') return the same selector instance.
+        """
+        return _parse_selector(fields)
+
+    @property
+    def canonical(self):
+        """
+        The canonical string form of the selector
         """
-        parser = SelectorParser()
-        return parser.run(fields)
+        return str(self)
 
     def select(self, json):
         raise NotImplementedError('Select')
 
+    def compile(self):
+        """
+        Returns a function which is equivalent to `select`, specialized to
+        the fields of the selector. The function is compiled once, the
+        first time it is requested, and cached on the selector.
+        """
+        if self._compiled is None:
+            object.__setattr__(self, '_compiled', _compile_selector(self))
+        return self._compiled
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Selectors are immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('Selectors are immutable')
+
+    def __hash__(self):
+        return self._hash
+
+
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def _parse_selector(fields):
+    selector = SelectorParser().run(fields)
+    return _canonical_selector(str(selector))
+
+
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def _canonical_selector(canonical_fields):
+    return SelectorParser().run(canonical_fields)
+
 
 class FieldSelector(Selector):
     """
@@ -50,9 +104,14 @@ class FieldSelector(Selector):
     If applied to a dict, returns the value associated with the field in the dict
     If applied to a list, selects the field from each resource in the list.
     """
+    __slots__ = ('field', 'subselector')
+
     def __init__(self, field, subselector=None):
-        self.subselector = subselector
-        self.field = field
+        _set = object.__setattr__
+        _set(self, 'field', field)
+        _set(self, 'subselector', subselector)
+        _set(self, '_hash', 37 * hash(field) + hash(subselector))
+        _set(self, '_compiled', None)
 
     def select(self, json):
         if isinstance(json, dict):
@@ -77,10 +136,7 @@ class FieldSelector(Selector):
                 other.field == self.field and
                 other.subselector == self.subselector)
 
-    def __hash__(self):
-        h = hash(self.field)
-        h = 37 * h + hash(self.subselector)
-        return h
+    __hash__ = Selector.__hash__
 
     def __repr__(self):
         return 'FieldSelector: {0}'.format(str(self))
@@ -97,9 +153,23 @@ class FieldSelector(Selector):
 class FieldListSelector(Selector):
     """
     A FieldList selector specifies a selection of fields from
+    a json resource. The fields are sorted by name, and only the
+    last selector of each field is retained.
     """
+    __slots__ = ('fields',)
+
     def __init__(self, fields=None):
-        self.fields = list(fields or [])
+        fields_by_name = dict()
+        for field in fields or ():
+            fields_by_name[field.field] = field
+        fields = tuple(fields_by_name[name] for name in sorted(fields_by_name))
+        h = 0
+        for field in fields:
+            h = 41 * h + hash(field)
+        _set = object.__setattr__
+        _set(self, 'fields', fields)
+        _set(self, '_hash', h)
+        _set(self, '_compiled', None)
 
     def select(self, json):
         if isinstance(json, dict):
@@ -123,11 +193,7 @@ class FieldListSelector(Selector):
         return (isinstance(other, FieldListSelector) and
                 other.fields == self.fields)
 
-    def __hash__(self):
-        h = 0
-        for field in self.fields:
-            h = 41 * h + hash(field)
-        return h
+    __hash__ = Selector.__hash__
 
     def __repr__(self):
         return 'FieldListSelector: {0}'.format(str(self))
@@ -136,7 +202,77 @@ class FieldListSelector(Selector):
         return ', '.join(map(str, self.fields))
 
 
-class SelectorParser(parser.Parser):
+_COMPILED_SELECT_RESOURCE = """
+def select_resource(resource):
+    return {{{0}}}
+"""
+
+_COMPILED_FIELD_SELECT = """
+def select(json):
+    if isinstance(json, dict):
+        return select_resource(json)
+    if hasattr(json, '__iter__'):
+        return [select_resource(resource) for resource in json]
+"""
+
+_COMPILED_FIELD_LIST_SELECT = """
+def select(json):
+    if isinstance(json, dict):
+        return select_resource(json)
+    elif isinstance(json, list):
+        return [select_resource(resource) for resource in json]
+    else:
+        raise ValueError('Invalid json ({0})'.format(json))
+"""
+
+
+def _compile_selector(selector):
+    """
+    Generates the source of a `select` function for the selector, which
+    builds the selected resource as a single dict display, with a direct
+    key lookup for each of the selected fields.
+    Subselectors are compiled in turn and called by the generated function.
+    """
+    if isinstance(selector, FieldSelector):
+        fields = (selector,)
+        select_source = _COMPILED_FIELD_SELECT
+    else:
+        fields = selector.fields
+        select_source = _COMPILED_FIELD_LIST_SELECT
+
+    namespace = dict()
+    entries = []
+    for i, field in enumerate(fields):
+        ## Field names are restricted to [a-zA-Z0-9_]+ by the parser,
+        ## but quote the name in case the selector was constructed directly
+        key = repr(field.field)
+        if field.subselector is None:
+            entries.append('{0}: resource.get({0})'.format(key))
+        else:
+            subselect = 'subselect_{0}'.format(i)
+            namespace[subselect] = field.subselector.compile()
+            entries.append(
+                '{0}: {1}(resource[{0}]) if {0} in resource else None'
+                .format(key, subselect))
+    source = _COMPILED_SELECT_RESOURCE.format(', '.join(entries))
+    exec(source + select_source, namespace)
+    return namespace['select']
+
+
+def _prepend_field(field, fields):
+    ## The fields are collected in reverse, rather than copying the
+    ## list for each field
+    if fields is None:
+        return [field]
+    fields.append(field)
+    return fields
+
+
+def _field_list_selector(fields):
+    return FieldListSelector(reversed(fields) if fields else None)
+
+
+class SelectorParser(object):
     LEXER_TOKENS = [
         ('L_PARENS', lexer.LiteralToken('(')),
         ('R_PARENS', lexer.LiteralToken(')')),
@@ -145,63 +281,31 @@ class SelectorParser(parser.Parser):
         ('NAME', lexer.RegexToken(r'[a-zA-Z0-9_]+')),
     ]
 
-    def __init__(self):
-        lex = lexer.Lexer(self.LEXER_TOKENS)
-        super(SelectorParser, self).__init__(lex)
-
-    def begin(self):
-        return self.parse_field_list()
-
-    def parse_field(self):
-        token = self.move_next()
-        if not token or token.name != 'NAME':
-            raise ParseError(self.position, 'Expected a field name')
-        field_name = token.string
-
-        token = self.move_next(lookahead=True)
-        if not token or token.name in {'R_PARENS', 'COMMA'}:
-            return FieldSelector(field_name)
-        elif token.name == 'PERIOD':
-            self.move_next()
-            subselector = self.parse_field()
-        elif token.name == 'L_PARENS':
-            subselector = self.parse_parens_field_list()
-        else:
-            raise ParseError(self.position,
-                             'Unexpected token in stream ({0})'.format(token))
-        return FieldSelector(field_name, subselector)
-
-    def parse_field_list(self):
-        field_list = []
-        token = self.move_next(lookahead=True)
-
-        while token and token.name != 'R_PARENS':
-            if token.name == 'NAME':
-                field_list.append(self.parse_field())
-            else:
-                raise ParseError('Expected a field selector')
-            token = self.move_next(lookahead=True)
-            if token is None or token.name == 'R_PARENS':
-                pass
-            elif token.name == 'COMMA':
-                self.move_next()
-            else:
-                raise ParseError(self.position,
-                                 'Expected comma or end of selector list')
-            token = self.move_next(lookahead=True)
-        return FieldListSelector(field_list)
-
-    def parse_parens_field_list(self):
-        """ A parenthesised field list """
-        token = self.move_next()
-        if token is None or token.name != 'L_PARENS':
-            raise ParseError(self.position,
-                             'Expected start of selector list')
-        field_list = self.parse_field_list()
-        token = self.move_next()
-        if token is None or token.name != 'R_PARENS':
-            raise ParseError(self.position,
-                             'Expected end of selector list')
-        return field_list
-
-
+    GRAMMAR = grammar.Grammar(
+        tokens=LEXER_TOKENS,
+        productions=[
+            ('selector', 'fields',
+                _field_list_selector),
+            ('fields', 'field more_fields',
+                _prepend_field),
+            ('fields', '',
+                None),
+            ('more_fields', 'COMMA fields',
+                lambda comma, fields: fields),
+            ('more_fields', '',
+                None),
+            ('field', 'NAME subselector',
+                FieldSelector),
+            ('subselector', 'PERIOD field',
+                lambda period, field: field),
+            ('subselector', 'L_PARENS fields R_PARENS',
+                lambda l_parens, fields, r_parens: _field_list_selector(fields)),
+            ('subselector', '',
+                None),
+        ],
+        start='selector'
+    )
+    LEXER = GRAMMAR.lexer
+
+    def run(self, fields):
+        return self.GRAMMAR.parse(fields)
@@ -0,0 +1,391 @@
+"""
+A query language for filtering and ordering lists of resources.
+
+In the query portion of the url, a 'filter' parameter restricts the
+listed resources to those which match all of the terms of the filter,
+and an 'order_by' parameter orders the listed resources, eg.
+
+    filter=vendor:"Sony" price>100.00 AUD date_purchased>=2014-01-01
+    order_by=-date_purchased,name
+
+The syntax of a filter is as follows:
+
+term := field operator value
+
+operator := ':' | '=' | '!=' | '<' | '<=' | '>' | '>='
+
+value := '"' (char | '\\' char)* '"' | word+
+
+filter := term*
+
+where a word is any run of characters other than whitespace and '"'.
+The words of an unquoted value are joined by a single space, so
+`price>100.00 AUD` compares the price with '100.00 AUD'.
+':' and '=' are equivalent.
+
+An ordering is a comma separated list of fields, each optionally prefixed
+by '-' to order by the field in descending order.
+
+Filters and orderings are immutable and are held in a canonical form
+(the terms of a filter are sorted and each value is quoted). As with
+selectors, the string representation of a filter or ordering is its
+canonical form, and parsed filters, orderings and their compiled queries
+are cached by canonical form.
+
+Filters and orderings are validated against the fields of a model
+resource and compiled into the arguments of `QuerySet.filter` and
+`QuerySet.order_by` by `compile_filter` and `compile_ordering`.
+"""
+from functools import lru_cache
+import re
+
+from django.db.models import Q
+
+from parsers import grammar, lexer
+
+## The maximum number of parsed filters (and orderings, and compiled
+## queries of each) cached by the process
+QUERY_CACHE_SIZE = 512
+
+## Maps the operators of a term to the lookups of the compiled query,
+## and whether the lookup is negated
+OPERATORS = {
+    ':': ('exact', False),
+    '!=': ('exact', True),
+    '<': ('lt', False),
+    '<=': ('lte', False),
+    '>': ('gt', False),
+    '>=': ('gte', False),
+}
+
+_FIELD_OPERATOR = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(!=|<=|>=|:|=|<|>)')
+
+
+def _quote(value):
+    return '"{0}"'.format(value.replace('\\', '\\\\').replace('"', '\\"'))
+
+
+def _unquote(string):
+    return re.sub(r'\\(.)', r'\1', string[1:-1])
+
+
+class FilterTerm(object):
+    """
+    A single comparison of the value of a field of a resource
+    """
+    __slots__ = ('field', 'operator', 'value')
+
+    def __init__(self, field, operator, value):
+        if operator == '=':
+            operator = ':'
+        if operator not in OPERATORS:
+            raise ValueError('Invalid operator: {0}'.format(operator))
+        _set = object.__setattr__
+        _set(self, 'field', field)
+        _set(self, 'operator', operator)
+        _set(self, 'value', value)
+
+    @property
+    def _key(self):
+        return (self.field, self.operator, self.value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Filter terms are immutable')
+
+    def __eq__(self, other):
+        return isinstance(other, FilterTerm) and other._key == self._key
+
+    def __lt__(self, other):
+        return self._key < other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __str__(self):
+        return '{0}{1}{2}'.format(self.field, self.operator, _quote(self.value))
+
+    def __repr__(self):
+        return 'FilterTerm: {0}'.format(self)
+
+
+class QueryFilter(object):
+    """
+    A conjunction of filter terms. The terms are sorted and duplicate
+    terms are removed.
+    """
+    __slots__ = ('terms',)
+
+    def __init__(self, terms=None):
+        object.__setattr__(self, 'terms', tuple(sorted(set(terms or ()))))
+
+    @classmethod
+    def parse(cls, string):
+        """
+        Parses a filter from the given string.
+
+        Parsed filters are cached, so equivalent strings (eg. 'a:1 b:2'
+        and 'b:"2" a=1') return the same filter instance.
+
+        Raises a `ParseError` if the filter is invalid.
+        """
+        return _parse_filter(string)
+
+    @property
+    def canonical(self):
+        return str(self)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Filters are immutable')
+
+    def __bool__(self):
+        return bool(self.terms)
+
+    def __eq__(self, other):
+        return isinstance(other, QueryFilter) and other.terms == self.terms
+
+    def __hash__(self):
+        return hash(self.terms)
+
+    def __str__(self):
+        return ' '.join(map(str, self.terms))
+
+    def __repr__(self):
+        return 'QueryFilter: {0}'.format(self)
+
+
+class Ordering(object):
+    """
+    A sequence of (field, descending) keys. Only the first key
+    of each field is retained.
+    """
+    __slots__ = ('keys',)
+
+    def __init__(self, keys=None):
+        fields = set()
+        unique_keys = []
+        for field, descending in keys or ():
+            if field not in fields:
+                fields.add(field)
+                unique_keys.append((field, bool(descending)))
+        object.__setattr__(self, 'keys', tuple(unique_keys))
+
+    @classmethod
+    def parse(cls, string):
+        """
+        Parses an ordering from the given string.
+        Parsed orderings are cached by canonical form.
+
+        Raises a `ParseError` if the ordering is invalid.
+        """
+        return _parse_ordering(string)
+
+    @property
+    def canonical(self):
+        return str(self)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Orderings are immutable')
+
+    def __bool__(self):
+        return bool(self.keys)
+
+    def __eq__(self, other):
+        return isinstance(other, Ordering) and other.keys == self.keys
+
+    def __hash__(self):
+        return hash(self.keys)
+
+    def __str__(self):
+        return ','.join(('-' if descending else '') + field
+                        for field, descending in self.keys)
+
+    def __repr__(self):
+        return 'Ordering: {0}'.format(self)
+
+
+def _field_term(field_operator, value):
+    field, operator = _FIELD_OPERATOR.match(field_operator).groups()
+    return FilterTerm(field, operator, value)
+
+
+class FilterParser(object):
+    LEXER_TOKENS = [
+        ('FIELD', lexer.RegexToken(
+            r'[a-zA-Z_][a-zA-Z0-9_]*\s*(?:!=|<=|>=|:|=|<|>)')),
+        ('STRING', lexer.RegexToken(r'"(?:[^"\\]|\\.)*"')),
+        ('WORD', lexer.RegexToken(r'[^\s"]+')),
+    ]
+
+    GRAMMAR = grammar.Grammar(
+        tokens=LEXER_TOKENS,
+        productions=[
+            ('filter', 'terms',
+                lambda terms: QueryFilter(terms)),
+            ('terms', 'term terms',
+                lambda term, terms: [term] + terms),
+            ('terms', '',
+                lambda: []),
+            ('term', 'FIELD value',
+                _field_term),
+            ('value', 'STRING',
+                _unquote),
+            ('value', 'WORD words',
+                lambda word, words: ' '.join([word] + words)),
+            ('words', 'WORD words',
+                lambda word, words: [word] + words),
+            ('words', '',
+                lambda: []),
+        ],
+        start='filter'
+    )
+
+    def run(self, string):
+        return self.GRAMMAR.parse(string)
+
+
+class OrderingParser(object):
+    LEXER_TOKENS = [
+        ('MINUS', lexer.LiteralToken('-')),
+        ('COMMA', lexer.LiteralToken(',')),
+        ('NAME', lexer.RegexToken(r'[a-zA-Z_][a-zA-Z0-9_]*')),
+    ]
+
+    GRAMMAR = grammar.Grammar(
+        tokens=LEXER_TOKENS,
+        productions=[
+            ('ordering', 'keys',
+                lambda keys: Ordering(keys)),
+            ('keys', 'key more_keys',
+                lambda key, keys: [key] + keys),
+            ('keys', '',
+                lambda: []),
+            ('more_keys', 'COMMA keys',
+                lambda comma, keys: keys),
+            ('more_keys', '',
+                lambda: []),
+            ('key', 'MINUS NAME',
+                lambda minus, name: (name, True)),
+            ('key', 'NAME',
+                lambda name: (name, False)),
+        ],
+        start='ordering'
+    )
+
+    def run(self, string):
+        return self.GRAMMAR.parse(string)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _parse_filter(string):
+    query_filter = FilterParser().run(string)
+    return _canonical_filter(str(query_filter))
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _canonical_filter(canonical_string):
+    return FilterParser().run(canonical_string)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _parse_ordering(string):
+    return _canonical_ordering(str(OrderingParser().run(string)))
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _canonical_ordering(canonical_string):
+    return OrderingParser().run(canonical_string)
+
+
+def _row_field(resource_cls, field_name, action):
+    """
+    The row plan of the named field of the resource, for fields which are
+    read directly from a single column.
+
+    Raises a `ValueError` if the resource has no such field, or if the
+    field is not read directly from a single column.
+    """
+    if field_name not in resource_cls._resource_fields:
+        raise ValueError(
+            'Invalid field for {0} resource: {1}'
+            .format(resource_cls.KIND, field_name))
+    for field in resource_cls._row_plan:
+        if field.name == field_name:
+            break
+    else:
+        field = None
+    if (field is None or field.getter is not None or
+            len(field.columns) != 1 or field.resource.HAS_SUBFIELDS):
+        raise ValueError(
+            'Cannot {0} {1} resources by {2}'
+            .format(action, resource_cls.KIND, field_name))
+    return field
+
+
+def compile_filter(resource_cls, query_filter):
+    """
+    Compiles the filter into a `Q` object which selects the rows of the
+    model of the resource matched by all of the terms of the filter.
+
+    A term compares the column of the field (which must be read directly
+    from a single column) with the value of the term, as converted by the
+    `parse_filter_value` method of the field's resource. If the resource
+    class declares a 'filter_(field_name)' method, it is called with the
+    lookup ('exact', 'lt', 'lte', 'gt' or 'gte') and the value of the term
+    and should return the `Q` object of the term instead.
+
+    Compiled filters are cached, keyed by resource class and filter.
+    Raises a `ValueError` if the filter is invalid for the resource.
+    """
+    return _compile_filter(resource_cls, query_filter)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _compile_filter(resource_cls, query_filter):
+    resource = resource_cls()
+    q = Q()
+    for term in query_filter.terms:
+        lookup, negated = OPERATORS[term.operator]
+        filter_term = getattr(resource, 'filter_{0}'.format(term.field), None)
+        if filter_term is not None:
+            if term.field not in resource_cls._resource_fields:
+                raise ValueError(
+                    'Invalid field for {0} resource: {1}'
+                    .format(resource_cls.KIND, term.field))
+            term_q = filter_term(lookup, term.value)
+        else:
+            field = _row_field(resource_cls, term.field, 'filter')
+            value = field.resource.parse_filter_value(term.value)
+            term_q = Q(**{'{0}__{1}'.format(field.columns[0], lookup): value})
+        q &= ~term_q if negated else term_q
+    return q
+
+
+def compile_ordering(resource_cls, ordering):
+    """
+    Compiles the ordering into the arguments of `QuerySet.order_by`.
+
+    A field is ordered by the `order_columns` of its resource, if declared,
+    otherwise by its column (the field must be read directly from a single
+    column).
+
+    Raises a `ValueError` if the ordering is invalid for the resource.
+    """
+    return _compile_ordering(resource_cls, ordering)
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _compile_ordering(resource_cls, ordering):
+    order_by = []
+    ordered_columns = set()
+    for field_name, descending in ordering.keys:
+        field_resource = resource_cls._resource_fields.get(field_name)
+        if field_resource is not None and field_resource.order_columns:
+            columns = field_resource.order_columns
+        else:
+            columns = _row_field(resource_cls, field_name, 'order').columns
+        prefix = '-' if descending else ''
+        for column in columns:
+            if column not in ordered_columns:
+                ordered_columns.add(column)
+                order_by.append(prefix + column)
+    return tuple(order_by)
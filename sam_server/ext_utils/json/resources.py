@@ -1,5 +1,6 @@
-from datetime import datetime
+from datetime import date
 from enum import Enum
+from operator import itemgetter
 import uuid
 import tempfile
 import base64
@@ -7,12 +8,27 @@ import base64
 
 from dateutil.parser import parse as parse_date
 
+from .field_selector import FieldSelector
+
 _NONE_TYPE = type(None)
 
 
 class Resource(object):
-    def __init__(self, required=True):
+    ## Whether subfields of the resource can be selected by a field selector
+    HAS_SUBFIELDS = False
+
+    def __init__(self, required=True, columns=None, order_columns=None):
         self.required = required
+        ## The database columns the value of the resource is read from
+        ## when serializing rows (see `ModelResource.to_json_many`).
+        ## If `None`, the value is read from the column with the same
+        ## name as the resource field.
+        self.columns = None if columns is None else tuple(columns)
+        ## The database columns which resources are ordered by when
+        ## ordered by the field (see `query.compile_ordering`).
+        ## If `None`, resources are ordered by the column of the field.
+        self.order_columns = (None if order_columns is None
+                              else tuple(order_columns))
 
     def check_mandatory(self, value):
         if self.required and value is None:
@@ -27,6 +43,27 @@ class Resource(object):
         """
         raise NotImplementedError()
 
+    def parse_filter_value(self, string):
+        """
+        Convert the string value of a filter term to the python value
+        it is compared with (see `query.compile_filter`).
+        Raises a `ValueError` if the string is not a valid value.
+        """
+        try:
+            return self.to_python(string)
+        except TypeError as e:
+            raise ValueError(str(e))
+
+    def to_json_selected(self, value, selector):
+        """
+        Convert the value to json, selecting the fields of the
+        resulting json which are selected by the selector.
+        """
+        value = self.to_json(value)
+        if value is None:
+            return None
+        return selector.compile()(value)
+
     @property
     def discovery(self):
         """
@@ -79,14 +116,25 @@ class ObjectResource(_SimpleResource):
 class BoolResource(_SimpleResource):
     _TYPE = bool
 
+    def parse_filter_value(self, string):
+        if string.lower() in ('true', 'false'):
+            return string.lower() == 'true'
+        raise ValueError('Expected true or false: {0}'.format(string))
+
 
 class IntegerResource(_SimpleResource):
     _TYPE = int
 
+    def parse_filter_value(self, string):
+        return int(string)
+
 
 class FloatResource(_SimpleResource):
     _TYPE = float
 
+    def parse_filter_value(self, string):
+        return float(string)
+
 
 class StringResource(_SimpleResource):
     _TYPE = str
@@ -104,7 +152,8 @@ class DateTimeResource(Resource):
         self.check_mandatory(value)
         if value is None:
             return value
-        if not isinstance(value, datetime):
+        ## datetime is a subclass of date
+        if not isinstance(value, date):
             raise TypeError('Not a date or datetime object: {0}'.format(value))
         return value.isoformat()
 
@@ -151,6 +200,7 @@ class UUIDResource(Resource):
 
 
 class ListResource(Resource):
+    HAS_SUBFIELDS = True
 
     def __init__(self, item_resource=None, **kwargs):
         if item_resource is None:
@@ -170,12 +220,33 @@ class ListResource(Resource):
         value = list(value)
         return list(map(self.item_resource.to_json, value))
 
+    def iter_json(self, value):
+        """
+        As `to_json`, but lazily serializes the items one at a time
+        as the result is iterated.
+        """
+        self.check_mandatory(value)
+        if value is None:
+            return iter(())
+        return map(self.item_resource.to_json, value)
+
+    def to_json_selected(self, value, selector):
+        """
+        Selects the fields of each of the items of the list.
+        """
+        self.check_mandatory(value)
+        if value is None:
+            return []
+        return [self.item_resource.to_json_selected(item, selector)
+                for item in value]
+
 
 class DictResource(Resource):
     """
     Represents an arbitrary key value pair.
     The value is a specific resource type (which defaults to ObjectResource)
     """
+    HAS_SUBFIELDS = True
 
     def __init__(self, value_resource=None, **kwargs):
         self.value_resource = value_resource or ObjectResource()
@@ -274,12 +345,162 @@ class FileResource(Resource):
         return list(map(self._file_to_json, resource))
 
 
+class _FieldPlan(object):
+    """
+    The precompiled serialization step for a single field of a
+    model resource.
+
+    `getter` is the unbound custom getter declared on the resource
+    class (or None if the value is read directly off the model) and
+    `to_json` is the bound `to_json` method of the field `resource`.
+    If `skip_none` is set, the field is omitted from the serialized
+    resource when its value is `None`.
+    """
+    __slots__ = ('name', 'resource', 'getter', 'to_json', 'skip_none')
+
+    def __init__(self, name, resource, getter, skip_none):
+        self.name = name
+        self.resource = resource
+        self.getter = getter
+        self.to_json = resource.to_json
+        self.skip_none = skip_none
+
+
+def _compile_serialization_plan(resource_cls, resource_fields):
+    """
+    Resolves the getter and the serializer of each of the resource
+    fields once, when the resource class is created, rather than once
+    per field per serialized model.
+    """
+    plan = []
+    for field_name, field_resource in resource_fields.items():
+        getter = getattr(resource_cls, 'get_{0}'.format(field_name), None)
+        plan.append(_FieldPlan(
+            field_name,
+            field_resource,
+            getter,
+            ## A required field raises on a None value, so it will
+            ## never need to be omitted from the result.
+            skip_none=not field_resource.required
+        ))
+    return tuple(plan)
+
+
+class _RowFieldPlan(object):
+    """
+    The precompiled step for serializing a single field of a model
+    resource from a database row.
+
+    `columns` are the columns which hold the value of the field and
+    `getter` is the unbound 'get_(field_name)_from_columns' method
+    declared on the resource class, which is called with the value of
+    each column in turn. If there is no getter, the field has exactly
+    one column which holds the raw value of the field.
+    """
+    __slots__ = ('name', 'resource', 'columns', 'getter', 'to_json',
+                 'skip_none')
+
+    def __init__(self, name, resource, columns, getter, skip_none):
+        self.name = name
+        self.resource = resource
+        self.columns = columns
+        self.getter = getter
+        self.to_json = resource.to_json
+        self.skip_none = skip_none
+
+
+def _compile_row_plan(resource_cls, resource_fields):
+    """
+    Resolves the columns of each of the resource fields.
+
+    Returns a tuple `(plan, unmapped_fields)`, where `unmapped_fields`
+    are the fields which declare a custom model getter but neither
+    declare their columns nor a 'get_(field_name)_from_columns' method,
+    and so cannot be read from a row.
+    """
+    plan = []
+    unmapped_fields = []
+    for field_name, field_resource in resource_fields.items():
+        getter = getattr(
+            resource_cls, 'get_{0}_from_columns'.format(field_name), None)
+        columns = field_resource.columns
+        if columns is None:
+            if (getter is None and
+                    hasattr(resource_cls, 'get_{0}'.format(field_name))):
+                unmapped_fields.append(field_name)
+                continue
+            columns = (field_name,)
+        if getter is None and len(columns) != 1:
+            raise TypeError(
+                'Field \'{0}\' of {1} is read from multiple columns, so requires '
+                'a \'get_{0}_from_columns\' method'
+                .format(field_name, resource_cls.__name__))
+        plan.append(_RowFieldPlan(
+            field_name,
+            field_resource,
+            columns,
+            getter,
+            skip_none=not field_resource.required
+        ))
+    return tuple(plan), tuple(sorted(unmapped_fields))
+
+
+## The maximum number of selection plans cached on each resource class
+_MAX_SELECTION_PLANS = 256
+
+
+def _field_selectors(selector):
+    if isinstance(selector, FieldSelector):
+        return [selector]
+    return selector.fields
+
+
+def _compile_selection(resource_cls, plan, selector):
+    """
+    Resolves the fields of the plan which are selected by the selector.
+
+    Returns a tuple `(selected, select_kind)`, where `selected` is a tuple
+    of `(field_plan, subselector)` pairs and `select_kind` is `True` if
+    the selector selects the 'kind' of the resource.
+
+    Raises a `ValueError` if the selector selects a field which is not
+    declared on the resource, or selects subfields of a field which has
+    no subfields.
+    """
+    plan_fields = {field.name: field for field in plan}
+
+    selected = []
+    select_kind = False
+    for field_selector in _field_selectors(selector):
+        field_name = field_selector.field
+        subselector = field_selector.subselector
+        if field_name == 'kind' and subselector is None:
+            select_kind = True
+            continue
+        try:
+            field = plan_fields[field_name]
+        except KeyError:
+            raise ValueError(
+                'Invalid field for {0} resource: {1}'
+                .format(resource_cls.KIND, field_name))
+        if subselector is not None and not field.resource.HAS_SUBFIELDS:
+            raise ValueError(
+                'Field {0} of {1} resource has no subfields'
+                .format(field_name, resource_cls.KIND))
+        selected.append((field, subselector))
+    return tuple(selected), select_kind
+
+
 class _ModelResourceMeta(type):
     def __new__(cls, name, bases, attrs):
         new_cls = super().__new__(cls, name, bases, attrs)
 
         if name == 'ModelResource' and bases == (Resource, ):
             new_cls._resource_fields = {}
+            new_cls._serialization_plan = ()
+            new_cls._row_plan = ()
+            new_cls._unmapped_row_fields = ()
+            new_cls._selection_plans = {}
             return new_cls
 
         if not 'KIND' in attrs:
@@ -300,11 +521,19 @@ class _ModelResourceMeta(type):
         for base in resource_bases:
             resource_fields.update(base._resource_fields)
         new_cls._resource_fields = resource_fields
+        new_cls._serialization_plan = _compile_serialization_plan(
+            new_cls, resource_fields)
+        new_cls._row_plan, new_cls._unmapped_row_fields = _compile_row_plan(
+            new_cls, resource_fields)
+        ## Selection plans are compiled on demand and cached, keyed by
+        ## the plan ('model' or 'row') and the selector
+        new_cls._selection_plans = {}
 
         return new_cls
 
 
 class ModelResource(Resource, metaclass=_ModelResourceMeta):
+    HAS_SUBFIELDS = True
 
     def _check_resource_kind(self, resource):
         try:
@@ -338,13 +567,36 @@ class ModelResource(Resource, metaclass=_ModelResourceMeta):
             model_resource[key] = field_resource.to_python(value)
         return model_resource
 
-    def _resolve_field_value(self, field_name, model):
-        custom_getter_name = 'get_{0}'.format(field_name)
-        if hasattr(self, custom_getter_name):
-            return getattr(self, custom_getter_name)(model)
-        if hasattr(model, '__getitem__'):
-            return model[field_name]
-        return getattr(model, field_name)
+    @classmethod
+    def _selection(cls, plan_name, selector):
+        """
+        Returns a tuple `(steps, select_kind)`, where `steps` is a tuple of
+        `(field_plan, subselector, skip_none)` for each of the fields in the
+        named plan which are selected by the selector (or all fields in
+        the plan, if the selector is `None`).
+
+        Selections are cached on the class, keyed by plan and selector.
+        """
+        key = (plan_name, selector)
+        try:
+            return cls._selection_plans[key]
+        except KeyError:
+            pass
+        plan = getattr(cls, plan_name)
+        if selector is None:
+            steps = tuple((field, None, field.skip_none) for field in plan)
+            selection = (steps, True)
+        else:
+            selected, select_kind = _compile_selection(cls, plan, selector)
+            ## A selected field is always present in the selected resource,
+            ## even if its value is None
+            steps = tuple((field, subselector, False)
+                          for field, subselector in selected)
+            selection = (steps, select_kind)
+        if len(cls._selection_plans) >= _MAX_SELECTION_PLANS:
+            cls._selection_plans.clear()
+        cls._selection_plans[key] = selection
+        return selection
 
     def to_json(self, model):
         """
@@ -357,17 +609,158 @@ class ModelResource(Resource, metaclass=_ModelResourceMeta):
         - If the model delcares a '__getitem__' method, an item lookup will be
           made with the field name as argument
         - Otherwise, an attribute lookup will be performed on the model.
+
+        The getters are resolved once, when the resource class is created
+        (see `_compile_serialization_plan`).
+        """
+        return self.to_json_selected(model, None)
+
+    def to_json_selected(self, model, selector):
+        """
+        As `to_json`, but only the fields selected by the selector are
+        resolved and serialized. Nested resources are serialized using the
+        subselector of their field.
+
+        The result is the same as `selector.select(self.to_json(model))`,
+        except that a `ValueError` is raised if the selector selects
+        a field which is not declared on the resource.
         """
         self.check_mandatory(model)
         if model is None:
             return None
 
+        steps, select_kind = self._selection('_serialization_plan', selector)
+        is_mapping = hasattr(model, '__getitem__')
         resource = dict()
-        for field, field_resource in self._resource_fields.items():
-            raw_value = self._resolve_field_value(field, model)
-            field_value = field_resource.to_json(raw_value)
-            if field_value is not None:
-                resource[field] = field_value
-        resource['kind'] = self.KIND
+        for field, subselector, skip_none in steps:
+            if field.getter is not None:
+                raw_value = field.getter(self, model)
+            elif is_mapping:
+                raw_value = model[field.name]
+            else:
+                raw_value = getattr(model, field.name)
+            if subselector is None:
+                field_value = field.to_json(raw_value)
+            else:
+                field_value = field.resource.to_json_selected(
+                    raw_value, subselector)
+            if field_value is None and skip_none:
+                continue
+            resource[field.name] = field_value
+        if select_kind:
+            resource['kind'] = self.KIND
         return resource
 
+    @classmethod
+    def row_columns(cls, selector=None):
+        """
+        The names of all the database columns which are required to
+        serialize the resource from a row, in the order expected by
+        `to_json_many`, eg.
+
+            rows = queryset.values_list(*resource.row_columns())
+            resource.to_json_many(rows, columns=resource.row_columns())
+
+        If a selector is provided, only the columns which are required to
+        serialize the selected fields are returned, so that the query can be
+        restricted to the selected fields.
+        """
+        steps, _ = cls._selection('_row_plan', selector)
+        columns = []
+        for field, _, _ in steps:
+            for column in field.columns:
+                if column not in columns:
+                    columns.append(column)
+        return tuple(columns)
+
+    def _row_fetchers(self, columns, selector):
+        """
+        Returns a tuple `(fetchers, select_kind)`, where `fetchers` is a list
+        of `(field_plan, subselector, skip_none, fetch, num_columns)` for
+        each of the selected fields and `fetch` retrieves the column values
+        of the field from a row.
+        """
+        unmapped_fields = self._unmapped_row_fields
+        if selector is not None:
+            selected_fields = set(fs.field for fs in _field_selectors(selector))
+            unmapped_fields = [f for f in unmapped_fields
+                               if f in selected_fields]
+        if unmapped_fields:
+            raise TypeError(
+                '{0} cannot be serialized from rows. No columns for fields: {1}'
+                .format(type(self).__name__, ', '.join(unmapped_fields)))
+
+        steps, select_kind = self._selection('_row_plan', selector)
+        if columns is not None:
+            column_index = {column: i for i, column in enumerate(columns)}
+        fetchers = []
+        for field, subselector, skip_none in steps:
+            if columns is None:
+                keys = field.columns
+            else:
+                try:
+                    keys = [column_index[column] for column in field.columns]
+                except KeyError as e:
+                    raise ValueError('No column in rows: {0}'.format(e.args[0]))
+            ## A single key itemgetter returns the bare value, rather
+            ## than a tuple of values.
+            fetch = itemgetter(*keys) if keys else None
+            fetchers.append((field, subselector, skip_none, fetch, len(keys)))
+        return fetchers, select_kind
+
+    def to_json_many(self, rows, columns=None, selector=None):
+        """
+        Serializes each of the rows as a resource, without requiring
+        a model instance to be constructed for each row.
+
+        If `columns` is `None`, each of the rows is a mapping of column
+        names to values (as returned by `QuerySet.values()`), otherwise
+        each of the rows is a tuple of values of the given columns
+        (as returned by `QuerySet.values_list(*columns)`).
+
+        The value of a field is read from the columns of the field resource.
+        If the class declares a 'get_(field_name)_from_columns' method,
+        it is called with the value of each of the columns and its
+        result is used as the value of the field.
+
+        If a selector is provided, only the selected fields are serialized
+        (see `to_json_selected`).
+        """
+        return list(self.iter_json_many(rows, columns=columns,
+                                        selector=selector))
+
+    def iter_json_many(self, rows, columns=None, selector=None):
+        """
+        As `to_json_many`, but lazily serializes the rows one at a time
+        as the result is iterated.
+
+        The selector is validated against the resource immediately,
+        rather than when the first row is serialized.
+        """
+        fetchers, select_kind = self._row_fetchers(columns, selector)
+        return self._iter_json_rows(rows, fetchers, select_kind)
+
+    def _iter_json_rows(self, rows, fetchers, select_kind):
+        kind = self.KIND
+        for row in rows:
+            resource = dict()
+            for field, subselector, skip_none, fetch, num_columns in fetchers:
+                if field.getter is None:
+                    raw_value = fetch(row)
+                elif num_columns == 0:
+                    raw_value = field.getter(self)
+                elif num_columns == 1:
+                    raw_value = field.getter(self, fetch(row))
+                else:
+                    raw_value = field.getter(self, *fetch(row))
+                if subselector is None:
+                    field_value = field.to_json(raw_value)
+                else:
+                    field_value = field.resource.to_json_selected(
+                        raw_value, subselector)
+                if field_value is None and skip_none:
+                    continue
+                resource[field.name] = field_value
+            if select_kind:
+                resource['kind'] = kind
+            yield resource
@@ -0,0 +1,105 @@
+from django.db.models import Q
+from django.test import TestCase
+
+from parsers.exceptions import ParseError
+from .. import resources
+from ..query import (QueryFilter, FilterTerm, Ordering,
+                     compile_filter, compile_ordering)
+from .test_resources import RowModelResource
+
+
+class QueryModelResource(resources.ModelResource):
+    KIND = 'test#query_model'
+
+    id = resources.UUIDResource()
+    name = resources.StringResource()
+    count = resources.IntegerResource(required=False)
+    created = resources.DateTimeResource(order_columns=('created', 'id'))
+    tags = resources.ListResource(item_resource=resources.StringResource())
+    score = resources.IntegerResource(columns=('points',))
+
+    def filter_tags(self, lookup, value):
+        return Q(tag_names__contains=value)
+
+
+class QueryFilterTest(TestCase):
+
+    def test_parse(self):
+        query_filter = QueryFilter.parse(
+            'vendor:"Sony" price>100.00 AUD date_purchased>=2014-01-01')
+        self.assertEqual(query_filter.terms, (
+            FilterTerm('date_purchased', '>=', '2014-01-01'),
+            FilterTerm('price', '>', '100.00 AUD'),
+            FilterTerm('vendor', ':', 'Sony'),
+        ))
+
+    def test_canonical(self):
+        query_filter = QueryFilter.parse('b = 2  a:1 a:"1"')
+        self.assertEqual(str(query_filter), 'a:"1" b:"2"')
+        self.assertIs(query_filter, QueryFilter.parse('a=1 b:"2"'))
+
+    def test_quoted_value(self):
+        query_filter = QueryFilter.parse(r'name!="a \"quoted\" name"')
+        self.assertEqual(query_filter.terms,
+                         (FilterTerm('name', '!=', 'a "quoted" name'),))
+        self.assertEqual(QueryFilter.parse(str(query_filter)), query_filter)
+
+    def test_empty(self):
+        self.assertFalse(QueryFilter.parse(''))
+
+    def test_invalid(self):
+        for string in ['name', 'name:', ':1', 'name:"unterminated']:
+            with self.assertRaises(ParseError):
+                QueryFilter.parse(string)
+
+
+class OrderingTest(TestCase):
+
+    def test_parse(self):
+        ordering = Ordering.parse('-created, name,created')
+        self.assertEqual(ordering.keys, (('created', True), ('name', False)))
+        self.assertEqual(str(ordering), '-created,name')
+
+    def test_invalid(self):
+        for string in ['-', 'name,,created', '--name']:
+            with self.assertRaises(ParseError):
+                Ordering.parse(string)
+
+
+class CompileTest(TestCase):
+
+    def test_compile_filter(self):
+        q = compile_filter(QueryModelResource, QueryFilter.parse(
+            'name!=x count>=4 score<10 tags:a'))
+        self.assertEqual(str(q), str(
+            Q(count__gte=4) & ~Q(name__exact='x') &
+            Q(points__lt=10) & Q(tag_names__contains='a')))
+
+    def test_compile_filter_cached(self):
+        query_filter = QueryFilter.parse('count:4')
+        self.assertIs(compile_filter(QueryModelResource, query_filter),
+                      compile_filter(QueryModelResource, query_filter))
+
+    def test_invalid_filter(self):
+        invalid_filters = [
+            'missing:1',
+            ## Not an integer
+            'count:four',
+            ## No filter method, and read from multiple columns
+            'total:4',
+        ]
+        for string in invalid_filters:
+            resource_cls = (RowModelResource if string.startswith('total')
+                            else QueryModelResource)
+            with self.assertRaises(ValueError):
+                compile_filter(resource_cls, QueryFilter.parse(string))
+
+    def test_compile_ordering(self):
+        ordering = Ordering.parse('-score,created,name')
+        self.assertEqual(compile_ordering(QueryModelResource, ordering),
+                         ('-points', 'created', 'id', 'name'))
+
+    def test_invalid_ordering(self):
+        for string in ['missing', 'tags']:
+            with self.assertRaises(ValueError):
+                compile_ordering(QueryModelResource, Ordering.parse(string))
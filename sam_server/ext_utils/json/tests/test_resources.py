@@ -6,6 +6,7 @@ from django.db import models
 from django.test import TestCase
 
 from .. import resources
+from ..field_selector import Selector
 
 
 class MyModelResource(resources.ModelResource):
@@ -19,6 +20,20 @@ class MyModelResource(resources.ModelResource):
         return '**custom_getter**'
 
 
+class RowModelResource(resources.ModelResource):
+    KIND = 'test#row_model'
+
+    id = resources.UUIDResource(required=True)
+    total = resources.IntegerResource(columns=('value1', 'value2'))
+    optional_field = resources.IntegerResource(required=False)
+
+    def get_total(self, model):
+        return model['value1'] + model['value2']
+
+    def get_total_from_columns(self, value1, value2):
+        return value1 + value2
+
+
 class SubclassModelResource(MyModelResource):
     KIND = 'test#my_submodel'
     subclass_field = resources.IntegerResource(required=True)
@@ -71,6 +86,13 @@ class ResourcesTest(TestCase):
         self.assertEqual(r_uuid.to_json(value), resource)
         self.assertEqual(r_uuid.to_python(resource), value)
 
+    def test_list_resource_iter_json(self):
+        r_uuid = resources.ListResource(resources.UUIDResource())
+        value = [uuid.UUID(int=0), uuid.UUID(int=1)]
+        result = r_uuid.iter_json(iter(value))
+        self.assertEqual(next(result), '0' * 32)
+        self.assertEqual(list(result), [('0' * 31) + '1'])
+
     def test_dict_resource(self):
         r_object = resources.DictResource()
         value = {
@@ -113,6 +135,106 @@ class ResourcesTest(TestCase):
         with self.assertRaises(KeyError):
             subclass_field = MyModelResource._resource_fields['subclass_field']
 
+    def test_serialization_plan(self):
+        plan = {f.name: f for f in SubclassModelResource._serialization_plan}
+        self.assertEqual(set(plan), set(SubclassModelResource._resource_fields))
+        self.assertIsNone(plan['id'].getter)
+        self.assertIs(plan['custom_getter_field'].getter,
+                      MyModelResource.get_custom_getter_field)
+        self.assertFalse(plan['required_field'].skip_none)
+
+    def test_model_resource_omits_none(self):
+        class OptionalResource(resources.ModelResource):
+            KIND = 'test#optional'
+            optional_field = resources.IntegerResource(required=False)
+
+        r = OptionalResource()
+        self.assertEqual(r.to_json({'optional_field': None}),
+                         {'kind': 'test#optional'})
+        self.assertEqual(r.to_json({'optional_field': 4}),
+                         {'kind': 'test#optional', 'optional_field': 4})
+
+    def test_row_columns(self):
+        self.assertEqual(RowModelResource.row_columns(),
+                         ('id', 'value1', 'value2', 'optional_field'))
+        self.assertEqual(
+            RowModelResource.row_columns(Selector.parse('kind,total')),
+            ('value1', 'value2'))
+        with self.assertRaises(ValueError):
+            RowModelResource.row_columns(Selector.parse('invalid_field'))
+
+    def test_to_json_many(self):
+        r = RowModelResource()
+        u = uuid.UUID(int=0)
+        expected = [
+            {'kind': 'test#row_model', 'id': u.hex, 'total': 3},
+            {'kind': 'test#row_model', 'id': u.hex, 'total': 7,
+             'optional_field': 1},
+        ]
+        dict_rows = [
+            {'id': u, 'value1': 1, 'value2': 2, 'optional_field': None},
+            {'id': u, 'value1': 3, 'value2': 4, 'optional_field': 1},
+        ]
+        self.assertEqual(r.to_json_many(dict_rows), expected)
+
+        columns = ('optional_field', 'value2', 'value1', 'id')
+        tuple_rows = [(None, 2, 1, u), (1, 4, 3, u)]
+        self.assertEqual(r.to_json_many(tuple_rows, columns=columns), expected)
+
+        with self.assertRaises(ValueError):
+            r.to_json_many(tuple_rows, columns=('id',))
+
+    def test_to_json_many_requires_columns_for_getters(self):
+        ## custom_getter_field has no columns
+        with self.assertRaises(TypeError):
+            MyModelResource().to_json_many([])
+
+    def test_to_json_selected(self):
+        class NestedResource(resources.ModelResource):
+            KIND = 'test#nested'
+            value = resources.IntegerResource()
+            items = resources.ListResource(item_resource=RowModelResource())
+            optional_field = resources.IntegerResource(required=False)
+
+        r = NestedResource()
+        u = uuid.UUID(int=0)
+        model = {
+            'value': 4,
+            'optional_field': None,
+            'items': [{'id': u, 'value1': 1, 'value2': 2,
+                       'optional_field': None}]
+        }
+        for fields in ('value', 'kind, items(total)', 'items.id',
+                       'optional_field, items(optional_field, kind)'):
+            selector = Selector.parse(fields)
+            self.assertEqual(r.to_json_selected(model, selector),
+                             selector.select(r.to_json(model)))
+
+        with self.assertRaises(ValueError):
+            r.to_json_selected(model, Selector.parse('invalid_field'))
+        with self.assertRaises(ValueError):
+            r.to_json_selected(model, Selector.parse('value(subfield)'))
+
+    def test_selection_plan_cached(self):
+        selector = Selector.parse('id, total')
+        r = RowModelResource()
+        selection = r._selection('_row_plan', selector)
+        self.assertIs(r._selection('_row_plan', Selector.parse('id, total')),
+                      selection)
+
+    def test_to_json_many_selected(self):
+        r = RowModelResource()
+        u = uuid.UUID(int=0)
+        rows = [{'id': u, 'value1': 1, 'value2': 2, 'optional_field': None}]
+        self.assertEqual(
+            r.to_json_many(rows, selector=Selector.parse('total, optional_field')),
+            [{'total': 3, 'optional_field': None}])
+        ## Only fields with columns need to be selected
+        self.assertEqual(
+            MyModelResource().to_json_many([{'id': u}],
+                                           selector=Selector.parse('id')),
+            [{'id': u.hex}])
+
     def test_model_resource(self):
         r = MyModelResource()
 
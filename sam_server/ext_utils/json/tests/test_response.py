@@ -0,0 +1,82 @@
+import json
+import uuid
+
+from django.test import TestCase, RequestFactory
+
+from .. import partial_resource_response, streaming_json_response
+from .test_resources import RowModelResource
+
+
+class StreamingJsonResponseTest(TestCase):
+    def setUp(self):
+        self.rf = RequestFactory()
+        self.resource = {'kind': 'test#list', 'user_id': 4}
+        self.items = [{'id': i, 'name': 'item{0}'.format(i)} for i in range(250)]
+
+    def get_body(self, response):
+        content = b''.join(response.streaming_content)
+        return json.loads(str(content, encoding='utf-8'))
+
+    def test_stream_items(self):
+        request = self.rf.get('/')
+        response = streaming_json_response(
+            request, self.resource, 'items', iter(self.items))
+        body = self.get_body(response)
+        self.assertEqual(body, dict(self.resource, items=self.items))
+
+    def test_stream_empty_list(self):
+        request = self.rf.get('/')
+        response = streaming_json_response(request, {}, 'items', [])
+        self.assertEqual(self.get_body(response), {'items': []})
+
+    def test_stream_selected_fields(self):
+        request = self.rf.get('/', {'fields': 'user_id,items(id)'})
+        response = streaming_json_response(
+            request, self.resource, 'items', iter(self.items))
+        self.assertEqual(self.get_body(response), {
+            'user_id': 4,
+            'items': [{'id': i} for i in range(250)]
+        })
+
+        request = self.rf.get('/', {'fields': 'kind'})
+        response = streaming_json_response(
+            request, self.resource, 'items', iter(self.items))
+        self.assertEqual(self.get_body(response), {'kind': 'test#list'})
+
+    def test_stream_selected_resources(self):
+        def items(selector):
+            self.assertEqual(str(selector), 'id')
+            return [{'id': item['id']} for item in self.items]
+
+        request = self.rf.get('/', {'fields': 'items(id)'})
+        response = streaming_json_response(
+            request, self.resource, 'items', items)
+        self.assertEqual(self.get_body(response), {
+            'items': [{'id': i} for i in range(250)]
+        })
+
+    def test_stream_invalid_selector(self):
+        request = self.rf.get('/', {'fields': 'items(id'})
+        response = streaming_json_response(
+            request, self.resource, 'items', iter(self.items))
+        self.assertEqual(response.status_code, 400)
+
+
+class PartialResourceResponseTest(TestCase):
+    def setUp(self):
+        self.rf = RequestFactory()
+        self.model = {'id': uuid.UUID(int=0), 'value1': 1, 'value2': 2,
+                      'optional_field': None}
+
+    def test_selected_resource(self):
+        request = self.rf.get('/', {'fields': 'total'})
+        response = partial_resource_response(
+            request, RowModelResource(), self.model)
+        body = json.loads(str(response.content, encoding='utf-8'))
+        self.assertEqual(body, {'total': 3})
+
+    def test_invalid_field(self):
+        request = self.rf.get('/', {'fields': 'invalid_field'})
+        response = partial_resource_response(
+            request, RowModelResource(), self.model)
+        self.assertEqual(response.status_code, 400)
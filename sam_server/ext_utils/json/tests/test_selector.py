@@ -1,5 +1,7 @@
 from django.test import TestCase
 
+from parsers.exceptions import ParseError
+
 from ..field_selector import FieldSelector, FieldListSelector, Selector
 
 
@@ -50,3 +52,41 @@ class SelectorTests(TestCase):
                 ]))
             ])
         )
+
+    def test_canonical_selector(self):
+        s1 = Selector.parse('prop2(b,a), prop1, prop2(c)')
+        s2 = Selector.parse(' prop1 ,prop2( c ) ')
+        self.assertEqual(s1.canonical, 'prop1, prop2(c)')
+        self.assertIs(s1, s2)
+        self.assertEqual(hash(s1), hash(Selector.parse('prop1,prop2(c)')))
+
+    def test_selector_immutable(self):
+        selector = Selector.parse('prop1, prop2')
+        with self.assertRaises(AttributeError):
+            selector.fields = ()
+        with self.assertRaises(AttributeError):
+            selector.fields[0].field = 'prop3'
+
+    def test_compiled_selector(self):
+        resources = [
+            {"prop1": {"subprop11": 4, "subprop12": 5}, "prop2": [
+                {"subprop21": 6, "subprop22": 7},
+                {"subprop22": 8},
+            ]},
+            {"prop2": []},
+        ]
+        for fields in ('prop1', 'prop1.subprop11, prop2',
+                       'prop2(subprop21), prop3', 'prop2.subprop22'):
+            selector = Selector.parse(fields)
+            select = selector.compile()
+            self.assertIs(selector.compile(), select)
+            self.assertEqual(select(resources), selector.select(resources))
+            for resource in resources:
+                self.assertEqual(select(resource), selector.select(resource))
+        with self.assertRaises(ValueError):
+            Selector.parse('prop1').compile()(4)
+
+    def test_parse_errors(self):
+        for fields in ('prop1,,prop2', 'prop1(prop2', 'prop1)', 'prop1 prop2'):
+            with self.assertRaises(ParseError):
+                Selector.parse(fields)
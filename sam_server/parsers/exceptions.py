@@ -11,3 +11,10 @@ class ParseError(Exception):
 class StateError(Exception):
     pass
 
+
+
+class GrammarError(Exception):
+    """
+    Raised when a grammar declaration is invalid, or is not LL(1)
+    """
+    pass
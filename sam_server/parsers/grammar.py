@@ -0,0 +1,267 @@
+"""
+Table driven LL(1) parsers, generated from a grammar declaration.
+
+A grammar is declared as a list of tokens (as accepted by `lexer.Lexer`)
+and a list of productions. Each production is a tuple
+
+    (nonterminal, symbols, action)
+
+where `symbols` is a space separated string of token and nonterminal names
+(an empty string declares an empty production) and `action` is called with
+the value of each of the symbols to produce the value of the nonterminal.
+The value of a token is the matched string.
+
+The action may be None for an empty production, whose value is then None,
+or for a production of a single symbol, whose value is then the value of
+the symbol. Neither is called or reduced while parsing, so grammars should
+prefer them where they can.
+
+For example, a comma separated list of names:
+
+    Grammar(
+        tokens=[
+            ('COMMA', lexer.LiteralToken(',')),
+            ('NAME', lexer.RegexToken('[a-z]+')),
+        ],
+        productions=[
+            ('names', 'NAME more_names', lambda name, rest: [name] + rest),
+            ('more_names', 'COMMA names', lambda comma, names: names),
+            ('more_names', '', lambda: []),
+        ],
+        start='names'
+    )
+
+The parse table is built when the grammar is declared, and a `GrammarError`
+is raised if the grammar is not LL(1). Parsing is a single loop over the
+tokens of the input, driven by the table, with no method call per token
+(only the actions of the productions are called).
+"""
+from .exceptions import ParseError, GrammarError
+from .lexer import Lexer
+
+## The name of the token which marks the end of the input
+END = '$END'
+
+
+class Production(object):
+    __slots__ = ('nonterminal', 'symbols', 'action')
+
+    def __init__(self, nonterminal, symbols, action):
+        self.nonterminal = nonterminal
+        self.symbols = tuple(symbols.split())
+        self.action = action
+
+    def __str__(self):
+        return '{0} := {1}'.format(self.nonterminal,
+                                   ' '.join(self.symbols) or "''")
+
+
+class Grammar(object):
+    def __init__(self, tokens, productions, start, skip_whitespace=True):
+        self.lexer = Lexer(tokens, skip_whitespace=skip_whitespace)
+        self.terminals = frozenset(self.lexer.tokens)
+        self.productions = tuple(Production(*p) for p in productions)
+        self.start = start
+
+        self.nonterminals = frozenset(p.nonterminal for p in self.productions)
+        if start not in self.nonterminals:
+            raise GrammarError('No productions for start symbol {0}'
+                               .format(start))
+        for production in self.productions:
+            for symbol in production.symbols:
+                if (symbol not in self.terminals and
+                        symbol not in self.nonterminals):
+                    raise GrammarError('Undefined symbol {0} in ({1})'
+                                       .format(symbol, production))
+
+        self._first = {n: (set(), False) for n in self.nonterminals}
+        self._update_first_sets()
+        self._follow = self._follow_sets()
+        self._table = self._parse_table()
+
+    def _first_of(self, symbols):
+        """
+        Returns a tuple `(first, nullable)` of the set of tokens which can
+        begin the sequence of symbols, and whether the sequence can be empty.
+        """
+        first = set()
+        for symbol in symbols:
+            if symbol in self.terminals:
+                first.add(symbol)
+                return first, False
+            symbol_first, nullable = self._first[symbol]
+            first.update(symbol_first)
+            if not nullable:
+                return first, False
+        return first, True
+
+    def _update_first_sets(self):
+        """
+        Computes the first set of each of the nonterminals, and whether
+        the nonterminal can be empty, by iterating to a fixed point.
+        """
+        changed = True
+        while changed:
+            changed = False
+            for production in self.productions:
+                first, nullable = self._first_of(production.symbols)
+                current_first, current_nullable = self._first[production.nonterminal]
+                if (not first <= current_first or
+                        (nullable and not current_nullable)):
+                    self._first[production.nonterminal] = (
+                        current_first | first, current_nullable or nullable)
+                    changed = True
+
+    def _follow_sets(self):
+        follow = {n: set() for n in self.nonterminals}
+        follow[self.start].add(END)
+        changed = True
+        while changed:
+            changed = False
+            for production in self.productions:
+                symbols = production.symbols
+                for i, symbol in enumerate(symbols):
+                    if symbol in self.terminals:
+                        continue
+                    first, nullable = self._first_of(symbols[i + 1:])
+                    if nullable:
+                        first = first | follow[production.nonterminal]
+                    if not first <= follow[symbol]:
+                        follow[symbol].update(first)
+                        changed = True
+        return follow
+
+    def _parse_table(self):
+        """
+        Builds the table mapping each nonterminal and lookahead token
+        to the expansion of the production to expand.
+
+        A stack entry is either the name of a token to match, the row of
+        the table of a nonterminal to expand, or a tuple `(action, n)`
+        which reduces the values of the last `n` symbols.
+
+        An expansion is one of
+          - a tuple of the stack entries of the production
+          - a list of the stack entries of a production which begins with
+            a token. The lookahead is that token, so it is consumed as the
+            production is expanded rather than being pushed on the stack.
+          - `None`, for an empty production with no action. The value of
+            the production is None.
+          - the action of an empty production, which is called immediately.
+
+        A production of a single symbol with no action is never reduced,
+        its value is the value of the symbol.
+        """
+        table = {n: dict() for n in self.nonterminals}
+        for production in self.productions:
+            first, nullable = self._first_of(production.symbols)
+            if nullable:
+                first = first | self._follow[production.nonterminal]
+            row = table[production.nonterminal]
+            for token in first:
+                if token in row:
+                    raise GrammarError(
+                        'Grammar is not LL(1). Conflict on {0} for {1}'
+                        .format(token, production.nonterminal))
+
+            symbols = production.symbols
+            if symbols:
+                entries = []
+                ## The production is reduced once all of its symbols
+                ## have been parsed, so is pushed beneath them
+                if production.action is not None:
+                    entries.append((production.action, len(symbols)))
+                elif len(symbols) != 1:
+                    raise GrammarError(
+                        'Production with more than one symbol must '
+                        'have an action ({0})'.format(production))
+                if symbols[0] in self.terminals:
+                    rest = symbols[1:]
+                else:
+                    rest = symbols
+                for symbol in reversed(rest):
+                    if symbol in self.terminals:
+                        entries.append(symbol)
+                    else:
+                        entries.append(table[symbol])
+                if rest is symbols:
+                    entries = tuple(entries)
+            else:
+                entries = production.action
+            for token in first:
+                row[token] = entries
+        return table
+
+    def parse(self, input):
+        """
+        Parses the input, returning the value of the start symbol.
+        """
+        names, strings, positions = self.lexer.scan(input)
+        names.append(END)
+
+        stack = [END, self._table[self.start]]
+        values = []
+        ## Bind the methods used in the loop to locals
+        pop = stack.pop
+        extend = stack.extend
+        push_value = values.append
+        pop_value = values.pop
+        index = 0
+        name = names[0]
+        while True:
+            entry = pop()
+            entry_type = type(entry)
+            ## Ordered by how often each type of entry is popped
+            if entry_type is dict:
+                try:
+                    expansion = entry[name]
+                except KeyError:
+                    self._raise_error(input, names, strings, positions, index,
+                                      ', '.join(sorted(entry)))
+                expansion_type = type(expansion)
+                if expansion_type is list:
+                    push_value(strings[index])
+                    index += 1
+                    name = names[index]
+                    extend(expansion)
+                elif expansion is None:
+                    push_value(None)
+                elif expansion_type is tuple:
+                    extend(expansion)
+                else:
+                    push_value(expansion())
+            elif entry_type is tuple:
+                action, num_symbols = entry
+                if num_symbols == 2:
+                    value = pop_value()
+                    values[-1] = action(values[-1], value)
+                elif num_symbols == 1:
+                    values[-1] = action(values[-1])
+                elif num_symbols == 3:
+                    third = pop_value()
+                    second = pop_value()
+                    values[-1] = action(values[-1], second, third)
+                else:
+                    args = values[-num_symbols:]
+                    del values[-num_symbols:]
+                    push_value(action(*args))
+            else:
+                if entry != name:
+                    self._raise_error(input, names, strings, positions, index,
+                                      entry)
+                if entry is END:
+                    return values[0]
+                push_value(strings[index])
+                index += 1
+                name = names[index]
+
+    def _raise_error(self, input, names, strings, positions, index,
+                     expected):
+        if index < len(positions):
+            position = positions[index]
+            found = '{0} ({1})'.format(names[index], strings[index])
+        else:
+            position = len(input)
+            found = 'end of input'
+        raise ParseError(position, 'Unexpected {0}, expected {1}'
+                                   .format(found, expected))
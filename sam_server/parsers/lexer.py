@@ -8,6 +8,11 @@ class Token(object):
     """
     The base type for lexer tokens
     """
+    ## The source of a regular expression which matches the token, used to
+    ## compile the tokens of a lexer into a single pattern.
+    ## If None, the lexer falls back to calling `match` for each token.
+    regex_source = None
+
     def match(self, input, position):
         """
         matches the token against remaining. If the token matches,
@@ -20,6 +25,7 @@ class Token(object):
 class LiteralToken(object):
     def __init__(self, *strings):
         self.strings = strings
+        self.regex_source = '|'.join(map(re.escape, strings))
 
     def match(self, input, position):
         for string in self.strings:
@@ -27,9 +33,22 @@ class LiteralToken(object):
                 return position + len(string)
 
 
+_INLINE_FLAGS = (
+    (re.IGNORECASE, 'i'),
+    (re.MULTILINE, 'm'),
+    (re.DOTALL, 's'),
+    (re.VERBOSE, 'x'),
+)
+
+
 class RegexToken(object):
     def __init__(self, pattern, flags=0):
         self.pattern = re.compile(pattern, flags=flags)
+        inline_flags = ''.join(c for flag, c in _INLINE_FLAGS if flags & flag)
+        if inline_flags:
+            self.regex_source = '(?{0}:{1})'.format(inline_flags, pattern)
+        else:
+            self.regex_source = pattern
 
     def match(self, input, position):
         m = self.pattern.match(input, position)
@@ -38,6 +57,8 @@ class RegexToken(object):
 
 
 class Match(object):
+    __slots__ = ('name', 'position', 'string')
+
     def __init__(self, name, position, string):
         self.name = name
         self.position = position
@@ -64,13 +85,102 @@ class Lexer(object):
     def __init__(self, tokens, skip_whitespace=True):
         self.skip_whitespace = skip_whitespace
         self.tokens = OrderedDict(tokens)
+        self._pattern, self._group_names = self._compile_tokens()
+
+    def _compile_tokens(self):
+        """
+        Compiles the tokens into a single alternation, with a named group
+        for each token (and a leading group which matches whitespace,
+        if whitespace is skipped).
+
+        Returns a tuple `(pattern, group_names)`, where `group_names` maps
+        the group names of the pattern to token names (or `None` for the
+        whitespace group). If a token has no `regex_source`, returns
+        `(None, None)`.
+        """
+        alternatives = []
+        group_names = dict()
+        if self.skip_whitespace:
+            alternatives.append(r'(?P<_WSPACE>\s+)')
+            group_names['_WSPACE'] = None
+        for i, (name, token) in enumerate(self.tokens.items()):
+            regex_source = getattr(token, 'regex_source', None)
+            if regex_source is None:
+                return None, None
+            group_name = '_T{0}'.format(i)
+            alternatives.append('(?P<{0}>{1})'.format(group_name, regex_source))
+            group_names[group_name] = name
+        return re.compile('|'.join(alternatives)), group_names
 
     def _leading_ws(self, input, position):
         if not self.skip_whitespace:
-            return 0
+            return position
         return self.WSPACE.match(input, position)
 
     def run(self, input):
+        """
+        Yields a `Match` for each of the tokens in the input.
+
+        Raises a `ParseError` at the position of the first character
+        which cannot be matched by any token.
+        """
+        if self._pattern is None:
+            return self._run_sequential(input)
+        return self._run_compiled(input)
+
+    def _run_compiled(self, input):
+        group_names = self._group_names
+        position = 0
+        for m in self._pattern.finditer(input):
+            if m.start() != position:
+                break
+            position = m.end()
+            name = group_names[m.lastgroup]
+            if name is not None:
+                yield Match(name, m.start(), m.group())
+        if position < len(input):
+            char = input[position]
+            raise ParseError(position,
+                             'Unexpected char in stream ({0})'.format(char))
+
+    def scan(self, input):
+        """
+        Lexes the whole input, returning a tuple `(names, strings, positions)`
+        of lists of the names, matched strings and positions of its tokens.
+
+        Equivalent to `run`, without constructing a `Match` for each token.
+        """
+        if self._pattern is None:
+            tokens = list(self._run_sequential(input))
+            return ([token.name for token in tokens],
+                    [token.string for token in tokens],
+                    [token.position for token in tokens])
+        group_names = self._group_names
+        names = []
+        strings = []
+        positions = []
+        position = 0
+        for m in self._pattern.finditer(input):
+            start = m.start()
+            if start != position:
+                break
+            position = m.end()
+            name = group_names[m.lastgroup]
+            if name is not None:
+                names.append(name)
+                strings.append(m.group())
+                positions.append(start)
+        if position < len(input):
+            char = input[position]
+            raise ParseError(position,
+                             'Unexpected char in stream ({0})'.format(char))
+        return names, strings, positions
+
+    def _run_sequential(self, input):
+        """
+        Tries each of the tokens in turn at each position of the input.
+        Used when the tokens cannot be compiled into a single pattern.
+        """
         position = 0
         while position < len(input):
             position = self._leading_ws(input, position)
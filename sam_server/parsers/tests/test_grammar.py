@@ -0,0 +1,80 @@
+from django.test import TestCase
+
+from .. import lexer
+from ..exceptions import GrammarError, ParseError
+from ..grammar import Grammar
+
+
+NAME_LIST_TOKENS = [
+    ('COMMA', lexer.LiteralToken(',')),
+    ('L_PARENS', lexer.LiteralToken('(')),
+    ('R_PARENS', lexer.LiteralToken(')')),
+    ('NAME', lexer.RegexToken('[a-z]+')),
+]
+
+
+class GrammarTest(TestCase):
+    def setUp(self):
+        ## A comma separated list of names, which can be nested in parens
+        self.grammar = Grammar(
+            tokens=NAME_LIST_TOKENS,
+            productions=[
+                ('names', 'name more_names', lambda n, rest: [n] + rest),
+                ('names', '', lambda: []),
+                ('more_names', 'COMMA names', lambda comma, names: names),
+                ('more_names', '', lambda: []),
+                ('name', 'NAME', lambda name: name),
+                ('name', 'L_PARENS names R_PARENS', lambda l, names, r: names),
+            ],
+            start='names'
+        )
+
+    def test_parse(self):
+        self.assertEqual(self.grammar.parse(''), [])
+        self.assertEqual(self.grammar.parse('a, b'), ['a', 'b'])
+        self.assertEqual(self.grammar.parse('a, (b, (c)), d'),
+                         ['a', ['b', ['c']], 'd'])
+
+    def test_parse_error(self):
+        with self.assertRaises(ParseError) as cm:
+            self.grammar.parse('a, (b c)')
+        self.assertEqual(cm.exception.position, 6)
+
+        with self.assertRaises(ParseError) as cm:
+            self.grammar.parse('a, (b')
+        self.assertEqual(cm.exception.position, 5)
+
+    def test_no_action(self):
+        ## Empty productions are None, and single symbols are their value
+        grammar = Grammar(
+            tokens=NAME_LIST_TOKENS,
+            productions=[
+                ('names', 'name more_names', lambda n, rest: [n] + (rest or [])),
+                ('names', '', None),
+                ('more_names', 'COMMA names', lambda comma, names: names),
+                ('more_names', '', None),
+                ('name', 'NAME', None),
+                ('name', 'L_PARENS names R_PARENS', lambda l, names, r: names),
+            ],
+            start='names'
+        )
+        self.assertEqual(grammar.parse(''), None)
+        self.assertEqual(grammar.parse('a, (b, ()), d'),
+                         ['a', ['b', None], 'd'])
+        with self.assertRaises(GrammarError):
+            Grammar(NAME_LIST_TOKENS, [('names', 'NAME COMMA', None)], 'names')
+
+    def test_undefined_symbol(self):
+        with self.assertRaises(GrammarError):
+            Grammar(NAME_LIST_TOKENS, [('names', 'NAME rest', None)], 'names')
+
+    def test_not_ll1(self):
+        with self.assertRaises(GrammarError):
+            Grammar(
+                NAME_LIST_TOKENS,
+                [
+                    ('names', 'NAME', None),
+                    ('names', 'NAME COMMA names', None),
+                ],
+                'names'
+            )
@@ -1,7 +1,9 @@
+import re
 from django.test import TestCase
 
 from collections import OrderedDict
 from .. import lexer
+from ..exceptions import ParseError
 
 
 class SampleLexer(lexer.Lexer):
@@ -40,3 +42,41 @@ class LexerTest(TestCase):
         ])
 
 
+    def test_should_skip_whitespace(self):
+        test_lexer = SampleLexer()
+        result = list(test_lexer.run('  hello ,\tworld  '))
+        self.assertEqual(result, [
+            lexer.Match('NAME', 2, 'hello'),
+            lexer.Match('COMMA', 8, ','),
+            lexer.Match('NAME', 10, 'world'),
+        ])
+
+    def test_scan(self):
+        test_lexer = SampleLexer()
+        self.assertEqual(test_lexer.scan(' hello, world(you)'), (
+            ['NAME', 'COMMA', 'NAME', 'L_PARENS', 'NAME', 'R_PARENS'],
+            ['hello', ',', 'world', '(', 'you', ')'],
+            [1, 6, 8, 13, 14, 17],
+        ))
+        with self.assertRaises(ParseError) as cm:
+            test_lexer.scan('hello, $world')
+        self.assertEqual(cm.exception.position, 7)
+
+    def test_should_raise_at_unexpected_char(self):
+        test_lexer = SampleLexer()
+        with self.assertRaises(ParseError) as cm:
+            list(test_lexer.run('hello, $world'))
+        self.assertEqual(cm.exception.position, 7)
+
+    def test_should_match_literal_alternatives(self):
+        sign_lexer = lexer.Lexer([
+            ('SIGN', lexer.LiteralToken('+', '-')),
+            ('INT', lexer.RegexToken('[0-9]+')),
+            ('CODE', lexer.RegexToken('[a-z]{3}', flags=re.IGNORECASE)),
+        ])
+        result = list(sign_lexer.run('-42 AUD'))
+        self.assertEqual(result, [
+            lexer.Match('SIGN', 0, '-'),
+            lexer.Match('INT', 1, '42'),
+            lexer.Match('CODE', 4, 'AUD'),
+        ])
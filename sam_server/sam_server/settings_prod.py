@@ -74,7 +74,7 @@ WSGI_APPLICATION = 'sam_server.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql_psycopg2',
+        'ENGINE': 'common.postgresql',
         'NAME': 'samserverdb',
         'USER': 'sam_server',
         'PASSWORD': 'connect'
@@ -123,6 +123,59 @@ MEDIA_URL = '/media/'
 # FIXME: This should be replaced by a custom storage
 MEDIA_ROOT = 'media/'
 
+# Exchange rates for currency conversions (see common/exchange.py)
+EXCHANGE_RATES = {
+    ## A json file, or a csv file of the rates against the 'BASE' currency.
+    ## The rates are not distributed with the server.
+    'PATH': os.path.join(BASE_DIR, 'common', 'utility_files', 'exchange_rates.json'),
+    'BASE': 'USD',
+    ## A csv file of the daily rates against the 'BASE' currency
+    ## (with 'date', 'currency' and 'rate' columns)
+    'HISTORY_PATH': os.path.join(BASE_DIR, 'common', 'utility_files', 'exchange_rate_history.csv'),
+    ## The number of seconds before the rates are reloaded from the file
+    'TTL': 60 * 60,
+}
+
+## The currency used to compare the prices of assets in different currencies.
+## Run `manage.py refresh_asset_prices` after changing the currency
+## or updating the exchange rates.
+ASSET_PRICE_BASE_CURRENCY = 'USD'
+
+## The depreciation method of assets, by (lower case) use.
+## Assets with any other use are depreciated by the 'default' method.
+## See asset/valuation.py
+ASSET_DEPRECIATION = {
+    'default': {'method': 'straight_line', 'years': 5},
+    'vehicle': {'method': 'declining_balance', 'rate': '0.25'},
+    'computer': {'method': 'declining_balance', 'rate': '0.4'},
+}
+
+## The postgres text search configuration used to index the searched
+## fields of assets. Run `manage.py rebuild_asset_search_index` after
+## changing it.
+ASSET_SEARCH_CONFIG = 'english'
+
+## The index used to search assets (see asset/search.py): 'postgres', or
+## 'inprocess' for an index held by each process (single process servers)
+ASSET_SEARCH_INDEX = 'postgres'
+
+## The event bus which notifies requests waiting at /asset/events of
+## changes to assets (see common/events.py). The in process bus only
+## notifies requests in the same process; with more than one worker,
+## use the 'redis' backend with a redis server (or the stand-in server
+## started by `python -m common.event_bus_server`).
+EVENT_BUS = {'BACKEND': 'redis'}
+
+## Requests waiting at /asset/events are redirected (with X-Accel-Redirect)
+## to the REDIRECT location, which nginx proxies to the event gateway served
+## by `manage.py serve_asset_events` at HOST:PORT, so that they do not hold
+## a worker. If None, requests wait in the worker (see asset.views.events).
+EVENT_GATEWAY = {
+    'REDIRECT': '/internal/asset/events',
+    'HOST': 'localhost',
+    'PORT': 8090,
+}
+
 # Configuration for controlling cors request handling
 # See https://github.com/ottoyiu/django-cors-headers
 CORS_ORIGIN_ALLOW_ALL = True